@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: parcours linéaire du JSON vs index TranslationIndex
+
+Usage:
+    python -m scripts.bench_bible_index storage/bibles/FreBBB.json
+"""
+
+import json
+import random
+import sys
+import time
+
+from src.soul_verse_api.services.bible_index import TranslationIndex
+
+
+def linear_lookup(bible_data: dict, book: str, chapter: int, verse: int):
+    """Ancien algorithme de BibleService.get_verse (livres -> chapitres -> versets)"""
+    for bible_book in bible_data.get("books", []):
+        if bible_book["name"].lower() == book.lower():
+            for bible_chapter in bible_book["chapters"]:
+                if bible_chapter["chapter"] == chapter:
+                    for bible_verse in bible_chapter["verses"]:
+                        if bible_verse["verse"] == verse:
+                            return bible_verse["text"]
+            return None
+    return None
+
+
+def bench(json_path: str, samples: int = 2000):
+    with open(json_path, "r", encoding="utf-8") as snapshot:
+        bible_data = json.load(snapshot)
+
+    started = time.perf_counter()
+    index = TranslationIndex.from_json("bench", bible_data)
+    build_seconds = time.perf_counter() - started
+
+    references = [
+        (book["name"], chapter["chapter"], verse["verse"])
+        for book in bible_data["books"]
+        for chapter in book["chapters"]
+        for verse in chapter["verses"]
+    ]
+    random.seed(42)
+    sample = random.sample(references, min(samples, len(references)))
+
+    started = time.perf_counter()
+    for book, chapter, verse in sample:
+        linear_lookup(bible_data, book, chapter, verse)
+    linear_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for book, chapter, verse in sample:
+        index.text(index.lookup(book, chapter, verse))
+    index_seconds = time.perf_counter() - started
+
+    # Vérification croisée sur tout le corpus
+    for book, chapter, verse in references:
+        assert index.lookup(book, chapter, verse) is not None
+
+    print(f"Versets indexés:      {len(index)}")
+    print(f"Construction index:   {build_seconds * 1000:.1f} ms")
+    print(f"Parcours linéaire:    {linear_seconds / len(sample) * 1e6:.1f} µs/verset")
+    print(f"Index:                {index_seconds / len(sample) * 1e6:.2f} µs/verset")
+    print(f"Accélération:         x{linear_seconds / index_seconds:.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    bench(sys.argv[1])
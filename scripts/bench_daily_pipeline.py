@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banc de charge du job des versets quotidiens avec les fournisseurs simulés
+(Gemini, Stability/DALL-E, FCM): aucun appel réseau, aucun quota consommé.
+
+Le job complet s'exécute (cohortes, lots Gemini, images, cache, notifications)
+sur des utilisateurs synthétiques. Latences, erreurs et rafales de 429 se
+règlent par les variables FAKE_* (voir .env.template).
+
+Usage:
+    PROVIDER_BACKEND=fake python -m scripts.bench_daily_pipeline 10000
+    PROVIDER_BACKEND=fake FAKE_RATE_LIMIT_EVERY_SECONDS=30 python -m scripts.bench_daily_pipeline 10000
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+# Avant tout import de la configuration
+os.environ.setdefault("PROVIDER_BACKEND", "fake")
+
+from src.soul_verse_api.core.fake_providers import get_fake_provider_stats, is_fake_backend
+from src.soul_verse_api.core.redis_client import redis_client
+from src.soul_verse_api.services.gemini_governor import get_gemini_governor
+from src.soul_verse_api.services.llm_cache import get_llm_cache
+from src.soul_verse_api.services.llm_metrics import get_llm_metrics
+from src.soul_verse_api.services.scheduler_service import PRAYER_MOODS, get_scheduler
+
+
+def synthetic_users(count: int, translations=("FreBBB", "FreCrampon")):
+    """Utilisateurs actifs fictifs (humeur et traduction tirées au sort)"""
+    rng = random.Random(42)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            mood=rng.choice(PRAYER_MOODS),
+            preferred_translation=rng.choice(translations),
+            fcm_token=f"fake-token-{position}",
+            is_active=True,
+        )
+        for position in range(count)
+    ]
+
+
+async def bench(users_count: int):
+    if not is_fake_backend():
+        print("PROVIDER_BACKEND doit valoir 'fake' (appels réels refusés)")
+        sys.exit(1)
+
+    redis_client.connect()
+    # Départ à froid: ni réponses ni versets du jour en cache
+    get_llm_cache().clear()
+    redis_client.delete_pattern("daily_verse*")
+
+    scheduler = get_scheduler()
+    users = synthetic_users(users_count)
+
+    async def active_users():
+        return users
+
+    scheduler.get_active_users = active_users
+
+    started = time.perf_counter()
+    await scheduler._generate_daily_verses_job()
+    elapsed = time.perf_counter() - started
+
+    run = get_llm_metrics().runs[-1] if get_llm_metrics().runs else {}
+    print(f"Utilisateurs:        {users_count}")
+    print(f"Durée du job:        {elapsed:.2f} s ({users_count / elapsed:.0f} utilisateurs/s)")
+    print(f"Appels Gemini:       {run.get('api_calls', 0)}")
+    print(f"Jetons (entrée/sortie): {run.get('input_tokens', 0)}/{run.get('output_tokens', 0)}")
+    print(f"Fournisseurs:        {json.dumps(get_fake_provider_stats(), ensure_ascii=False)}")
+    print(f"Régulateur:          {json.dumps(get_gemini_governor().get_metrics(), ensure_ascii=False)}")
+    for method, metrics in run.get("methods", {}).items():
+        print(f"  {method}: {metrics['calls']} appels, latence {metrics['latency_seconds']}, "
+              f"secours {metrics['fallback_rate']:.1%}, erreurs {metrics['errors']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: surcoût HTTP par image, client neuf par image vs pool partagé
+
+Le faux serveur d'images (core/fake_providers.py) tourne en local sous uvicorn,
+sans latence simulée: seul le coût des connexions et des requêtes est mesuré.
+Avec un certificat (auto-signé), chaque client neuf paie aussi la poignée de
+main TLS, comme face aux vraies API.
+
+Usage:
+    python -m scripts.bench_image_client 200
+    python -m scripts.bench_image_client 200 cert.pem key.pem
+
+    # certificat de test:
+    openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=127.0.0.1 \
+        -addext subjectAltName=IP:127.0.0.1 -keyout key.pem -out cert.pem
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Avant tout import de la configuration: vraies requêtes HTTP, aucune latence simulée
+os.environ["PROVIDER_BACKEND"] = "live"
+os.environ["FAKE_IMAGE_LATENCY_SECONDS"] = "0"
+
+import httpx
+import uvicorn
+
+from src.soul_verse_api.core.fake_providers import fake_image_app
+from src.soul_verse_api.services.image_generation_service import ImageGenerationService
+
+PORT = 8089
+STABILITY_PATH = "/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image"
+DALLE_PATH = "/v1/images/generations"
+
+
+def start_server(certfile: str = None, keyfile: str = None) -> uvicorn.Server:
+    config = uvicorn.Config(
+        fake_image_app, host="127.0.0.1", port=PORT, log_level="warning",
+        ssl_certfile=certfile, ssl_keyfile=keyfile)
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def one_image(client: httpx.AsyncClient, base_url: str, position: int):
+    """Une image Stability (1 requête) puis une image DALL-E (génération + téléchargement)"""
+    payload = {"text_prompts": [{"text": f"verset {position}", "weight": 1.0}]}
+    (await client.post(f"{base_url}{STABILITY_PATH}", json=payload)).raise_for_status()
+    response = await client.post(f"{base_url}{DALLE_PATH}", json={"prompt": f"verset {position}"})
+    image_url = response.json()["data"][0]["url"].replace("http://", base_url.split("://")[0] + "://")
+    (await client.get(image_url)).raise_for_status()
+
+
+async def bench(images: int, base_url: str):
+    # Avant: un httpx.AsyncClient par image (nouvelle connexion TCP/TLS à chaque fois)
+    fresh = []
+    for position in range(images):
+        started = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            await one_image(client, base_url, position)
+        fresh.append(time.perf_counter() - started)
+
+    # Après: client partagé du service (pool keep-alive)
+    service = ImageGenerationService()
+    pooled = []
+    for position in range(images):
+        started = time.perf_counter()
+        await one_image(await service.get_http_client(), base_url, position)
+        pooled.append(time.perf_counter() - started)
+    await service.aclose()
+
+    for name, samples in (("Client par image", fresh), ("Pool partagé", pooled)):
+        print(f"{name:18} moyenne {statistics.mean(samples) * 1000:7.2f} ms/image, "
+              f"p50 {statistics.median(samples) * 1000:7.2f} ms")
+    print(f"Gain:              x{statistics.mean(fresh) / statistics.mean(pooled):.1f}")
+
+
+if __name__ == "__main__":
+    images = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    certfile, keyfile = (sys.argv[2], sys.argv[3]) if len(sys.argv) > 3 else (None, None)
+    if certfile:
+        # Certificat auto-signé (SAN 127.0.0.1) reconnu par les deux variantes
+        os.environ["SSL_CERT_FILE"] = certfile
+    server = start_server(certfile, keyfile)
+    base_url = f"{'https' if certfile else 'http'}://127.0.0.1:{PORT}"
+    try:
+        asyncio.run(bench(images, base_url))
+    finally:
+        server.should_exit = True
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compile les instantanés JSON scrollmapper en corpus binaires .svb (mmap)
+
+Usage:
+    python -m scripts.build_bible_corpus                 # toutes les traductions
+    python -m scripts.build_bible_corpus FreBBB KJV      # traductions choisies
+    python -m scripts.build_bible_corpus --rss           # + mesure RSS JSON vs mmap
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+from src.soul_verse_api.services.bible_binary import compile_translation
+from src.soul_verse_api.services.bible_corpus import get_bible_corpus
+from src.soul_verse_api.services.bible_index import TranslationIndex
+
+# Mesure isolée dans un processus neuf, comme un worker uvicorn au démarrage
+RSS_PROBE = """
+import asyncio, json, sys
+from src.soul_verse_api.core.config import settings
+settings.BIBLE_USE_MMAP = sys.argv[2] == "mmap"
+from src.soul_verse_api.services.bible_corpus import get_bible_corpus, current_rss_bytes
+corpus = get_bible_corpus()
+before = current_rss_bytes()
+index = asyncio.run(corpus.get(sys.argv[1]))
+# Lecture de tous les versets, comme après une journée de trafic
+for pos in range(len(index)):
+    index.text(pos)
+print(json.dumps({"before": before, "after": current_rss_bytes()}))
+"""
+
+
+def build(translation: str):
+    corpus = get_bible_corpus()
+    source = corpus.ensure_snapshot(translation)
+
+    started = time.perf_counter()
+    with open(corpus.snapshot_path(translation), "r", encoding="utf-8") as snapshot:
+        index = TranslationIndex.from_json(translation, json.load(snapshot))
+    size = compile_translation(index, corpus.binary_path(translation))
+
+    print(f"✅ {translation}: {len(index)} versets -> {corpus.binary_path(translation)} "
+          f"({size / 1024:.0f} Ko, instantané {source}) en {time.perf_counter() - started:.2f}s")
+
+
+def measure_rss(translation: str):
+    for mode in ("json", "mmap"):
+        output = subprocess.run(
+            [sys.executable, "-c", RSS_PROBE, translation, mode],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        rss = json.loads(output)
+        print(f"   {translation} [{mode}] RSS worker: {rss['before'] / 2**20:.1f} Mo -> "
+              f"{rss['after'] / 2**20:.1f} Mo (+{(rss['after'] - rss['before']) / 2**20:.1f} Mo)")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    translations = args or list(get_bible_corpus().available_translations)
+
+    for translation in translations:
+        build(translation)
+        if "--rss" in sys.argv:
+            measure_rss(translation)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importe les traductions du corpus dans la table bible_verses (COPY, une transaction)
+
+Usage:
+    python -m scripts.import_bible_verses                 # toutes les traductions
+    python -m scripts.import_bible_verses FreBBB KJV      # traductions choisies
+"""
+
+import asyncio
+import sys
+
+from src.soul_verse_api.services.bible_corpus import get_bible_corpus
+from src.soul_verse_api.services.bible_import import import_translation
+
+
+async def main(translations):
+    corpus = get_bible_corpus()
+    for translation in translations:
+        index = await corpus.get(translation)
+        stats = import_translation(index)
+        print(f"✅ {translation}: {stats['imported']} versets "
+              f"({stats['written']} écrits, {stats['removed']} supprimés) en {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    asyncio.run(main(args or list(get_bible_corpus().available_translations)))
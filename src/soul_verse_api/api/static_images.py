@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from src.soul_verse_api.services.image_store import ImageStore
+
+# Préférence quand le client accepte plusieurs formats (le plus léger d'abord)
+FORMAT_PREFERENCE = ("avif", "webp")
+IMAGE_CACHE_CONTROL = "public, max-age=86400"
+
+
+def pick_derivative(
+    derivatives: Dict[str, Any],
+    accept: str,
+    width: Optional[int],
+    format: Optional[str],
+    original_bytes: Optional[int] = None
+) -> Optional[str]:
+    """
+    Déclinaison à servir, None pour l'image d'origine
+
+    Args:
+        derivatives: Déclinaisons de l'image (manifeste)
+        accept: En-tête Accept du client
+        width: Largeur souhaitée (la plus petite déclinaison au moins aussi large)
+        format: Format imposé ("avif", "webp", "notification", "original")
+        original_bytes: Taille de l'original; en négociation par Accept, une
+            déclinaison plus lourde (petite image unie) n'est pas servie
+    """
+    if format == "original":
+        return None
+    if format == "notification":
+        return derivatives.get("notification")
+
+    negotiated = format is None
+    if negotiated:
+        format = next(
+            (fmt for fmt in FORMAT_PREFERENCE if fmt in derivatives and f"image/{fmt}" in accept), None)
+    sizes = derivatives.get(format) if format else None
+    if not sizes:
+        return None
+
+    widths = sorted(int(w) for w in sizes)
+    chosen = widths[-1] if width is None else next((w for w in widths if w >= width), widths[-1])
+    derivative = sizes[str(chosen)]
+    if negotiated and original_bytes is not None and derivatives["bytes"].get(derivative, 0) > original_bytes:
+        return None
+    return derivative
+
+
+class VerseImageFiles(StaticFiles):
+    """
+    Fichiers statiques des images de versets avec négociation des déclinaisons.
+
+    Une même URL (/static/verse_images/{fichier}) sert la déclinaison WebP/AVIF
+    adaptée: format d'après `Accept` ou `?format=`, largeur d'après `?w=`. Avec
+    `?format=notification`, le JPEG destiné à FCM. Sans déclinaison connue (image
+    antérieure, placeholder SVG), le fichier d'origine est servi tel quel.
+    """
+
+    def __init__(self, *, store: ImageStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        record = self.store.record_for(path)
+        derivatives = record.get("derivatives") if record else None
+        if not derivatives:
+            return await super().get_response(path, scope)
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        format = query.get("format", [None])[0]
+        if format not in (None, "original", "notification", *FORMAT_PREFERENCE):
+            raise HTTPException(status_code=400, detail="Format invalide (avif, webp, notification ou original)")
+        try:
+            width = int(query["w"][0]) if "w" in query else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Largeur invalide")
+
+        derivative = pick_derivative(
+            derivatives, Headers(scope=scope).get("accept", ""), width, format, record.get("bytes"))
+        response = None
+        if derivative:
+            try:
+                response = await super().get_response(derivative, scope)
+            except HTTPException:
+                # Déclinaison supprimée du disque: l'original reste servi
+                response = None
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        response.headers["Vary"] = "Accept"
+        response.headers.setdefault("Cache-Control", IMAGE_CACHE_CONTROL)
+        return response
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from src.soul_verse_api.services.redis_service import RedisService
 from src.soul_verse_api.services.gemini_service import GeminiService
 from src.soul_verse_api.services.scheduler_service import get_scheduler
-from typing import Optional, Dict, Any
+from src.soul_verse_api.utils.functions import SSE_HEADERS, SSE_MEDIA_TYPE, SSE_OPENING, sse_event
+from typing import Optional, Dict, Any, AsyncIterator
 from datetime import datetime
 import logging
 
@@ -18,11 +20,23 @@ gemini_service = GeminiService()
 scheduler_service = get_scheduler()
 
 
+async def resolve_prayer_mood(user_id: Optional[str]) -> str:
+    """Humeur de l'utilisateur, "paix" par défaut (prières globales)"""
+    if user_id:
+        user_mood = await redis_service.get_user_mood(user_id)
+        if user_mood:
+            return user_mood
+    return "paix"
+
+
 @router.get("/daily", response_model=Dict[str, Any])
 async def get_daily_prayers(user_id: Optional[str] = None):
     """
     Récupère les prières du jour (matin et soir) personnalisées
 
+    Les prières sont lues dans la matrice humeur x moment pré-générée
+    chaque nuit par le scheduler (clés partagées entre utilisateurs).
+
     Args:
         user_id: ID utilisateur (optionnel) - si fourni, peut être personnalisé selon le mood
 
@@ -40,84 +54,14 @@ async def get_daily_prayers(user_id: Optional[str] = None):
 
         # Détecter l'occasion spéciale du jour
         special_occasion = scheduler_service.get_special_occasion()
+        mood = await resolve_prayer_mood(user_id)
 
-        # Vérifier cache d'abord
-        cached_morning = await redis_service.get_morning_prayer(user_id)
-        cached_evening = await redis_service.get_evening_prayer(user_id)
-
-        # Si les deux sont en cache, retourner
-        if cached_morning and cached_evening:
-            logger.info("✅ Prières trouvées en cache")
-            return {
-                "morning_prayer": cached_morning,
-                "evening_prayer": cached_evening,
-                "special_occasion": {
-                    "name": special_occasion.get("name") if special_occasion else None,
-                    "description": special_occasion.get("description") if special_occasion else None,
-                    "priority": special_occasion.get("priority") if special_occasion else None
-                } if special_occasion else None,
-                "retrieved_at": datetime.now().isoformat(),
-                "cached": True
-            }
-
-        # Générer les prières si pas en cache
-        mood = "paix"  # Par défaut
-        if user_id:
-            user_mood = await redis_service.get_user_mood(user_id)
-            if user_mood:
-                mood = user_mood
-
-        # Générer prière du matin si nécessaire
-        if not cached_morning:
-            logger.info("🌅 Génération prière du matin...")
-            try:
-                morning_prayer = await gemini_service.generate_morning_prayer(mood, special_occasion)
-            except Exception as e:
-                logger.warning(f"Erreur génération prière matin: {e}")
-                morning_prayer = await gemini_service._get_fallback_morning_prayer(mood, special_occasion)
-
-            morning_data = {
-                "prayer_title": morning_prayer.get("prayer_title", "Prière du Matin"),
-                "prayer_text": morning_prayer.get("prayer_text", ""),
-                "blessing": morning_prayer.get("blessing", "Que Dieu te bénisse. Amen."),
-                "suggested_verse": morning_prayer.get("suggested_verse", ""),
-                "special_occasion": special_occasion.get("name") if special_occasion else None,
-                "occasion_description": special_occasion.get("description") if special_occasion else None,
-                "generated_at": datetime.now().isoformat(),
-                "prayer_type": "morning"
-            }
-
-            # Mettre en cache
-            await redis_service.cache_morning_prayer(morning_data, user_id)
-            cached_morning = morning_data
-
-        # Générer prière du soir si nécessaire
-        if not cached_evening:
-            logger.info("🌙 Génération prière du soir...")
-            try:
-                evening_prayer = await gemini_service.generate_evening_prayer(mood, special_occasion)
-            except Exception as e:
-                logger.warning(f"Erreur génération prière soir: {e}")
-                evening_prayer = await gemini_service._get_fallback_evening_prayer(mood, special_occasion)
-
-            evening_data = {
-                "prayer_title": evening_prayer.get("prayer_title", "Prière du Soir"),
-                "prayer_text": evening_prayer.get("prayer_text", ""),
-                "blessing": evening_prayer.get("blessing", "Que tu reposes en paix. Amen."),
-                "suggested_verse": evening_prayer.get("suggested_verse", ""),
-                "special_occasion": special_occasion.get("name") if special_occasion else None,
-                "occasion_description": special_occasion.get("description") if special_occasion else None,
-                "generated_at": datetime.now().isoformat(),
-                "prayer_type": "evening"
-            }
-
-            # Mettre en cache
-            await redis_service.cache_evening_prayer(evening_data, user_id)
-            cached_evening = evening_data
+        morning_prayer, morning_cached = await scheduler_service.get_shared_prayer("morning", mood)
+        evening_prayer, evening_cached = await scheduler_service.get_shared_prayer("evening", mood)
 
         return {
-            "morning_prayer": cached_morning,
-            "evening_prayer": cached_evening,
+            "morning_prayer": morning_prayer,
+            "evening_prayer": evening_prayer,
             "special_occasion": {
                 "name": special_occasion.get("name") if special_occasion else None,
                 "description": special_occasion.get("description") if special_occasion else None,
@@ -125,9 +69,9 @@ async def get_daily_prayers(user_id: Optional[str] = None):
                 "themes": special_occasion.get("themes") if special_occasion else None
             } if special_occasion else None,
             "retrieved_at": datetime.now().isoformat(),
-            "cached": False,
+            "cached": morning_cached and evening_cached,
             "generated_for_user": user_id is not None,
-            "mood_context": mood if user_id else "paix"
+            "mood_context": mood
         }
 
     except Exception as e:
@@ -153,36 +97,8 @@ async def get_morning_prayer(user_id: Optional[str] = None):
         logger.info(
             f"🌅 Récupération prière du matin{f' pour {user_id[:8]}...' if user_id else ''}")
 
-        # Vérifier cache
-        cached = await redis_service.get_morning_prayer(user_id)
-        if cached:
-            return cached
-
-        # Générer si pas en cache
-        special_occasion = scheduler_service.get_special_occasion()
-        mood = "paix"
-        if user_id:
-            user_mood = await redis_service.get_user_mood(user_id)
-            if user_mood:
-                mood = user_mood
-
-        try:
-            prayer = await gemini_service.generate_morning_prayer(mood, special_occasion)
-        except Exception as e:
-            logger.warning(f"Erreur IA: {e}")
-            prayer = await gemini_service._get_fallback_morning_prayer(mood, special_occasion)
-
-        prayer_data = {
-            "prayer_title": prayer.get("prayer_title", "Prière du Matin"),
-            "prayer_text": prayer.get("prayer_text", ""),
-            "blessing": prayer.get("blessing", ""),
-            "suggested_verse": prayer.get("suggested_verse", ""),
-            "special_occasion": special_occasion.get("name") if special_occasion else None,
-            "generated_at": datetime.now().isoformat(),
-            "prayer_type": "morning"
-        }
-
-        await redis_service.cache_morning_prayer(prayer_data, user_id)
+        mood = await resolve_prayer_mood(user_id)
+        prayer_data, _ = await scheduler_service.get_shared_prayer("morning", mood)
         return prayer_data
 
     except Exception as e:
@@ -208,36 +124,8 @@ async def get_evening_prayer(user_id: Optional[str] = None):
         logger.info(
             f"🌙 Récupération prière du soir{f' pour {user_id[:8]}...' if user_id else ''}")
 
-        # Vérifier cache
-        cached = await redis_service.get_evening_prayer(user_id)
-        if cached:
-            return cached
-
-        # Générer si pas en cache
-        special_occasion = scheduler_service.get_special_occasion()
-        mood = "paix"
-        if user_id:
-            user_mood = await redis_service.get_user_mood(user_id)
-            if user_mood:
-                mood = user_mood
-
-        try:
-            prayer = await gemini_service.generate_evening_prayer(mood, special_occasion)
-        except Exception as e:
-            logger.warning(f"Erreur IA: {e}")
-            prayer = await gemini_service._get_fallback_evening_prayer(mood, special_occasion)
-
-        prayer_data = {
-            "prayer_title": prayer.get("prayer_title", "Prière du Soir"),
-            "prayer_text": prayer.get("prayer_text", ""),
-            "blessing": prayer.get("blessing", ""),
-            "suggested_verse": prayer.get("suggested_verse", ""),
-            "special_occasion": special_occasion.get("name") if special_occasion else None,
-            "generated_at": datetime.now().isoformat(),
-            "prayer_type": "evening"
-        }
-
-        await redis_service.cache_evening_prayer(prayer_data, user_id)
+        mood = await resolve_prayer_mood(user_id)
+        prayer_data, _ = await scheduler_service.get_shared_prayer("evening", mood)
         return prayer_data
 
     except Exception as e:
@@ -248,11 +136,38 @@ async def get_evening_prayer(user_id: Optional[str] = None):
         )
 
 
+async def stream_custom_prayer(prayer_type: str, mood: str, special_occasion: Optional[dict]) -> AsyncIterator[bytes]:
+    """
+    Prière personnalisée en SSE: fragments bruts ("token") et texte de chaque
+    champ au fil de la génération ("field"), puis prière complète ("done"),
+    ou "error". Le texte assemblé est mis en cache (Redis) à la fin du flux
+    par GeminiService.
+    """
+    yield SSE_OPENING
+    try:
+        async for event, data in gemini_service.stream_prayer(prayer_type, mood, special_occasion):
+            if event in ("token", "field"):
+                yield sse_event(event, {"text": data} if event == "token" else data)
+            else:
+                yield sse_event("done", {
+                    **data,
+                    "prayer_type": prayer_type,
+                    "mood": mood,
+                    "special_occasion": special_occasion.get("name") if special_occasion else None,
+                    "generated_at": datetime.now().isoformat()
+                })
+
+    except Exception as e:
+        logger.error(f"Erreur streaming prière custom: {e}")
+        yield sse_event("error", {"status_code": 500, "detail": str(e)})
+
+
 @router.post("/generate-custom", response_model=Dict[str, Any])
 async def generate_custom_prayer(
     prayer_type: str,  # "morning" ou "evening"
     mood: str = "paix",
-    user_id: Optional[str] = None
+    user_id: Optional[str] = None,
+    stream: bool = False
 ):
     """
     Génère une prière personnalisée à la demande
@@ -261,6 +176,7 @@ async def generate_custom_prayer(
         prayer_type: Type de prière ("morning" ou "evening")
         mood: État émotionnel
         user_id: ID utilisateur (optionnel)
+        stream: Envoyer la prière au fil de la génération (Server-Sent Events)
 
     Returns:
         Prière générée
@@ -274,6 +190,11 @@ async def generate_custom_prayer(
 
         special_occasion = scheduler_service.get_special_occasion()
 
+        if stream:
+            return StreamingResponse(
+                stream_custom_prayer(prayer_type, mood, special_occasion),
+                media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
         if prayer_type == "morning":
             prayer = await gemini_service.generate_morning_prayer(mood, special_occasion)
         else:
@@ -287,6 +208,8 @@ async def generate_custom_prayer(
             "generated_at": datetime.now().isoformat()
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur génération prière custom: {e}")
         raise HTTPException(
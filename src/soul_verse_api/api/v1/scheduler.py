@@ -54,6 +54,31 @@ async def trigger_daily_verses():
         )
 
 
+@router.post("/trigger-prayer-pregeneration", response_model=Dict[str, Any])
+async def trigger_prayer_pregeneration(today: bool = False):
+    """
+    Déclenche manuellement la pré-génération des prières (humeur x matin/soir)
+
+    Args:
+        today: Préparer la matrice du jour au lieu de celle du lendemain
+    """
+    try:
+        stats = await scheduler_service._pregenerate_prayers_job(datetime.now() if today else None)
+        return {
+            "success": True,
+            "message": "Prières pré-générées",
+            "stats": stats,
+            "triggered_at": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Erreur pré-génération prières: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la pré-génération des prières: {str(e)}"
+        )
+
+
 @router.post("/test-morning-prayer", response_model=Dict[str, Any])
 async def test_morning_prayer():
     """Déclenche manuellement la notification de prière du matin"""
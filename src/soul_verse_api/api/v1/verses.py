@@ -1,12 +1,21 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 from src.soul_verse_api.services.bible_service import BibleService
-from src.soul_verse_api.services.gemini_service import GeminiService
+from src.soul_verse_api.services.bible_search import encode_cursor, decode_cursor
+from src.soul_verse_api.services.gemini_service import GeminiService, get_coalesce_stats, get_parse_stats
+from src.soul_verse_api.services.gemini_governor import get_gemini_governor
+from src.soul_verse_api.services.llm_cache import get_llm_cache
+from src.soul_verse_api.services.llm_metrics import get_llm_metrics
 from src.soul_verse_api.services.redis_service import RedisService
 from src.soul_verse_api.services.image_generation_service import get_image_service
 from src.soul_verse_api.services.scheduler_service import get_scheduler
-from typing import Optional, Dict, Any
+from src.soul_verse_api.schemas.verse_schema import VerseBatchRequest
+from src.soul_verse_api.utils.functions import SSE_HEADERS, SSE_MEDIA_TYPE, SSE_OPENING, sse_event
+from typing import Optional, Dict, Any, AsyncIterator, Iterator, List
 from datetime import datetime
+import json
 import logging
+import time
 
 # Configuration des logs
 logging.basicConfig(level=logging.INFO)
@@ -20,10 +29,214 @@ redis_service = RedisService()
 image_service = get_image_service()
 scheduler_service = get_scheduler()
 
+# Nombre maximum de références par appel à /verses/batch
+MAX_BATCH_REFERENCES = 50
+MAX_PARALLEL_TRANSLATIONS = 5
+# Lecture de chapitres/livres: le texte ne change pas, les clients peuvent le garder
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+READING_CACHE_CONTROL = "public, max-age=86400"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match désigne l'ETag courant"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def ndjson_chunks(chapters: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Un verset par ligne, un bloc envoyé par chapitre"""
+    for rows in chapters:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def json_chunks(header: Dict[str, Any], chapters: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Document JSON {..., "verses": [...]} écrit par morceaux, un par chapitre"""
+    yield (json.dumps(header, ensure_ascii=False)[:-1] + ', "verses": [').encode("utf-8")
+    separator = ""
+    for rows in chapters:
+        if not rows:
+            continue
+        yield (separator + ",".join(json.dumps(row, ensure_ascii=False) for row in rows)).encode("utf-8")
+        separator = ","
+    yield b"]}"
+
+
+async def stream_reading(
+    book: str,
+    chapter: Optional[int],
+    translation: str,
+    format: Optional[str],
+    accept: Optional[str],
+    if_none_match: Optional[str]
+) -> Response:
+    """Réponse streamée d'un chapitre (ou d'un livre entier si chapter est None)"""
+    if not book or not book.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le nom du livre est requis"
+        )
+
+    if chapter is not None and chapter <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le numéro de chapitre doit être positif"
+        )
+
+    if format not in (None, "json", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format invalide (json ou ndjson)"
+        )
+
+    translation = translation.strip() or "FreBBB"
+    try:
+        index = await bible_service.load_translation(translation)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Erreur service Bible: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service Bible temporairement indisponible"
+        )
+
+    book_id = bible_service.resolve_book_id(index, book.strip())
+    slots = bible_service.chapter_slots(index, book_id, chapter) if book_id is not None else []
+    if not slots:
+        reference = f"{book} {chapter}" if chapter is not None else book
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Non trouvé: {reference} ({translation})"
+        )
+
+    ndjson = format == "ndjson" or (format is None and NDJSON_MEDIA_TYPE in (accept or ""))
+    etag = bible_service.content_etag(
+        index, book_id, chapter or "*", "ndjson" if ndjson else "json")
+    headers = {"ETag": etag, "Cache-Control": READING_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    chapters = bible_service.iter_chapters(index, book_id, slots)
+    if ndjson:
+        return StreamingResponse(
+            ndjson_chunks(chapters), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    header: Dict[str, Any] = {
+        "translation": translation,
+        "book": index.book_names[book_id],
+    }
+    if chapter is not None:
+        header["chapter"] = chapter
+    else:
+        header["chapters"] = len(slots)
+    return StreamingResponse(
+        json_chunks(header, chapters), media_type="application/json", headers=headers)
+
+
+async def build_daily_verse(user_id: str, mood: str, ai_response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Verset du jour complet à partir de la réponse IA (texte biblique, image), mis en cache
+
+    Raises:
+        HTTPException: 500 si la réponse IA est invalide, 404 si le verset est introuvable
+    """
+    # Valider la réponse IA
+    if not ai_response or "reference" not in ai_response:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Réponse IA invalide"
+        )
+
+    # Récupérer le verset complet depuis la Bible en utilisant la fonction utilitaire
+    bible_verse = await scheduler_service.get_bible_verse_from_reference(
+        ai_response["reference"],
+        "FreBBB"
+    )
+
+    if not bible_verse:
+        logger.warning(
+            f"⚠️ Verset non trouvé pour référence: {ai_response['reference']}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Verset non trouvé: {ai_response['reference']}"
+        )
+
+    # Générer l'image du verset
+    verse_image = None
+    try:
+        logger.info(
+            f"Génération image pour verset: {ai_response['reference']}")
+        verse_image = await image_service.generate_multiple_methods(
+            verse_text=bible_verse.text,
+            reference=ai_response["reference"],
+            mood=mood
+        )
+    except Exception as e:
+        logger.warning(f"Erreur génération image: {e}")
+        # Continue sans image si la génération échoue
+
+    # Construire réponse enrichie
+    result = {
+        "verse": bible_verse.dict() if hasattr(bible_verse, 'dict') else bible_verse,
+        "ai_response": ai_response,
+        "ai_reflection": ai_response.get("reflection", "Méditation personnalisée indisponible"),
+        "verse_image": verse_image,
+        "mood_context": mood,
+        "generated_at": datetime.now().isoformat(),
+        "reference": ai_response["reference"],
+        "user_id": user_id,
+        "translation": "FreBBB",
+        "has_full_verse": True,
+        "has_image": verse_image is not None and verse_image.get("image_url") != "/static/default_verse.png"
+    }
+
+    # Mettre en cache Redis (async)
+    try:
+        await redis_service.cache_daily_verse(user_id, result)
+        logger.info(
+            f"Verset quotidien mis en cache pour l'utilisateur {user_id}")
+    except Exception as e:
+        logger.warning(
+            f"Impossible de mettre en cache le verset pour {user_id}: {e}")
+        # Continue sans échec si le cache ne fonctionne pas
+
+    return result
+
+
+async def stream_daily_verse(user_id: str, mood: str) -> AsyncIterator[bytes]:
+    """
+    Verset du jour en SSE: fragments bruts ("token") et texte de chaque champ
+    au fil de la génération ("field"), réponse IA complète ("ai_response"),
+    puis résultat final mis en cache ("done"), ou "error"
+    """
+    yield SSE_OPENING
+    try:
+        ai_response = None
+        async for event, data in gemini_service.stream_personalized_verse(mood):
+            if event in ("token", "field"):
+                yield sse_event(event, {"text": data} if event == "token" else data)
+            else:
+                ai_response = data
+                yield sse_event("ai_response", ai_response)
+
+        # Texte biblique et image: la réflexion est déjà affichée côté client
+        yield sse_event("done", await build_daily_verse(user_id, mood, ai_response))
+
+    except HTTPException as e:
+        yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        logger.error(f"Erreur streaming verset du jour: {e}")
+        yield sse_event("error", {"status_code": 500, "detail": "Erreur interne du serveur"})
+
 
 @router.get("/today", response_model=Dict[str, Any])
-async def get_daily_verse(user_id: str):
-    """Récupère le verset du jour personnalisé (avec IA)"""
+async def get_daily_verse(user_id: str, stream: bool = False):
+    """Récupère le verset du jour personnalisé (avec IA), en SSE si stream=true"""
     try:
         if not user_id or not user_id.strip():
             raise HTTPException(
@@ -38,6 +251,10 @@ async def get_daily_verse(user_id: str):
             if cached_verse.get("verse") is not None and cached_verse.get("has_full_verse") is True:
                 logger.info(
                     f"✅ Verset quotidien complet trouvé en cache pour l'utilisateur {user_id[:8]}...")
+                if stream:
+                    return StreamingResponse(
+                        iter([SSE_OPENING, sse_event("done", cached_verse)]),
+                        media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
                 return cached_verse
             else:
                 logger.warning(
@@ -49,6 +266,12 @@ async def get_daily_verse(user_id: str):
         mood = await redis_service.get_user_mood(user_id) or "paix"
         logger.info(f"Mood utilisateur {user_id}: {mood}")
 
+        # Mode streaming: premiers octets avant la fin de la génération IA
+        if stream:
+            return StreamingResponse(
+                stream_daily_verse(user_id, mood),
+                media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
         # Générer verset avec IA
         try:
             ai_response = await gemini_service.get_personalized_verse(mood)
@@ -59,67 +282,7 @@ async def get_daily_verse(user_id: str):
                 detail="Service IA temporairement indisponible"
             )
 
-        # Valider la réponse IA
-        if not ai_response or "reference" not in ai_response:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Réponse IA invalide"
-            )
-
-        # Récupérer le verset complet depuis la Bible en utilisant la fonction utilitaire
-        bible_verse = await scheduler_service.get_bible_verse_from_reference(
-            ai_response["reference"],
-            "FreBBB"
-        )
-
-        if not bible_verse:
-            logger.warning(
-                f"⚠️ Verset non trouvé pour référence: {ai_response['reference']}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Verset non trouvé: {ai_response['reference']}"
-            )
-
-        # Générer l'image du verset
-        verse_image = None
-        try:
-            logger.info(
-                f"Génération image pour verset: {ai_response['reference']}")
-            verse_image = await image_service.generate_multiple_methods(
-                verse_text=bible_verse.text,
-                reference=ai_response["reference"],
-                mood=mood
-            )
-        except Exception as e:
-            logger.warning(f"Erreur génération image: {e}")
-            # Continue sans image si la génération échoue
-
-        # Construire réponse enrichie
-        result = {
-            "verse": bible_verse.dict() if hasattr(bible_verse, 'dict') else bible_verse,
-            "ai_response": ai_response,
-            "ai_reflection": ai_response.get("reflection", "Méditation personnalisée indisponible"),
-            "verse_image": verse_image,
-            "mood_context": mood,
-            "generated_at": datetime.now().isoformat(),
-            "reference": ai_response["reference"],
-            "user_id": user_id,
-            "translation": "FreBBB",
-            "has_full_verse": True,
-            "has_image": verse_image is not None and verse_image.get("image_url") != "/static/default_verse.png"
-        }
-
-        # Mettre en cache Redis (async)
-        try:
-            await redis_service.cache_daily_verse(user_id, result)
-            logger.info(
-                f"Verset quotidien mis en cache pour l'utilisateur {user_id}")
-        except Exception as e:
-            logger.warning(
-                f"Impossible de mettre en cache le verset pour {user_id}: {e}")
-            # Continue sans échec si le cache ne fonctionne pas
-
-        return result
+        return await build_daily_verse(user_id, mood, ai_response)
 
     except HTTPException:
         raise
@@ -169,6 +332,316 @@ async def clear_daily_verse_cache(user_id: str):
         )
 
 
+@router.get("/search", response_model=Dict[str, Any])
+async def search_verses(
+    q: str,
+    translation: str = "FreBBB",
+    mode: str = "and",
+    limit: int = 20,
+    cursor: Optional[str] = None
+):
+    """
+    Recherche plein texte dans une traduction (insensible aux accents, classée BM25)
+
+    Args:
+        q: Requête (mots-clés, expressions exactes entre guillemets)
+        translation: Traduction biblique
+        mode: "and" (tous les termes) ou "or" (au moins un)
+        limit: Nombre de résultats par page (1-100)
+        cursor: Curseur de la page suivante (renvoyé par l'appel précédent)
+    """
+    try:
+        if not q or not q.strip():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La requête de recherche est requise"
+            )
+
+        if mode not in ["and", "or"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="mode doit être 'and' ou 'or'"
+            )
+
+        if limit <= 0 or limit > 100:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="limit doit être compris entre 1 et 100"
+            )
+
+        try:
+            offset = decode_cursor(cursor) if cursor else 0
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        translation = translation.strip() or "FreBBB"
+
+        started = time.perf_counter()
+        try:
+            hits, total = await bible_service.search_verses(
+                translation, q.strip(), mode, limit, offset)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Erreur service Bible: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service Bible temporairement indisponible"
+            )
+        took_ms = (time.perf_counter() - started) * 1000
+
+        next_offset = offset + len(hits)
+        return {
+            "query": q,
+            "translation": translation,
+            "mode": mode,
+            "total": total,
+            "results": [
+                {
+                    **bible_verse.dict(),
+                    "reference": f"{bible_verse.book} {bible_verse.chapter}:{bible_verse.verse}",
+                    "score": round(score, 4)
+                }
+                for bible_verse, score in hits
+            ],
+            "next_cursor": encode_cursor(next_offset) if next_offset < total else None,
+            "took_ms": round(took_ms, 3)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur inattendue dans search_verses: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne du serveur"
+        )
+
+
+@router.post("/batch", response_model=Dict[str, Any])
+async def get_verses_batch(request: VerseBatchRequest):
+    """
+    Récupère plusieurs références en un seul aller-retour
+
+    Accepte les plages ("Philippiens 4:6-7", "Jean 3:16-4:2") et les listes
+    séparées par ";" ("Jean 3:16; 1 Jean 4:8").
+    """
+    try:
+        references = [ref.strip() for ref in request.references if ref and ref.strip()]
+        if not references:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Au moins une référence est requise"
+            )
+
+        if len(references) > MAX_BATCH_REFERENCES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Maximum {MAX_BATCH_REFERENCES} références par requête"
+            )
+
+        translation = request.translation.strip() or "FreBBB"
+
+        try:
+            results = await bible_service.get_verses_batch(translation, references)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Erreur service Bible: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service Bible temporairement indisponible"
+            )
+
+        return {
+            "translation": translation,
+            "count": len(results),
+            "found": sum(1 for result in results if result["found"]),
+            "results": results,
+            "retrieved_at": datetime.now().isoformat()
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur inattendue dans get_verses_batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne du serveur"
+        )
+
+
+@router.get("/recommend", response_model=Dict[str, Any])
+async def recommend_verses(
+    mood: Optional[str] = None,
+    themes: Optional[str] = None,
+    today_occasion: bool = False,
+    translation: str = "FreBBB",
+    limit: int = 10
+):
+    """
+    Versets recommandés localement pour une humeur et/ou des thèmes (sans IA)
+
+    Args:
+        mood: Humeur (ex: "anxiété", "joie")
+        themes: Thèmes séparés par des virgules (ex: "esperance,salut")
+        today_occasion: Ajouter les thèmes de l'occasion spéciale du jour
+        translation: Traduction biblique
+        limit: Nombre de candidats (1-50)
+    """
+    try:
+        theme_list = [theme.strip() for theme in (themes or "").split(",") if theme.strip()]
+        occasion = scheduler_service.get_special_occasion() if today_occasion else None
+        if occasion:
+            theme_list += occasion.get("themes", [])
+
+        if not (mood and mood.strip()) and not theme_list:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Une humeur ou des thèmes sont requis"
+            )
+
+        if limit < 1 or limit > 50:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="limit doit être compris entre 1 et 50"
+            )
+
+        started = time.perf_counter()
+        try:
+            candidates = await bible_service.recommend_verses(
+                translation.strip() or "FreBBB", mood, theme_list, limit)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Erreur service Bible: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service Bible temporairement indisponible"
+            )
+
+        return {
+            "mood": mood,
+            "themes": theme_list,
+            "occasion": occasion.get("name") if occasion else None,
+            "translation": translation,
+            "candidates": candidates,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur inattendue dans recommend_verses: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne du serveur"
+        )
+
+
+@router.get("/parallel", response_model=Dict[str, Any])
+async def get_parallel_verses(
+    reference: str,
+    translations: str = "FreBBB,FreCrampon,KJV"
+):
+    """
+    Compare une référence dans plusieurs traductions
+
+    Args:
+        reference: Ex: "Jean 3:16", "Psaume 23:1-4"
+        translations: Codes séparés par des virgules (le premier sert de pivot)
+    """
+    try:
+        codes = list(dict.fromkeys(
+            code.strip() for code in translations.split(",") if code.strip()))
+        if not codes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Au moins une traduction est requise"
+            )
+
+        if len(codes) > MAX_PARALLEL_TRANSLATIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Maximum {MAX_PARALLEL_TRANSLATIONS} traductions par requête"
+            )
+
+        try:
+            rows = await bible_service.get_parallel_verses(reference, codes)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Erreur service Bible: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service Bible temporairement indisponible"
+            )
+
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Référence {reference} non trouvée dans {codes[0]}"
+            )
+
+        return {
+            "reference": reference,
+            "translations": codes,
+            "count": len(rows),
+            "verses": rows,
+            "retrieved_at": datetime.now().isoformat()
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur inattendue dans get_parallel_verses: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne du serveur"
+        )
+
+
+@router.get("/books/{book}/stream")
+async def stream_book(
+    book: str,
+    translation: str = "FreBBB",
+    format: Optional[str] = "ndjson",
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Livre entier en streaming (NDJSON par défaut, ou JSON avec format=json)
+
+    Les versets sont écrits chapitre par chapitre depuis l'index en mémoire.
+    Supporte If-None-Match (304) grâce à un ETag stable.
+    """
+    try:
+        return await stream_reading(book, None, translation, format, accept, if_none_match)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur inattendue dans stream_book: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne du serveur"
+        )
+
+
 @router.get("/{book}/{chapter}/{verse}", response_model=Dict[str, Any])
 async def get_specific_verse(
     book: str,
@@ -176,7 +649,7 @@ async def get_specific_verse(
     verse: int,
     translation: str = "FreBBB"
 ):
-    """Récupère un verset spécifique avec cache optimisé"""
+    """Récupère un verset spécifique (accès direct à l'index en mémoire)"""
     try:
         # Validation des paramètres
         if not book or not book.strip():
@@ -201,20 +674,14 @@ async def get_specific_verse(
         book = book.strip()
         translation = translation.strip() or "FreBBB"
 
-        # Vérifier cache Redis d'abord
-        try:
-            cached_verse = await redis_service.get_verse_cache(translation, book, chapter, verse)
-            if cached_verse:
-                logger.info(
-                    f"Verset trouvé en cache: {book} {chapter}:{verse} ({translation})")
-                return cached_verse
-        except Exception as e:
-            logger.warning(f"Erreur cache Redis: {e}")
-            # Continue sans cache si Redis ne fonctionne pas
-
-        # Récupérer depuis le service Bible
+        # Récupérer depuis l'index en mémoire (plus rapide qu'un aller-retour Redis)
         try:
             bible_verse = await bible_service.get_verse(translation, book, chapter, verse)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         except Exception as e:
             logger.error(f"Erreur service Bible: {e}")
             raise HTTPException(
@@ -241,15 +708,6 @@ async def get_specific_verse(
             "reference": f"{book} {chapter}:{verse}"
         })
 
-        # Mettre en cache (async, non bloquant)
-        try:
-            await redis_service.cache_verse(translation, book, chapter, verse, result)
-            logger.info(
-                f"Verset mis en cache: {book} {chapter}:{verse} ({translation})")
-        except Exception as e:
-            logger.warning(f"Impossible de mettre en cache: {e}")
-            # Continue sans échec si le cache ne fonctionne pas
-
         return result
 
     except HTTPException:
@@ -414,6 +872,75 @@ async def health_check():
         }
 
 
+@router.get("/corpus/status")
+async def get_corpus_status():
+    """Métriques du corpus biblique résident (temps de chargement, mémoire)"""
+    try:
+        return {
+            "service": "bible_corpus",
+            **bible_service.corpus.get_metrics(),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Erreur status corpus: {e}")
+        return {
+            "service": "bible_corpus",
+            "status": "unhealthy",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+@router.get("/ai/cache-status")
+async def get_ai_cache_status():
+    """Compteurs du cache des réponses Gemini (hits/miss), de la coalescence, du régulateur (débit, file) et du décodage"""
+    try:
+        return {
+            "service": "gemini_cache",
+            "cache": get_llm_cache().get_stats(),
+            "coalescing": get_coalesce_stats(),
+            "governor": get_gemini_governor().get_metrics(),
+            "parsing": get_parse_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Erreur status cache IA: {e}")
+        return {
+            "service": "gemini_cache",
+            "status": "unhealthy",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+@router.get("/ai/metrics")
+async def get_ai_metrics():
+    """
+    Instrumentation des appels Gemini par méthode (verset, prières)
+
+    Percentiles de latence (méthode et generate_content), jetons d'entrée et de
+    sortie, coût estimé, taux de secours et erreurs par classe: depuis le
+    démarrage, pour les jobs du scheduler en cours et pour leurs derniers passages.
+    """
+    try:
+        return {
+            "service": "gemini_metrics",
+            **get_llm_metrics().get_metrics(),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Erreur métriques IA: {e}")
+        return {
+            "service": "gemini_metrics",
+            "status": "unhealthy",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+
 @router.post("/generate-image")
 async def generate_verse_image(
     verse_text: str,
@@ -501,6 +1028,8 @@ async def get_image_service_status():
             },
             "storage_directory": str(image_service.local_images_dir),
             "color_themes_available": list(image_service.color_themes.keys()),
+            "render_pool": image_service.render_pool.get_stats(),
+            "image_store": image_service.store.get_stats(),
             "timestamp": datetime.now().isoformat()
         }
 
@@ -512,3 +1041,32 @@ async def get_image_service_status():
             "error": str(e),
             "timestamp": datetime.now().isoformat()
         }
+
+
+# Déclarée en dernier: "/{book}/{chapter}" masquerait /mood/{user_id},
+# /cache/{user_id} et /corpus/status
+@router.get("/{book}/{chapter}")
+async def get_chapter(
+    book: str,
+    chapter: int,
+    translation: str = "FreBBB",
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Chapitre entier pour le mode lecture
+
+    JSON par défaut; NDJSON avec format=ndjson ou Accept: application/x-ndjson.
+    Supporte If-None-Match (304) grâce à un ETag stable.
+    """
+    try:
+        return await stream_reading(book, chapter, translation, format, accept, if_none_match)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur inattendue dans get_chapter: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne du serveur"
+        )
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,6 +23,26 @@ class Settings(BaseSettings):
 
     # Gemini AI Configuration
     GEMINI_API_KEY: str = ""
+    # Choix du verset du jour: "gemini" (IA, recommandeur local en secours) ou "local"
+    VERSE_SELECTION_MODE: str = "gemini"
+    # Au-delà de ce délai, Gemini est abandonné au profit du recommandeur local
+    GEMINI_TIMEOUT_SECONDS: float = 15.0
+    # Cache des réponses Gemini (secondes, 0 = désactivé) et taille du LRU mémoire
+    GEMINI_CACHE_TTL_VERSE: int = 86400
+    GEMINI_CACHE_TTL_PRAYER: int = 86400
+    GEMINI_CACHE_TTL_DEFAULT: int = 3600
+    GEMINI_CACHE_MAX_ENTRIES: int = 1024
+    # Régulation des appels (appels/s de départ, bornes, concurrence max, latence cible)
+    GEMINI_RATE_LIMIT_INITIAL: float = 5.0
+    GEMINI_RATE_LIMIT_MIN: float = 0.5
+    GEMINI_RATE_LIMIT_MAX: float = 30.0
+    GEMINI_MAX_CONCURRENCY: int = 16
+    GEMINI_TARGET_LATENCY_SECONDS: float = 8.0
+    # Nombre de demandes de verset regroupées dans un même appel Gemini
+    GEMINI_BATCH_SIZE: int = 10
+    # Tarif Gemini (USD par million de jetons) pour l'estimation du coût des jobs
+    GEMINI_COST_INPUT_PER_MILLION: float = 0.075
+    GEMINI_COST_OUTPUT_PER_MILLION: float = 0.30
 
     # Firebase Configuration
     FIREBASE_PROJECT_ID: str = ""
@@ -29,6 +51,14 @@ class Settings(BaseSettings):
 
     # Bible Configuration
     DEFAULT_TRANSLATION: str = "FreBBB"
+    # Dossier des instantanés JSON des traductions (téléchargés une seule fois)
+    BIBLE_DATA_DIR: str = "storage/bibles"
+    # Utiliser les corpus binaires compilés (.svb) projetés en mémoire s'ils existent
+    BIBLE_USE_MMAP: bool = True
+    # Traductions chargées en arrière-plan au démarrage (séparées par des virgules)
+    BIBLE_WARMUP_TRANSLATIONS: str = "FreBBB"
+    # Construire aussi les index de recherche pendant le préchauffage
+    BIBLE_WARMUP_SEARCH: bool = True
     ENVIRONMENT: str = "production"
 
     # Image Generation Configuration
@@ -40,6 +70,41 @@ class Settings(BaseSettings):
     # "local", "dalle", "stability", "auto"
     DEFAULT_IMAGE_METHOD: str = "stability"
     IMAGE_CACHE_DAYS: int = 7
+    # URLs des API d'images (pointables sur le faux serveur d'images, hors processus)
+    STABILITY_API_BASE_URL: str = "https://api.stability.ai"
+    OPENAI_API_BASE_URL: str = "https://api.openai.com"
+    # Pool HTTP partagé des API d'images (connexions max, gardées ouvertes, durée d'inactivité)
+    IMAGE_HTTP2: bool = True
+    IMAGE_HTTP_MAX_CONNECTIONS: int = 20
+    IMAGE_HTTP_MAX_KEEPALIVE: int = 10
+    IMAGE_HTTP_KEEPALIVE_SECONDS: float = 60.0
+    # Délais par fournisseur d'images (secondes)
+    IMAGE_TIMEOUT_DALLE_SECONDS: float = 30.0
+    IMAGE_TIMEOUT_STABILITY_SECONDS: float = 60.0
+    IMAGE_TIMEOUT_GEMINI_SECONDS: float = 60.0
+    IMAGE_TIMEOUT_DOWNLOAD_SECONDS: float = 30.0
+    # Rendu local PIL: processus, rendus en file au-delà, attente max d'une place (s) avant placeholder
+    IMAGE_RENDER_WORKERS: int = 2
+    IMAGE_RENDER_QUEUE_SIZE: int = 8
+    IMAGE_RENDER_WAIT_SECONDS: float = 10.0
+    # Déclinaisons des images stockées: largeurs (px), formats (selon Pillow), JPEG de notification FCM
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 1024]
+    IMAGE_VARIANT_FORMATS: List[str] = ["avif", "webp"]
+    IMAGE_NOTIFICATION_WIDTH: int = 1024
+    IMAGE_NOTIFICATION_MAX_BYTES: int = 300_000
+
+    # Fournisseurs externes: "live" (Gemini, Stability/DALL-E, FCM) ou "fake" (simulés hors ligne)
+    PROVIDER_BACKEND: str = "live"
+    # Simulation: latence médiane (s) par fournisseur, dispersion log-normale, taux d'erreurs 5xx,
+    # rafales de 429 (durée toutes les N secondes, 0 = aucune) et graine des tirages
+    FAKE_GEMINI_LATENCY_SECONDS: float = 1.5
+    FAKE_IMAGE_LATENCY_SECONDS: float = 4.0
+    FAKE_FCM_LATENCY_SECONDS: float = 0.05
+    FAKE_LATENCY_SIGMA: float = 0.4
+    FAKE_ERROR_RATE: float = 0.0
+    FAKE_RATE_LIMIT_EVERY_SECONDS: float = 0.0
+    FAKE_RATE_LIMIT_BURST_SECONDS: float = 2.0
+    FAKE_SEED: int = 42
 
 
 settings = Settings()
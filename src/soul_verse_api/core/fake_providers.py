@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import time
+import typing
+import zlib
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from firebase_admin import exceptions as firebase_exceptions
+from firebase_admin import messaging as firebase_messaging
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from src.soul_verse_api.core.config import settings
+
+# Références renvoyées par le faux Gemini (toutes lisibles par parse_references)
+FAKE_REFERENCES = [
+    "Jean 3:16", "Psaumes 23:1", "Philippiens 4:6-7", "Ésaïe 41:10",
+    "Romains 8:28", "Matthieu 11:28", "Josué 1:9", "Lamentations 3:22-23",
+]
+# Taille des fragments du faux flux generate_content_stream
+STREAM_CHUNK_CHARS = 40
+FAKE_IMAGE_SIZE = 64
+
+
+def is_fake_backend() -> bool:
+    """Fournisseurs externes simulés (PROVIDER_BACKEND=fake)"""
+    return settings.PROVIDER_BACKEND == "fake"
+
+
+class FaultProfile:
+    """
+    Comportement simulé d'un fournisseur: latence, erreurs et rafales de 429.
+
+    - latence log-normale de médiane `latency` et de dispersion `sigma`
+    - rafales de 429: les `burst_seconds` premières secondes de chaque
+      période de `every_seconds` (0 = aucune rafale)
+    - erreurs 5xx tirées avec la probabilité `error_rate`
+
+    Les tirages viennent d'un générateur initialisé par FAKE_SEED: pour un
+    même ordre d'appels, un test de charge se rejoue à l'identique.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: float,
+        sigma: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        every_seconds: Optional[float] = None,
+        burst_seconds: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.name = name
+        self.latency = latency
+        self.sigma = settings.FAKE_LATENCY_SIGMA if sigma is None else sigma
+        self.error_rate = settings.FAKE_ERROR_RATE if error_rate is None else error_rate
+        self.every_seconds = settings.FAKE_RATE_LIMIT_EVERY_SECONDS if every_seconds is None else every_seconds
+        self.burst_seconds = settings.FAKE_RATE_LIMIT_BURST_SECONDS if burst_seconds is None else burst_seconds
+        self.random = random.Random(f"{settings.FAKE_SEED if seed is None else seed}:{name}")
+        self.started = time.monotonic()
+        self.stats = {"calls": 0, "rate_limited": 0, "server_error": 0}
+
+    def sample_latency(self) -> float:
+        """Durée simulée d'un appel, en secondes"""
+        if self.latency <= 0:
+            return 0.0
+        return self.latency * math.exp(self.random.gauss(0, self.sigma))
+
+    def fault(self) -> Optional[int]:
+        """Code d'erreur simulé pour l'appel en cours (429, 503) ou None"""
+        self.stats["calls"] += 1
+        if self.every_seconds > 0:
+            elapsed = (time.monotonic() - self.started) % self.every_seconds
+            if elapsed < self.burst_seconds:
+                self.stats["rate_limited"] += 1
+                return 429
+        if self.error_rate > 0 and self.random.random() < self.error_rate:
+            self.stats["server_error"] += 1
+            return 503
+        return None
+
+
+def fake_profile(name: str) -> FaultProfile:
+    """Profil d'un fournisseur ("gemini", "image", "fcm") selon la configuration"""
+    latencies = {
+        "gemini": settings.FAKE_GEMINI_LATENCY_SECONDS,
+        "image": settings.FAKE_IMAGE_LATENCY_SECONDS,
+        "fcm": settings.FAKE_FCM_LATENCY_SECONDS,
+    }
+    return FaultProfile(name, latencies[name])
+
+
+def digest(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:12], 16)
+
+
+# ---------------------------------------------------------------------------
+# Faux google.genai.Client
+# ---------------------------------------------------------------------------
+
+def fake_verse(seed: int, index: Optional[int] = None) -> Dict[str, Any]:
+    verse = {
+        "reference": FAKE_REFERENCES[seed % len(FAKE_REFERENCES)],
+        "reflection": "Réflexion simulée: Dieu t'accompagne aujourd'hui et te donne Sa paix.",
+        "visual_elements": "lumière douce, colombe, ciel apaisé",
+    }
+    return {"index": index, **verse} if index is not None else verse
+
+
+def fake_prayer(seed: int) -> Dict[str, Any]:
+    return {
+        "prayer_title": "Prière simulée",
+        "prayer_text": "Seigneur, merci pour ce jour. Garde-nous dans Ta paix et guide nos pas. Amen.",
+        "blessing": "Que Dieu te bénisse. Amen.",
+        "suggested_verse": FAKE_REFERENCES[seed % len(FAKE_REFERENCES)],
+    }
+
+
+def fake_response_text(prompt: str, config: Optional[types.GenerateContentConfig]) -> str:
+    """Réponse déterministe conforme au schéma de sortie demandé (texte libre sinon)"""
+    seed = digest(prompt)
+    schema = getattr(config, "response_schema", None) if config else None
+    if schema is None:
+        return f"Réponse simulée ({seed % 1000})."
+
+    if typing.get_origin(schema) is list:
+        # Génération groupée: un objet par ligne de demande du prompt
+        count = len(re.findall(r"^\s*\d+\. Émotion:", prompt, re.M)) or 1
+        return json.dumps(
+            [fake_verse(seed + index, index) for index in range(1, count + 1)], ensure_ascii=False)
+
+    fields = getattr(schema, "model_fields", {})
+    if "prayer_text" in fields:
+        return json.dumps(fake_prayer(seed), ensure_ascii=False)
+    return json.dumps(fake_verse(seed), ensure_ascii=False)
+
+
+def fake_api_error(code: int) -> genai_errors.APIError:
+    """Erreur au format de google.genai (ClientError 429, ServerError 503)"""
+    if code == 429:
+        return genai_errors.ClientError(code, {"error": {
+            "code": code, "message": "Quota simulé dépassé", "status": "RESOURCE_EXHAUSTED"}})
+    return genai_errors.ServerError(code, {"error": {
+        "code": code, "message": "Service simulé indisponible", "status": "UNAVAILABLE"}})
+
+
+def fake_usage(prompt: str, text: str) -> types.GenerateContentResponseUsageMetadata:
+    # Ordre de grandeur: ~4 caractères par jeton
+    return types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=len(prompt) // 4,
+        candidates_token_count=len(text) // 4,
+        total_token_count=(len(prompt) + len(text)) // 4,
+    )
+
+
+def fake_response(text: str, usage: Optional[types.GenerateContentResponseUsageMetadata] = None) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))],
+        usage_metadata=usage,
+    )
+
+
+def prompt_text(contents: Any) -> str:
+    """Texte du prompt, au format contents=[{"parts": [{"text": ...}]}] utilisé par GeminiService"""
+    if isinstance(contents, str):
+        return contents
+    return "".join(
+        part.get("text", "") for content in contents for part in content.get("parts", []))
+
+
+class FakeGenaiModels:
+    """Équivalent hors ligne de client.aio.models (generate_content, generate_content_stream)"""
+
+    def __init__(self, profile: FaultProfile):
+        self.profile = profile
+
+    async def generate_content(self, model: str, contents: Any, config: Optional[types.GenerateContentConfig] = None) -> types.GenerateContentResponse:
+        prompt = prompt_text(contents)
+        await asyncio.sleep(self.profile.sample_latency())
+        code = self.profile.fault()
+        if code:
+            raise fake_api_error(code)
+        text = fake_response_text(prompt, config)
+        return fake_response(text, fake_usage(prompt, text))
+
+    async def generate_content_stream(self, model: str, contents: Any, config: Optional[types.GenerateContentConfig] = None) -> AsyncIterator[types.GenerateContentResponse]:
+        prompt = prompt_text(contents)
+        code = self.profile.fault()
+        if code:
+            raise fake_api_error(code)
+        text = fake_response_text(prompt, config)
+        chunks = [text[start:start + STREAM_CHUNK_CHARS] for start in range(0, len(text), STREAM_CHUNK_CHARS)]
+        delay = self.profile.sample_latency() / max(1, len(chunks))
+
+        async def stream():
+            for position, chunk in enumerate(chunks):
+                await asyncio.sleep(delay)
+                # Comme l'API: l'usage cumulé est porté par le dernier fragment
+                last = position == len(chunks) - 1
+                yield fake_response(chunk, fake_usage(prompt, text) if last else None)
+
+        return stream()
+
+
+class FakeGenaiClient:
+    """Remplaçant hors ligne de genai.Client (seule l'interface asynchrone est utilisée)"""
+
+    def __init__(self, profile: Optional[FaultProfile] = None):
+        self.profile = profile or fake_profile("gemini")
+        self.aio = SimpleNamespace(models=FakeGenaiModels(self.profile))
+
+
+# ---------------------------------------------------------------------------
+# Faux serveur d'images Stability / DALL-E
+# ---------------------------------------------------------------------------
+
+def solid_png(seed: int, size: int = FAKE_IMAGE_SIZE) -> bytes:
+    """PNG uni (couleur dérivée de la graine), sans dépendance à PIL"""
+    color = bytes([(seed >> 16) & 0xFF, (seed >> 8) & 0xFF, seed & 0xFF])
+    raw = b"".join(b"\x00" + color * size for _ in range(size))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+def create_fake_image_app(profile: Optional[FaultProfile] = None) -> FastAPI:
+    """
+    Faux serveur des API d'images (mêmes routes et formats de réponse)
+
+    - POST /v1/generation/{engine}/text-to-image (Stability: artefact base64)
+    - POST /v1/images/generations (DALL-E: URL à télécharger)
+    - GET /fake-images/{seed}.png
+
+    Utilisé en processus par ImageGenerationService (PROVIDER_BACKEND=fake),
+    ou lancé à part pour un test de charge:
+        uvicorn src.soul_verse_api.core.fake_providers:fake_image_app --port 8089
+    avec STABILITY_API_BASE_URL / OPENAI_API_BASE_URL = http://localhost:8089
+    """
+    app = FastAPI(title="Fake image providers")
+    app.state.profile = profile or fake_profile("image")
+
+    async def simulate() -> Optional[JSONResponse]:
+        await asyncio.sleep(app.state.profile.sample_latency())
+        code = app.state.profile.fault()
+        if code:
+            return JSONResponse(
+                status_code=code,
+                content={"name": "rate_limit_exceeded" if code == 429 else "service_unavailable",
+                         "message": "Erreur simulée"})
+        return None
+
+    @app.post("/v1/generation/{engine}/text-to-image")
+    async def stability_text_to_image(engine: str, request: Request):
+        payload = await request.json()
+        error = await simulate()
+        if error:
+            return error
+        seed = digest(json.dumps(payload.get("text_prompts", []), sort_keys=True))
+        return {"artifacts": [{
+            "base64": base64.b64encode(solid_png(seed)).decode("ascii"),
+            "seed": seed % 4294967295,
+            "finishReason": "SUCCESS",
+        }]}
+
+    @app.post("/v1/images/generations")
+    async def dalle_generations(request: Request):
+        payload = await request.json()
+        error = await simulate()
+        if error:
+            return error
+        seed = digest(payload.get("prompt", ""))
+        return {"created": int(time.time()), "data": [{"url": f"{request.base_url}fake-images/{seed}.png"}]}
+
+    @app.get("/fake-images/{seed}.png")
+    async def fake_image(seed: int):
+        return Response(content=solid_png(seed), media_type="image/png")
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Faux firebase_admin.messaging
+# ---------------------------------------------------------------------------
+
+class FakeMessaging:
+    """
+    Remplaçant de firebase_admin.messaging: mêmes classes de messages et
+    d'exceptions (déléguées au vrai module), envois simulés sans réseau.
+
+    Les envois restent bloquants comme ceux du SDK (time.sleep): les jobs du
+    scheduler (verset quotidien, prières du matin et du soir) les exécutent
+    via asyncio.to_thread, hors de la boucle d'événements.
+    """
+
+    def __init__(self, profile: Optional[FaultProfile] = None):
+        self.profile = profile or fake_profile("fcm")
+        self.sent = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(firebase_messaging, name)
+
+    def _deliver(self) -> str:
+        time.sleep(self.profile.sample_latency())
+        code = self.profile.fault()
+        if code == 429:
+            raise firebase_messaging.QuotaExceededError("Quota FCM simulé dépassé")
+        if code:
+            raise firebase_exceptions.UnavailableError("FCM simulé indisponible")
+        self.sent += 1
+        return f"projects/fake/messages/{self.sent}"
+
+    def send(self, message: Any, dry_run: bool = False, app: Any = None) -> str:
+        return self._deliver()
+
+    def send_each(self, messages: List[Any], dry_run: bool = False, app: Any = None) -> Any:
+        responses = []
+        for _ in messages:
+            try:
+                responses.append(firebase_messaging.SendResponse({"name": self._deliver()}, None))
+            except firebase_exceptions.FirebaseError as e:
+                responses.append(firebase_messaging.SendResponse(None, e))
+        return firebase_messaging.BatchResponse(responses)
+
+    def send_each_for_multicast(self, multicast_message: Any, dry_run: bool = False, app: Any = None) -> Any:
+        # Versions récentes du SDK: `fids` remplace `tokens`
+        tokens = getattr(multicast_message, "fids", None) or multicast_message.tokens
+        return self.send_each(list(tokens), dry_run, app)
+
+    def subscribe_to_topic(self, tokens: Any, topic: str, app: Any = None) -> Any:
+        self._deliver()
+        count = len(tokens) if isinstance(tokens, list) else 1
+        return firebase_messaging.TopicManagementResponse({"results": [{} for _ in range(count)]})
+
+    def unsubscribe_from_topic(self, tokens: Any, topic: str, app: Any = None) -> Any:
+        return self.subscribe_to_topic(tokens, topic, app)
+
+
+# Instances partagées du processus (créées à l'import, sans effet en mode "live")
+fake_image_app = create_fake_image_app()
+fake_messaging = FakeMessaging()
+_fake_genai_client: Optional[FakeGenaiClient] = None
+
+
+def get_fake_genai_client() -> FakeGenaiClient:
+    """Faux client Gemini partagé par toutes les instances de GeminiService"""
+    global _fake_genai_client
+    if _fake_genai_client is None:
+        _fake_genai_client = FakeGenaiClient()
+    return _fake_genai_client
+
+
+def get_fake_provider_stats() -> Dict[str, Dict[str, int]]:
+    """Appels, 429 et 5xx simulés par fournisseur"""
+    return {
+        "gemini": dict(get_fake_genai_client().profile.stats),
+        "image": dict(fake_image_app.state.profile.stats),
+        "fcm": {**fake_messaging.profile.stats, "sent": fake_messaging.sent},
+    }
@@ -5,6 +5,12 @@ from typing import Dict, List, Optional
 import firebase_admin
 from firebase_admin import credentials, messaging
 
+from src.soul_verse_api.core.fake_providers import fake_messaging, is_fake_backend
+
+# Fake providers: FCM sends are simulated, no network or credentials needed
+if is_fake_backend():
+    messaging = fake_messaging
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -35,6 +41,9 @@ def initialize_firebase():
     """
     Initialize Firebase Admin SDK with service account credentials.
     """
+    if is_fake_backend():
+        logger.info("Fake Firebase backend (PROVIDER_BACKEND=fake): skipping initialization.")
+        return
     if not firebase_admin._apps:
         cred = credentials.Certificate(
             "src/soul_verse_api/core/soulverse-app-c69392a6c184.json")
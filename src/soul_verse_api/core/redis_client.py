@@ -8,6 +8,22 @@ from redis import Redis
 
 from src.soul_verse_api.core.config import settings
 
+# Suppression atomique d'une clé si elle a encore la valeur attendue (verrou détenu)
+DELETE_IF_EQUALS_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Prolongation atomique d'un verrou encore détenu (même valeur)
+EXPIRE_IF_EQUALS_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
 
 class RedisClient:
     """Client Redis pour la gestion du cache"""
@@ -83,6 +99,78 @@ class RedisClient:
             print(f"⚠️ Erreur lors du stockage dans Redis: {e}")
             return False
 
+    def set_if_absent(self, key: str, value: Any, expire: int = 30) -> Optional[bool]:
+        """
+        Stocker une valeur seulement si la clé n'existe pas (SET NX EX), pour les verrous
+
+        Args:
+            key: Clé du verrou
+            value: Valeur à stocker (sera sérialisée en JSON)
+            expire: Durée de vie en secondes (libère un verrou abandonné)
+
+        Returns:
+            True si la clé a été posée, False si elle existait déjà,
+            None si Redis est indisponible
+        """
+        if not self._redis:
+            return None
+
+        try:
+            serialized_value = json.dumps(
+                value, ensure_ascii=False, default=str)
+            return bool(self._redis.set(key, serialized_value, ex=expire, nx=True))
+        except Exception as e:
+            print(f"⚠️ Erreur lors de la pose du verrou Redis: {e}")
+            return None
+
+    def expire_if_equals(self, key: str, value: Any, expire: int) -> bool:
+        """
+        Prolonger une clé seulement si elle a encore cette valeur (verrou détenu)
+
+        Args:
+            key: Clé du verrou
+            value: Valeur posée par set_if_absent (jeton du détenteur)
+            expire: Nouvelle durée de vie en secondes
+
+        Returns:
+            True si la durée de vie a été prolongée, False sinon (verrou perdu)
+        """
+        if not self._redis:
+            return False
+
+        try:
+            serialized_value = json.dumps(
+                value, ensure_ascii=False, default=str)
+            return bool(self._redis.eval(EXPIRE_IF_EQUALS_SCRIPT, 1, key, serialized_value, expire))
+        except Exception as e:
+            print(f"⚠️ Erreur lors de la prolongation du verrou Redis: {e}")
+            return False
+
+    def delete_if_equals(self, key: str, value: Any) -> bool:
+        """
+        Supprimer une clé seulement si elle a encore cette valeur (libération de verrou)
+
+        La comparaison et la suppression sont atomiques (script Lua): un verrou
+        expiré puis repris par un autre processus n'est pas supprimé.
+
+        Args:
+            key: Clé du verrou
+            value: Valeur posée par set_if_absent (jeton du détenteur)
+
+        Returns:
+            True si la clé a été supprimée, False sinon
+        """
+        if not self._redis:
+            return False
+
+        try:
+            serialized_value = json.dumps(
+                value, ensure_ascii=False, default=str)
+            return bool(self._redis.eval(DELETE_IF_EQUALS_SCRIPT, 1, key, serialized_value))
+        except Exception as e:
+            print(f"⚠️ Erreur lors de la libération du verrou Redis: {e}")
+            return False
+
     def delete(self, key: str) -> bool:
         """
         Supprimer une clé du cache
@@ -2,14 +2,18 @@ from src.soul_verse_api.api.v1 import user
 from src.soul_verse_api.api.v1 import verses
 from src.soul_verse_api.api.v1 import scheduler
 from src.soul_verse_api.api.v1 import prayers
+from src.soul_verse_api.api.static_images import VerseImageFiles
 from src.soul_verse_api.database.session import Base, engine
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from pathlib import Path
+import asyncio
 from src.soul_verse_api.core.config import settings
 
 from src.soul_verse_api.core.redis_client import redis_client
+from src.soul_verse_api.services.bible_corpus import bible_corpus
+from src.soul_verse_api.services.image_generation_service import get_image_service
 from src.soul_verse_api.services.scheduler_service import scheduler_service
 from src.soul_verse_api.utils.functions import is_development_environment
 
@@ -52,6 +56,10 @@ async def startup_event():
     except Exception as e:
         print(f"⚠️ Erreur démarrage planificateur: {e}")
 
+    # Préchauffage du corpus biblique en arrière-plan (voir /health/ready)
+    app.state.warmup_task = asyncio.create_task(bible_corpus.warm_up())
+    print(f"🔥 Préchauffage du corpus lancé: {', '.join(bible_corpus.warmup_translations())}")
+
     print("✅ SoulVerse API prête !")
 
 
@@ -60,6 +68,11 @@ async def shutdown_event():
     """Nettoyage à l'arrêt de l'API."""
     print("🛑 Arrêt de SoulVerse API...")
 
+    # Arrêt du préchauffage s'il est encore en cours
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+
     # Déconnexion Redis
     try:
         redis_client.disconnect()
@@ -74,6 +87,13 @@ async def shutdown_event():
     except Exception as e:
         print(f"⚠️ Erreur arrêt planificateur: {e}")
 
+    # Fermeture des pools d'images, HTTP et rendu (après le planificateur qui les utilise)
+    try:
+        await get_image_service().aclose()
+        print("✅ Pools HTTP et rendu des images fermés")
+    except Exception as e:
+        print(f"⚠️ Erreur fermeture pool HTTP images: {e}")
+
     print("👋 SoulVerse API arrêtée")
 
 Base.metadata.create_all(bind=engine)
@@ -87,11 +107,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configuration des fichiers statiques pour les images
+# Configuration des fichiers statiques pour les images (déclinaisons WebP/AVIF négociées)
 static_dir = Path("storage/verse_images")
 static_dir.mkdir(parents=True, exist_ok=True)
 app.mount("/static/verse_images",
-          StaticFiles(directory=str(static_dir)), name="verse_images")
+          VerseImageFiles(directory=str(static_dir), store=get_image_service().store), name="verse_images")
 
 
 @app.get("/", tags=["system"])
@@ -119,6 +139,29 @@ async def health():
     }
 
 
+@app.get("/health/ready", tags=["system"])
+async def readiness():
+    """
+    Readiness: 200 seulement quand le corpus et ses index sont chargés
+
+    Le load balancer n'envoie pas de trafic à un worker encore froid (503).
+    """
+    warmup = bible_corpus.get_warmup_status()
+    ready = bible_corpus.is_ready()
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming_up" if warmup["status"] in ("pending", "running", "retrying") else "not_ready",
+            "warmup": warmup,
+            "loaded_translations": [
+                code for code in bible_corpus.available_translations if bible_corpus.is_loaded(code)
+            ],
+            "redis_connected": redis_client.is_connected() if redis_client else False,
+        }
+    )
+
+
 # Inclusion des routers
 app.include_router(router=user.router)
 app.include_router(router=verses.router)
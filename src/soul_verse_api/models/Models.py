@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Numeric, String, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Numeric, String, DateTime
 from sqlalchemy.sql import func
 
 from sqlalchemy.orm import relationship
@@ -55,6 +55,11 @@ class UserJournal(Base):
 
 class BibleVerse(Base):
     __tablename__ = "bible_verses"
+    __table_args__ = (
+        # Accès direct à un verset et parcours d'un chapitre dans l'ordre
+        Index("ix_bible_verses_reference", "translation",
+              "book", "chapter", "verse", unique=True),
+    )
 
     id = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid4, unique=True, nullable=False
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
@@ -71,6 +71,12 @@ class VerseGenerationRequest(BaseModel):
     image_method: str = "auto"  # "auto", "local", "dalle", "stability"
 
 
+class VerseBatchRequest(BaseModel):
+    """Request pour récupérer plusieurs références en un seul appel"""
+    references: List[str]           # "Philippiens 4:6-7", "Jean 3:16; 1 Jean 4:8"
+    translation: str = "FreBBB"
+
+
 class BulkVerseResponse(BaseModel):
     """Réponse pour génération en masse"""
     success: bool
@@ -79,3 +85,27 @@ class BulkVerseResponse(BaseModel):
     results: List[Dict[str, Any]]
     note: Optional[str] = None
     timestamp: datetime
+
+
+class AIVerseResponse(BaseModel):
+    """Réponse IA attendue pour un verset (schéma de génération et validation)"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    reference: str = Field(min_length=1)        # "Livre Chapitre:Verset"
+    reflection: str = Field(min_length=1)       # Réflexion pastorale
+    visual_elements: str = ""                   # Éléments visuels pour l'image
+
+
+class AIBatchVerseItem(AIVerseResponse):
+    """Élément d'une réponse IA groupée (index de la demande, à partir de 1)"""
+    index: int = Field(ge=1)
+
+
+class AIPrayerResponse(BaseModel):
+    """Réponse IA attendue pour une prière du matin ou du soir"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    prayer_title: str = ""
+    prayer_text: str = Field(min_length=1)
+    blessing: str = ""
+    suggested_verse: str = ""
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Format binaire compact d'une traduction biblique (.svb), lu par mmap.
+
+Toutes les sections sont alignées sur 4 octets, entiers little-endian:
+
+    en-tête      magic, version, compteurs et décalages des sections
+    livres       noms UTF-8 séparés par "\\n"
+    répertoire   book_chapter_starts  uint32[livres + 1]
+                 chapter_numbers      uint16[chapitres]
+                 chapter_starts       uint32[chapitres + 1]
+                 verse_numbers        uint16[versets]
+    textes       text_offsets         uint32[versets + 1] (décalages dans la table)
+                 table de chaînes     textes UTF-8 concaténés
+
+Le fichier étant projeté en lecture seule, tous les workers uvicorn partagent
+les mêmes pages du cache système et aucun parsing JSON n'a lieu au démarrage.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterator
+
+from src.soul_verse_api.services.bible_index import TranslationIndex
+
+MAGIC = b"SVBIBLE1"
+FORMAT_VERSION = 1
+# magic, version, livres, chapitres, versets, puis (décalage, taille) des 7 sections
+HEADER = struct.Struct("<8sIIII" + "II" * 7)
+
+
+def _align(size: int) -> int:
+    return (size + 3) & ~3
+
+
+class MappedTexts:
+    """Textes des versets lus à la demande depuis la table de chaînes projetée"""
+
+    def __init__(self, offsets: memoryview, strings: memoryview):
+        self.offsets = offsets
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, pos: int) -> str:
+        if pos < 0:
+            pos += len(self)
+        return bytes(self.strings[self.offsets[pos]:self.offsets[pos + 1]]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for pos in range(len(self)):
+            yield self[pos]
+
+
+def compile_translation(index: TranslationIndex, output_path: Path) -> int:
+    """
+    Écrit l'index d'une traduction au format binaire .svb
+
+    Args:
+        index: Index de la traduction (construit depuis le JSON)
+        output_path: Fichier de sortie
+
+    Returns:
+        Taille du fichier écrit, en octets
+    """
+    encoded_texts = [text.encode("utf-8") for text in index.texts]
+    text_offsets = array("I", [0])
+    for encoded in encoded_texts:
+        text_offsets.append(text_offsets[-1] + len(encoded))
+
+    sections = [
+        "\n".join(index.book_names).encode("utf-8"),
+        array("I", index.book_chapter_starts),
+        array("H", index.chapter_numbers),
+        array("I", index.chapter_starts),
+        array("H", index.verse_numbers),
+        text_offsets,
+        b"".join(encoded_texts),
+    ]
+    payloads = []
+    for section in sections:
+        if isinstance(section, array):
+            if sys.byteorder != "little":
+                section.byteswap()
+            section = section.tobytes()
+        payloads.append(section)
+
+    layout = []
+    offset = _align(HEADER.size)
+    for payload in payloads:
+        layout.extend([offset, len(payload)])
+        offset = _align(offset + len(payload))
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(index.book_names),
+        len(index.chapter_numbers), len(index), *layout
+    )
+
+    # Écriture atomique: les workers ne voient jamais un fichier partiel
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as output:
+        output.write(header)
+        for section_offset, payload in zip(layout[::2], payloads):
+            output.write(b"\0" * (section_offset - output.tell()))
+            output.write(payload)
+    os.replace(tmp_path, output_path)
+    return output_path.stat().st_size
+
+
+def load_mapped_translation(translation: str, path: Path) -> TranslationIndex:
+    """
+    Projette un fichier .svb en mémoire (lecture seule) et retourne son index
+
+    Args:
+        translation: Code de la traduction
+        path: Fichier binaire compilé
+
+    Returns:
+        Index dont les tableaux et textes pointent directement dans le fichier
+    """
+    if sys.byteorder != "little":
+        raise ValueError("Format .svb non supporté sur une plateforme big-endian")
+
+    with open(path, "rb") as binary:
+        mapping = mmap.mmap(binary.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+    fields = HEADER.unpack_from(view, 0)
+    magic, version = fields[0], fields[1]
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Fichier Bible binaire invalide: {path}")
+
+    layout = fields[5:]
+
+    def section(i: int) -> memoryview:
+        offset, size = layout[2 * i], layout[2 * i + 1]
+        return view[offset:offset + size]
+
+    book_names = bytes(section(0)).decode("utf-8").split("\n")
+    index = TranslationIndex(
+        translation=translation,
+        book_names=book_names,
+        book_chapter_starts=section(1).cast("I"),
+        chapter_numbers=section(2).cast("H"),
+        chapter_starts=section(3).cast("I"),
+        verse_numbers=section(4).cast("H"),
+        texts=MappedTexts(section(5).cast("I"), section(6)),
+    )
+    # La projection reste ouverte tant que l'index est vivant
+    index.mapping = mapping
+    return index
+
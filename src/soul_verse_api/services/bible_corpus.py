@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from src.soul_verse_api.core.config import settings
+from src.soul_verse_api.services.bible_binary import load_mapped_translation
+from src.soul_verse_api.services.bible_index import TranslationIndex
+from src.soul_verse_api.services.bible_search import SearchIndex
+from src.soul_verse_api.services.verse_recommender import VerseRecommender
+
+# Configuration des logs
+logger = logging.getLogger(__name__)
+
+GITHUB_BASE_URL = "https://raw.githubusercontent.com/scrollmapper/bible_databases/master/formats/json"
+
+# Relance des étapes de préchauffage en échec (téléchargement transitoire...): 5 s, 10 s, ... 5 min
+WARMUP_RETRY_BASE_SECONDS = 5.0
+WARMUP_RETRY_MAX_SECONDS = 300.0
+
+AVAILABLE_TRANSLATIONS = {
+    "FreBBB": "FreBBB.json",      # Français Bible Bovet Bonnet
+    "KJV": "KJV.json",            # King James Version
+    "FreCrampon": "FreCrampon.json"  # Bible Crampon
+}
+
+
+def current_rss_bytes() -> int:
+    """
+    Mémoire résidente (RSS) actuelle du processus, en octets
+
+    Returns:
+        RSS en octets, ou 0 si la plateforme ne permet pas de la mesurer
+    """
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        # ru_maxrss est en kilo-octets sous Linux (pic, pas valeur courante)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
+class BibleCorpus:
+    """
+    Corpus biblique résident: chaque traduction est chargée une seule fois par
+    processus depuis un instantané local, puis servie depuis la mémoire.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.data_dir = Path(data_dir or settings.BIBLE_DATA_DIR)
+        self.github_base_url = GITHUB_BASE_URL
+        self.available_translations = AVAILABLE_TRANSLATIONS
+        self._translations: Dict[str, TranslationIndex] = {}
+        self._search_indexes: Dict[str, SearchIndex] = {}
+        self._recommenders: Dict[str, VerseRecommender] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Préchauffage au démarrage: pending -> running (<-> retrying) -> ready | cancelled
+        self._warmup: Dict[str, Any] = {
+            "status": "pending",
+            "total_steps": 0,
+            "completed_steps": 0,
+            "current": None,
+            "errors": [],
+            "attempts": 0,
+            "next_retry_at": None,
+            "started_at": None,
+            "finished_at": None,
+        }
+
+    def snapshot_path(self, translation: str) -> Path:
+        """Chemin de l'instantané JSON local d'une traduction"""
+        return self.data_dir / self.available_translations[translation]
+
+    def binary_path(self, translation: str) -> Path:
+        """Chemin du corpus binaire compilé (.svb) d'une traduction"""
+        return self.data_dir / f"{translation}.svb"
+
+    def ensure_snapshot(self, translation: str) -> str:
+        """
+        Garantit la présence de l'instantané JSON local (bloquant)
+
+        Returns:
+            "disk" si l'instantané existait, "network" s'il a été téléchargé
+        """
+        path = self.snapshot_path(translation)
+        if path.exists():
+            return "disk"
+        self._download_snapshot(translation, path)
+        return "network"
+
+    def warmup_translations(self) -> List[str]:
+        """Traductions à préchauffer (configuration), limitées aux disponibles"""
+        codes = [code.strip() for code in settings.BIBLE_WARMUP_TRANSLATIONS.split(",") if code.strip()]
+        return [code for code in dict.fromkeys(codes) if code in self.available_translations]
+
+    async def warm_up(self, translations: Optional[List[str]] = None, search: Optional[bool] = None):
+        """
+        Charge et indexe les traductions en arrière-plan, avec suivi de progression
+
+        Les étapes en échec sont relancées avec un délai croissant (plafonné)
+        jusqu'à réussir: une erreur passagère ne laisse pas le worker hors
+        service pour toute sa durée de vie.
+
+        Args:
+            translations: Codes à charger (configuration par défaut)
+            search: Construire aussi les index de recherche (configuration par défaut)
+        """
+        translations = translations if translations is not None else self.warmup_translations()
+        search = settings.BIBLE_WARMUP_SEARCH if search is None else search
+        steps = [("corpus", code) for code in translations]
+        if search:
+            steps += [("search", code) for code in translations]
+            steps += [("recommend", code) for code in translations]
+
+        self._warmup.update({
+            "status": "running",
+            "total_steps": len(steps),
+            "completed_steps": 0,
+            "current": None,
+            "errors": [],
+            "attempts": 0,
+            "next_retry_at": None,
+            "started_at": time.time(),
+            "finished_at": None,
+        })
+        logger.info(f"🔥 Préchauffage du corpus: {', '.join(translations) or 'aucune traduction'}")
+
+        while True:
+            self._warmup["attempts"] += 1
+            self._warmup["errors"] = []
+            failed = []
+            for kind, translation in steps:
+                self._warmup["current"] = f"{kind}:{translation}"
+                try:
+                    if kind == "corpus":
+                        await self.get(translation)
+                    elif kind == "search":
+                        await self.get_search_index(translation)
+                    else:
+                        await self.get_recommender(translation)
+                except asyncio.CancelledError:
+                    self._warmup["status"] = "cancelled"
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Préchauffage {kind} {translation} échoué: {e}")
+                    self._warmup["errors"].append(f"{kind}:{translation}: {e}")
+                    failed.append((kind, translation))
+                    continue
+
+                self._warmup["completed_steps"] += 1
+                logger.info(
+                    f"🔥 Préchauffage {self._warmup['completed_steps']}/{self._warmup['total_steps']}: {kind} {translation}")
+
+            self._warmup["current"] = None
+            if not failed:
+                break
+
+            # Seules les étapes en échec sont relancées (les autres restent résidentes)
+            steps = failed
+            delay = min(WARMUP_RETRY_MAX_SECONDS,
+                        WARMUP_RETRY_BASE_SECONDS * 2 ** (self._warmup["attempts"] - 1))
+            self._warmup["status"] = "retrying"
+            self._warmup["next_retry_at"] = time.time() + delay
+            logger.warning(
+                f"🔁 Préchauffage: {len(failed)} étape(s) en échec, nouvelle tentative dans {delay:.0f}s")
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._warmup["status"] = "cancelled"
+                raise
+            self._warmup["status"] = "running"
+            self._warmup["next_retry_at"] = None
+
+        self._warmup["finished_at"] = time.time()
+        self._warmup["status"] = "ready"
+        logger.info(
+            f"✅ Préchauffage terminé ({self._warmup['status']}) en "
+            f"{self._warmup['finished_at'] - self._warmup['started_at']:.2f}s")
+
+    def is_ready(self) -> bool:
+        """Vrai une fois toutes les étapes du préchauffage réussies (relances comprises)"""
+        return self._warmup["status"] == "ready"
+
+    def get_warmup_status(self) -> Dict[str, Any]:
+        """État du préchauffage (progression, erreurs)"""
+        status = dict(self._warmup)
+        status["errors"] = list(status["errors"])
+        return status
+
+    def is_loaded(self, translation: str) -> bool:
+        """Indique si la traduction est déjà résidente en mémoire"""
+        return translation in self._translations
+
+    async def get(self, translation: str) -> TranslationIndex:
+        """
+        Retourne l'index d'une traduction, en la chargeant au premier appel
+
+        Args:
+            translation: Code de la traduction (ex: "FreBBB")
+
+        Returns:
+            Index de la traduction (recherche de versets en O(1))
+        """
+        if translation not in self.available_translations:
+            raise ValueError(f"Traduction {translation} non disponible")
+
+        index = self._translations.get(translation)
+        if index is not None:
+            return index
+
+        # Un seul chargement par traduction, même sous requêtes concurrentes
+        lock = self._locks.setdefault(translation, asyncio.Lock())
+        async with lock:
+            index = self._translations.get(translation)
+            if index is None:
+                # Lecture disque, parsing JSON et indexation hors de la boucle d'événements
+                index = await asyncio.to_thread(self._load, translation)
+            return index
+
+    async def get_search_index(self, translation: str) -> SearchIndex:
+        """
+        Retourne l'index plein texte d'une traduction (construit au premier appel)
+
+        Args:
+            translation: Code de la traduction
+
+        Returns:
+            Index inversé de la traduction
+        """
+        search_index = self._search_indexes.get(translation)
+        if search_index is not None:
+            return search_index
+
+        index = await self.get(translation)
+        lock = self._locks.setdefault(f"search:{translation}", asyncio.Lock())
+        async with lock:
+            search_index = self._search_indexes.get(translation)
+            if search_index is None:
+                search_index = await asyncio.to_thread(
+                    self._build_search_index, translation, index)
+            return search_index
+
+    async def get_recommender(self, translation: str) -> VerseRecommender:
+        """
+        Retourne le recommandeur humeur -> versets d'une traduction (construit au premier appel)
+
+        Args:
+            translation: Code de la traduction
+
+        Returns:
+            Recommandeur local (matrice versets × concepts)
+        """
+        recommender = self._recommenders.get(translation)
+        if recommender is not None:
+            return recommender
+
+        search_index = await self.get_search_index(translation)
+        lock = self._locks.setdefault(f"recommend:{translation}", asyncio.Lock())
+        async with lock:
+            recommender = self._recommenders.get(translation)
+            if recommender is None:
+                recommender = await asyncio.to_thread(
+                    self._build_recommender, translation, search_index)
+            return recommender
+
+    def _build_recommender(self, translation: str, search_index: SearchIndex) -> VerseRecommender:
+        """Construit le recommandeur d'une traduction (bloquant)"""
+        started = time.perf_counter()
+        recommender = VerseRecommender(search_index)
+        recommend_seconds = time.perf_counter() - started
+
+        self._recommenders[translation] = recommender
+        self._metrics.setdefault(translation, {}).update({
+            "recommender_seconds": round(recommend_seconds, 4),
+            "recommender_bytes": recommender.scores.nbytes,
+        })
+
+        logger.info(
+            f"🧭 Recommandeur {translation} construit ({len(recommender.concepts)} concepts) en {recommend_seconds:.2f}s")
+        return recommender
+
+    def _build_search_index(self, translation: str, index: TranslationIndex) -> SearchIndex:
+        """Construit l'index inversé d'une traduction (bloquant)"""
+        started = time.perf_counter()
+        search_index = SearchIndex(index)
+        search_seconds = time.perf_counter() - started
+
+        self._search_indexes[translation] = search_index
+        self._metrics.setdefault(translation, {}).update({
+            "search_index_seconds": round(search_seconds, 4),
+            "search_terms": search_index.term_count(),
+        })
+
+        logger.info(
+            f"🔎 Index de recherche {translation} construit ({search_index.term_count()} termes) en {search_seconds:.2f}s")
+        return search_index
+
+    def _load(self, translation: str) -> TranslationIndex:
+        """Charge une traduction (bloquant): corpus binaire projeté, sinon JSON"""
+        binary_path = self.binary_path(translation)
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+
+        if settings.BIBLE_USE_MMAP and binary_path.exists():
+            # Aucun parsing: les tableaux pointent directement dans le fichier
+            index = load_mapped_translation(translation, binary_path)
+            path = binary_path
+            source = "mmap"
+            load_seconds = time.perf_counter() - started
+            index_seconds = 0.0
+        else:
+            path = self.snapshot_path(translation)
+            source = self.ensure_snapshot(translation)
+            started = time.perf_counter()
+
+            with open(path, "r", encoding="utf-8") as snapshot:
+                data = json.load(snapshot)
+
+            load_seconds = time.perf_counter() - started
+
+            # Index compact puis libération de l'arbre JSON (dicts imbriqués)
+            started = time.perf_counter()
+            index = TranslationIndex.from_json(translation, data)
+            index_seconds = time.perf_counter() - started
+            del data
+
+        rss_after = current_rss_bytes()
+
+        stat = path.stat()
+        index.fingerprint = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+        self._translations[translation] = index
+        self._metrics[translation] = {
+            "source": source,
+            "snapshot_path": str(path),
+            "snapshot_bytes": stat.st_size,
+            "books": len(index.book_names),
+            "verses": len(index),
+            "load_seconds": round(load_seconds, 4),
+            "index_seconds": round(index_seconds, 4),
+            "rss_delta_bytes": max(rss_after - rss_before, 0),
+            "loaded_at": time.time(),
+        }
+
+        logger.info(
+            f"📚 Traduction {translation} chargée ({len(index)} versets) en {load_seconds + index_seconds:.2f}s depuis {source}")
+        return index
+
+    def _download_snapshot(self, translation: str, path: Path):
+        """Télécharge une traduction depuis GitHub et l'enregistre sur disque"""
+        url = f"{self.github_base_url}/{self.available_translations[translation]}"
+        logger.info(
+            f"⬇️ Instantané {translation} absent, téléchargement depuis {url}")
+
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise Exception(f"Erreur chargement Bible {translation}: {e}")
+
+        # Écriture atomique pour ne jamais laisser un fichier partiel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(response.content)
+        os.replace(tmp_path, path)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Métriques du corpus résident
+
+        Returns:
+            Temps de chargement et empreinte mémoire par traduction
+        """
+        return {
+            "data_dir": str(self.data_dir),
+            "loaded_translations": list(self._translations.keys()),
+            "search_indexes": list(self._search_indexes.keys()),
+            "recommenders": list(self._recommenders.keys()),
+            "translations": dict(self._metrics),
+            "process_rss_bytes": current_rss_bytes(),
+            "warmup": self.get_warmup_status(),
+        }
+
+
+# Instance globale du corpus (une par processus)
+bible_corpus = BibleCorpus()
+
+
+def get_bible_corpus() -> BibleCorpus:
+    """Dependency pour obtenir le corpus biblique"""
+    return bible_corpus
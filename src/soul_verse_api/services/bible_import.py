@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Import en masse d'une traduction dans la table bible_verses via COPY.
+
+Les lignes sont produites à la volée depuis l'index du corpus et envoyées à
+PostgreSQL par un unique COPY FROM STDIN dans une table temporaire, puis
+fusionnées dans bible_verses (INSERT ... ON CONFLICT), dans une seule
+transaction. Les versets existants gardent leur id: les lignes de
+verses_with_reflections qui les référencent restent valides.
+"""
+
+import csv
+import io
+import logging
+import time
+from typing import Any, Dict, Iterator, Optional
+from uuid import uuid4
+
+from src.soul_verse_api.services.bible_index import TranslationIndex
+
+# Configuration des logs
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = ("id", "book", "chapter", "verse", "text", "translation")
+STAGING_SQL = (
+    "CREATE TEMP TABLE bible_verses_staging "
+    "(LIKE bible_verses INCLUDING DEFAULTS) ON COMMIT DROP"
+)
+COPY_SQL = (
+    f"COPY bible_verses_staging ({', '.join(COPY_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+REFERENCE_INDEX_EXISTS_SQL = "SELECT to_regclass('ix_bible_verses_reference') IS NOT NULL"
+# Doublons antérieurs à l'index unique: on garde la ligne référencée par une
+# réflexion (sinon la plus petite), les références des autres lui sont rattachées
+DUPLICATES_SQL = """
+CREATE TEMP TABLE bible_verses_duplicates ON COMMIT DROP AS
+SELECT id, keep_id FROM (
+    SELECT b.id, first_value(b.id) OVER (
+        PARTITION BY b.translation, b.book, b.chapter, b.verse
+        ORDER BY EXISTS (
+            SELECT 1 FROM verses_with_reflections r WHERE r.verse_id = b.id
+        ) DESC, b.id
+    ) AS keep_id
+    FROM bible_verses b
+) ranked
+WHERE id <> keep_id
+"""
+REPOINT_DUPLICATES_SQL = (
+    "UPDATE verses_with_reflections r SET verse_id = d.keep_id "
+    "FROM bible_verses_duplicates d WHERE r.verse_id = d.id"
+)
+DELETE_DUPLICATES_SQL = (
+    "DELETE FROM bible_verses b USING bible_verses_duplicates d WHERE b.id = d.id"
+)
+REFERENCE_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_bible_verses_reference "
+    "ON bible_verses (translation, book, chapter, verse)"
+)
+# Seuls les versets nouveaux ou dont le texte a changé sont écrits
+UPSERT_SQL = f"""
+INSERT INTO bible_verses ({', '.join(COPY_COLUMNS)})
+SELECT {', '.join(COPY_COLUMNS)} FROM bible_verses_staging
+ON CONFLICT (translation, book, chapter, verse)
+DO UPDATE SET text = EXCLUDED.text
+WHERE bible_verses.text IS DISTINCT FROM EXCLUDED.text
+"""
+# Versets disparus de la traduction, sauf ceux encore référencés par une réflexion
+DELETE_STALE_SQL = """
+DELETE FROM bible_verses b
+WHERE b.translation = %s
+  AND NOT EXISTS (
+    SELECT 1 FROM bible_verses_staging s
+    WHERE s.book = b.book AND s.chapter = b.chapter AND s.verse = b.verse
+  )
+  AND NOT EXISTS (
+    SELECT 1 FROM verses_with_reflections r WHERE r.verse_id = b.id
+  )
+"""
+# Nombre de lignes CSV encodées par bloc envoyé au serveur
+COPY_BATCH_ROWS = 2_000
+
+
+class CopyStream(io.RawIOBase):
+    """Flux lisible (read) alimenté par un itérateur de blocs d'octets"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        self.buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+
+        if size < 0:
+            data, self.buffer = self.buffer, b""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def iter_copy_chunks(index: TranslationIndex) -> Iterator[bytes]:
+    """Lignes CSV de la traduction, par blocs de COPY_BATCH_ROWS versets"""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+
+    for book_id, book in enumerate(index.book_names):
+        first_slot = index.book_chapter_starts[book_id]
+        end_slot = index.book_chapter_starts[book_id + 1]
+        for slot in range(first_slot, end_slot):
+            chapter = index.chapter_numbers[slot]
+            for pos in range(index.chapter_starts[slot], index.chapter_starts[slot + 1]):
+                writer.writerow((
+                    uuid4(), book, chapter, index.verse_numbers[pos],
+                    index.text(pos), index.translation
+                ))
+                if (pos + 1) % COPY_BATCH_ROWS == 0:
+                    yield output.getvalue().encode("utf-8")
+                    output.seek(0)
+                    output.truncate()
+
+    if output.tell():
+        yield output.getvalue().encode("utf-8")
+
+
+def import_translation(index: TranslationIndex, engine: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Met à jour une traduction dans bible_verses en une transaction
+
+    Les versets sont chargés par COPY dans une table temporaire puis fusionnés
+    (insertion des nouveaux, mise à jour des textes modifiés): les id existants,
+    cibles de verses_with_reflections.verse_id, sont conservés.
+
+    Args:
+        index: Index de la traduction (corpus résident)
+        engine: Moteur SQLAlchemy PostgreSQL (celui de l'application par défaut)
+
+    Returns:
+        Statistiques de l'import (versets, écrits, supprimés, durée)
+    """
+    if engine is None:
+        from src.soul_verse_api.database.session import engine
+
+    started = time.perf_counter()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+
+        # Index unique requis par ON CONFLICT: doublons fusionnés avant sa création
+        cursor.execute(REFERENCE_INDEX_EXISTS_SQL)
+        if not cursor.fetchone()[0]:
+            cursor.execute(DUPLICATES_SQL)
+            cursor.execute(REPOINT_DUPLICATES_SQL)
+            cursor.execute(DELETE_DUPLICATES_SQL)
+            if cursor.rowcount:
+                logger.warning(f"⚠️ {cursor.rowcount} versets en double fusionnés avant l'index unique")
+            cursor.execute(REFERENCE_INDEX_SQL)
+
+        cursor.execute(STAGING_SQL)
+        cursor.copy_expert(COPY_SQL, CopyStream(iter_copy_chunks(index)))
+        imported = cursor.rowcount
+        cursor.execute(UPSERT_SQL)
+        written = cursor.rowcount
+        cursor.execute(DELETE_STALE_SQL, (index.translation,))
+        removed = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        logger.exception(f"❌ Import de {index.translation} annulé")
+        raise
+    finally:
+        connection.close()
+
+    stats = {
+        "translation": index.translation,
+        "imported": imported,
+        "written": written,
+        "removed": removed,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info(
+        f"✅ {index.translation}: {imported} versets importés ({written} écrits, {removed} supprimés) en {stats['seconds']}s")
+    return stats
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Identifiant canonique d'un verset: livre * 1_000_000 + chapitre * 1_000 + verset
+BOOK_ID_FACTOR = 1_000_000
+CHAPTER_ID_FACTOR = 1_000
+
+
+def make_verse_id(book_id: int, chapter: int, verse: int) -> int:
+    """Identifiant entier canonique d'un verset (commun à toutes les traductions)"""
+    return book_id * BOOK_ID_FACTOR + chapter * CHAPTER_ID_FACTOR + verse
+
+
+def split_verse_id(verse_id: int) -> Tuple[int, int, int]:
+    """Décompose un identifiant canonique en (livre, chapitre, verset)"""
+    book_id, rest = divmod(verse_id, BOOK_ID_FACTOR)
+    chapter, verse = divmod(rest, CHAPTER_ID_FACTOR)
+    return book_id, chapter, verse
+
+
+class TranslationIndex:
+    """
+    Index compact d'une traduction biblique.
+
+    Les versets sont stockés à plat, dans l'ordre canonique. Chaque livre a
+    un identifiant entier (sa position), et deux répertoires de décalages
+    permettent de retrouver un verset sans parcourir le corpus:
+
+    - book_chapter_starts[b] .. book_chapter_starts[b + 1]: chapitres du livre b
+    - chapter_starts[c] .. chapter_starts[c + 1]: versets du chapitre c
+    """
+
+    def __init__(
+        self,
+        translation: str,
+        book_names: List[str],
+        book_chapter_starts: Sequence[int],
+        chapter_numbers: Sequence[int],
+        chapter_starts: Sequence[int],
+        verse_numbers: Sequence[int],
+        texts: Sequence[str],
+    ):
+        self.translation = translation
+        self.book_names = book_names
+        self.book_chapter_starts = book_chapter_starts
+        self.chapter_numbers = chapter_numbers
+        self.chapter_starts = chapter_starts
+        self.verse_numbers = verse_numbers
+        self.texts = texts
+        # Projection mmap sous-jacente si l'index est chargé depuis un .svb
+        self.mapping: Optional[Any] = None
+        # Empreinte du fichier source (taille, date), base des ETag HTTP
+        self.fingerprint: str = ""
+        self.book_ids: Dict[str, int] = {
+            name.lower(): book_id for book_id, name in enumerate(book_names)
+        }
+
+    @classmethod
+    def from_json(cls, translation: str, data: Dict[str, Any]) -> "TranslationIndex":
+        """
+        Construit l'index depuis le format JSON scrollmapper
+
+        Args:
+            translation: Code de la traduction
+            data: Données JSON (books -> chapters -> verses)
+
+        Returns:
+            Index de la traduction
+        """
+        book_names: List[str] = []
+        book_chapter_starts = array("I", [0])
+        chapter_numbers = array("H")
+        chapter_starts = array("I", [0])
+        verse_numbers = array("H")
+        texts: List[str] = []
+
+        for book in data.get("books", []):
+            book_names.append(book["name"])
+            for chapter in sorted(book["chapters"], key=lambda c: c["chapter"]):
+                chapter_numbers.append(chapter["chapter"])
+                for verse in sorted(chapter["verses"], key=lambda v: v["verse"]):
+                    verse_numbers.append(verse["verse"])
+                    texts.append(verse["text"])
+                chapter_starts.append(len(texts))
+            book_chapter_starts.append(len(chapter_numbers))
+
+        return cls(
+            translation=translation,
+            book_names=book_names,
+            book_chapter_starts=book_chapter_starts,
+            chapter_numbers=chapter_numbers,
+            chapter_starts=chapter_starts,
+            verse_numbers=verse_numbers,
+            texts=texts,
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def book_id(self, book: str) -> Optional[int]:
+        """Identifiant entier d'un livre (nom exact du corpus, insensible à la casse)"""
+        return self.book_ids.get(book.lower())
+
+    def chapter_slot(self, book_id: int, chapter: int) -> Optional[int]:
+        """Position globale d'un chapitre dans le répertoire des chapitres"""
+        if book_id < 0 or book_id >= len(self.book_names):
+            return None
+
+        first = self.book_chapter_starts[book_id]
+        end = self.book_chapter_starts[book_id + 1]
+        if first >= end:
+            return None
+
+        # Cas courant: chapitres numérotés sans trou à partir du premier
+        slot = first + chapter - self.chapter_numbers[first]
+        if first <= slot < end and self.chapter_numbers[slot] == chapter:
+            return slot
+
+        for slot in range(first, end):
+            if self.chapter_numbers[slot] == chapter:
+                return slot
+        return None
+
+    def chapter_range(self, book_id: int, chapter: int) -> Optional[Tuple[int, int]]:
+        """Positions [début, fin) des versets d'un chapitre"""
+        slot = self.chapter_slot(book_id, chapter)
+        if slot is None:
+            return None
+        return self.chapter_starts[slot], self.chapter_starts[slot + 1]
+
+    def position(self, book_id: int, chapter: int, verse: int) -> Optional[int]:
+        """
+        Position d'un verset dans le tableau à plat
+
+        Args:
+            book_id: Identifiant du livre
+            chapter: Numéro du chapitre
+            verse: Numéro du verset
+
+        Returns:
+            Position du verset, ou None s'il n'existe pas
+        """
+        bounds = self.chapter_range(book_id, chapter)
+        if bounds is None:
+            return None
+        start, end = bounds
+        if start >= end:
+            return None
+
+        # Cas courant: versets numérotés sans trou à partir du premier
+        pos = start + verse - self.verse_numbers[start]
+        if start <= pos < end and self.verse_numbers[pos] == verse:
+            return pos
+
+        pos = bisect_left(self.verse_numbers, verse, start, end)
+        if pos < end and self.verse_numbers[pos] == verse:
+            return pos
+        return None
+
+    def lookup(self, book: str, chapter: int, verse: int) -> Optional[int]:
+        """Position d'un verset à partir du nom de livre du corpus"""
+        book_id = self.book_id(book)
+        if book_id is None:
+            return None
+        return self.position(book_id, chapter, verse)
+
+    def locate(self, pos: int) -> Tuple[int, int, int]:
+        """Retrouve (livre, chapitre, verset) à partir d'une position"""
+        slot = bisect_right(self.chapter_starts, pos) - 1
+        book_id = bisect_right(self.book_chapter_starts, slot) - 1
+        return book_id, self.chapter_numbers[slot], self.verse_numbers[pos]
+
+    def verse_id(self, pos: int) -> int:
+        """Identifiant canonique du verset à une position donnée"""
+        return make_verse_id(*self.locate(pos))
+
+    def text(self, pos: int) -> str:
+        """Texte du verset à une position donnée"""
+        return self.texts[pos]
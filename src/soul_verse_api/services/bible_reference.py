@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from src.soul_verse_api.services.bible_search import fold_text
+
+# "Livre C:V", "Livre C:V-V", "Livre C:V-C:V", "Livre C", "Livre C-C", "Livre C:V,V"
+REFERENCE_PATTERN = re.compile(
+    r"^\s*(?P<book>(?:[1-3]\s*)?[^\W\d_][^\d]*?)?\s*(?P<location>\d[\d\s:.,\-–—]*)$"
+)
+RANGE_SEPARATORS = re.compile(r"\s*[-–—]\s*")
+# Borne haute d'une référence, pour qu'un appel ne matérialise pas un livre entier
+MAX_RANGE_VERSES = 500
+
+
+class VerseRange(NamedTuple):
+    """Plage de versets d'un livre (verset None = chapitre entier)"""
+    book: str
+    start_chapter: int
+    start_verse: Optional[int]
+    end_chapter: int
+    end_verse: Optional[int]
+
+
+def _parse_point(text: str):
+    """ "4:6" -> (4, 6), "4" -> (4, None)"""
+    text = text.replace(".", ":")
+    if ":" in text:
+        chapter, verse = text.split(":", 1)
+        return int(chapter), int(verse)
+    return int(text), None
+
+
+def parse_location(book: str, location: str) -> List[VerseRange]:
+    """
+    Analyse la partie chapitre/verset d'une référence
+
+    Args:
+        book: Nom du livre tel que saisi
+        location: Ex: "4:6-7", "3:16-4:2", "23", "23:1,4-6"
+
+    Returns:
+        Liste des plages désignées
+    """
+    ranges: List[VerseRange] = []
+    current_chapter: Optional[int] = None
+
+    for part in [p.strip() for p in location.split(",") if p.strip()]:
+        bounds = RANGE_SEPARATORS.split(part)
+        if len(bounds) > 2:
+            raise ValueError(f"Plage invalide: '{part}'")
+
+        # Après "23:1", un élément "4-6" désigne des versets du même chapitre
+        if current_chapter is not None and ":" not in part and "." not in part:
+            start = (current_chapter, int(bounds[0]))
+            end = (current_chapter, int(bounds[-1]))
+        else:
+            start = _parse_point(bounds[0])
+            end = _parse_point(bounds[-1]) if len(bounds) == 2 else start
+            if len(bounds) == 2 and start[1] is not None and end[1] is None:
+                # "4:6-7": la borne haute est un verset du même chapitre
+                end = (start[0], end[0])
+
+        start_chapter, start_verse = start
+        end_chapter, end_verse = end
+        if (end_chapter, end_verse or 0) < (start_chapter, start_verse or 0):
+            raise ValueError(f"Plage inversée: '{part}'")
+
+        ranges.append(VerseRange(book, start_chapter, start_verse, end_chapter, end_verse))
+        current_chapter = end_chapter if end_verse is not None else None
+
+    return ranges
+
+
+@lru_cache(maxsize=4096)
+def parse_references(text: str) -> Tuple[VerseRange, ...]:
+    """
+    Analyse une ou plusieurs références séparées par ";" (résultat mémorisé)
+
+    Args:
+        text: Ex: "Philippiens 4:6-7", "Jean 3:16; 1 Jean 4:8", "Jean 3:16; 4:8"
+
+    Returns:
+        Plages, dans l'ordre de la saisie
+
+    Raises:
+        ValueError: Si une référence est illisible
+    """
+    ranges: List[VerseRange] = []
+    book: Optional[str] = None
+
+    for segment in [s.strip() for s in text.split(";") if s.strip()]:
+        match = REFERENCE_PATTERN.match(segment)
+        if not match:
+            raise ValueError(f"Référence invalide: '{segment}'")
+
+        # Un segment sans livre reprend le livre précédent ("Jean 3:16; 4:8")
+        book = (match.group("book") or "").strip() or book
+        if not book:
+            raise ValueError(f"Livre manquant: '{segment}'")
+
+        ranges.extend(parse_location(book, match.group("location").strip()))
+
+    if not ranges:
+        raise ValueError(f"Référence vide: '{text}'")
+    return tuple(ranges)
+
+
+# Ordinaux en tête de nom ("Première épître de Jean", "II Rois", "1er Samuel")
+ORDINALS = {
+    "i": "1", "ii": "2", "iii": "3",
+    "1er": "1", "1re": "1", "1ere": "1", "premier": "1", "premiere": "1", "first": "1",
+    "2e": "2", "2eme": "2", "deuxieme": "2", "second": "2", "seconde": "2",
+    "3e": "3", "3eme": "3", "troisieme": "3", "third": "3",
+}
+
+# Mots d'introduction ignorés ("Évangile selon Jean", "Épître aux Romains")
+FILLER_WORDS = {
+    "evangile", "selon", "livre", "epitre", "lettre", "de", "du", "des", "d",
+    "aux", "a", "la", "le", "les", "l", "saint", "st", "ste",
+    "gospel", "according", "to", "book", "of", "the", "epistle",
+}
+
+# Abréviations usuelles (françaises et anglaises) qui ne sont pas de simples préfixes
+BOOK_ABBREVIATIONS = {
+    "gn": "Genesis", "lv": "Leviticus", "nb": "Numbers", "dt": "Deuteronomy",
+    "jg": "Judges", "jdg": "Judges", "rt": "Ruth",
+    "1s": "I Samuel", "2s": "II Samuel", "1r": "I Kings", "2r": "II Kings",
+    "1ch": "I Chronicles", "2ch": "II Chronicles", "esd": "Ezra", "ne": "Nehemiah",
+    "est": "Esther", "jb": "Job", "ps": "Psalms", "psa": "Psalms", "pr": "Proverbs",
+    "ec": "Ecclesiastes", "qo": "Ecclesiastes", "ct": "Song of Solomon",
+    "es": "Isaiah", "is": "Isaiah", "jr": "Jeremiah", "lm": "Lamentations",
+    "ez": "Ezekiel", "dn": "Daniel", "os": "Hosea", "jl": "Joel", "am": "Amos",
+    "ab": "Obadiah", "jon": "Jonah", "mi": "Micah", "na": "Nahum", "ha": "Habakkuk",
+    "so": "Zephaniah", "ag": "Haggai", "za": "Zechariah", "ml": "Malachi",
+    "mt": "Matthew", "mc": "Mark", "mk": "Mark", "lc": "Luke", "lk": "Luke",
+    "jn": "John", "ac": "Acts", "rm": "Romans", "1co": "I Corinthians",
+    "2co": "II Corinthians", "ga": "Galatians", "ep": "Ephesians", "ph": "Philippians",
+    "phil": "Philippians", "col": "Colossians", "1th": "I Thessalonians",
+    "2th": "II Thessalonians", "1tm": "I Timothy", "2tm": "II Timothy", "tt": "Titus",
+    "phm": "Philemon", "he": "Hebrews", "hb": "Hebrews", "jc": "James", "jas": "James",
+    "1p": "I Peter", "2p": "II Peter", "1jn": "I John", "2jn": "II John",
+    "3jn": "III John", "jd": "Jude", "ap": "Revelation", "rev": "Revelation",
+}
+
+BOOK_KEY_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def book_key(name: str) -> str:
+    """
+    Clé de comparaison d'un nom de livre: sans accents, ponctuation ni espaces,
+    ordinal en chiffre et mots d'introduction retirés
+
+    "Première épître de Jean" -> "1jean", "I Corinthians" -> "1corinthians"
+    """
+    words = BOOK_KEY_WORDS.findall(fold_text(name))
+    ordinal = ""
+    if len(words) > 1 and (words[0] in ORDINALS or words[0] in ("1", "2", "3")):
+        ordinal = ORDINALS.get(words[0], words[0])
+        words = words[1:]
+
+    while len(words) > 1 and words[0] in FILLER_WORDS:
+        words = words[1:]
+
+    return ordinal + "".join(words)
+
+
+class _TrieNode:
+    __slots__ = ("children", "books", "book")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.books: Set[int] = set()   # livres atteignables depuis ce préfixe
+        self.book: Optional[int] = None  # livre si la clé se termine ici
+
+
+class BookNameMatcher:
+    """
+    Résolution des noms de livres construite depuis le corpus.
+
+    Un trie regroupe les noms du corpus, les noms français et les abréviations.
+    Ordre de résolution: clé exacte, préfixe non ambigu, puis recherche floue
+    à distance d'édition bornée. Les résolutions sont mémorisées (LRU).
+    """
+
+    def __init__(self, book_names: List[str], aliases: Optional[Dict[str, str]] = None):
+        self.book_names = book_names
+        self._root = _TrieNode()
+
+        ids = {book_key(name): book_id for book_id, name in enumerate(book_names)}
+        for key, book_id in ids.items():
+            self._insert(key, book_id)
+
+        # Alias (français, abréviations) pointant vers un nom présent dans le corpus
+        for alias, target in {**(aliases or {}), **BOOK_ABBREVIATIONS}.items():
+            book_id = ids.get(book_key(target))
+            if book_id is not None:
+                self._insert(book_key(alias), book_id)
+
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+
+    def _insert(self, key: str, book_id: int):
+        if not key:
+            return
+        node = self._root
+        node.books.add(book_id)
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            node.books.add(book_id)
+        # Première définition prioritaire (noms du corpus avant les alias)
+        if node.book is None:
+            node.book = book_id
+
+    def _resolve(self, name: str) -> Optional[int]:
+        """Identifiant du livre désigné par un nom libre, ou None"""
+        key = book_key(name)
+        if not key:
+            return None
+
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            if node.book is not None:
+                return node.book
+            # Préfixe non ambigu ("Philip" -> Philippiens)
+            if len(key) >= 2 and len(node.books) == 1:
+                return next(iter(node.books))
+
+        if len(key) < 4:
+            return None
+        return self._fuzzy(key, max_distance=1 if len(key) <= 5 else 2)
+
+    def _fuzzy(self, key: str, max_distance: int) -> Optional[int]:
+        """Levenshtein borné sur le trie: meilleur livre unique, sinon None"""
+        best_distance = max_distance + 1
+        best_books: Set[int] = set()
+        first_row = list(range(len(key) + 1))
+
+        stack = [(child, char, first_row)
+                 for char, child in self._root.children.items()]
+        while stack:
+            node, char, previous_row = stack.pop()
+            row = [previous_row[0] + 1]
+            for i in range(1, len(key) + 1):
+                row.append(min(
+                    row[i - 1] + 1,
+                    previous_row[i] + 1,
+                    previous_row[i - 1] + (key[i - 1] != char),
+                ))
+
+            if node.book is not None and row[-1] <= max_distance:
+                if row[-1] < best_distance:
+                    best_distance, best_books = row[-1], {node.book}
+                elif row[-1] == best_distance:
+                    best_books.add(node.book)
+
+            # Élagage: aucune suite ne peut redescendre sous la borne
+            if min(row) <= max_distance:
+                stack.extend((child, next_char, row)
+                             for next_char, child in node.children.items())
+
+        return next(iter(best_books)) if len(best_books) == 1 else None
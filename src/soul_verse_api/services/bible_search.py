@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.soul_verse_api.services.bible_index import TranslationIndex
+
+TOKEN_PATTERN = re.compile(r"\w+")
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+# Paramètres BM25 classiques
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def fold_text(text: str) -> str:
+    """Minuscules et suppression des accents ("Éternel" -> "eternel")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en jetons normalisés (sans accents, minuscules)"""
+    return TOKEN_PATTERN.findall(fold_text(text))
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Analyse une requête de recherche
+
+    Args:
+        query: Texte libre, les expressions exactes entre guillemets
+               (ex: 'paix "ne crains point"')
+
+    Returns:
+        (termes simples, expressions sous forme de listes de jetons)
+    """
+    phrases = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)]
+    phrases = [phrase for phrase in phrases if phrase]
+    terms = tokenize(PHRASE_PATTERN.sub(" ", query))
+    return terms, phrases
+
+
+def encode_cursor(offset: int) -> str:
+    """Curseur de pagination opaque"""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Décode un curseur de pagination (ValueError si invalide)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except Exception:
+        raise ValueError(f"Curseur invalide: {cursor}")
+
+
+class SearchIndex:
+    """
+    Index inversé plein texte d'une traduction.
+
+    Pour chaque jeton: la liste triée des positions de versets (postings) et
+    la fréquence du jeton dans chacun, pour un classement BM25.
+    """
+
+    def __init__(self, index: TranslationIndex):
+        self.index = index
+        self.doc_lengths = array("H")
+        postings: Dict[str, Dict[int, int]] = {}
+
+        for pos, text in enumerate(index.texts):
+            tokens = tokenize(text)
+            self.doc_lengths.append(len(tokens))
+            for token in tokens:
+                frequencies = postings.setdefault(token, {})
+                frequencies[pos] = frequencies.get(pos, 0) + 1
+
+        # Listes compactes: positions triées + fréquences alignées
+        self.postings: Dict[str, Tuple[array, array]] = {
+            token: (array("I", frequencies.keys()), array("H", frequencies.values()))
+            for token, frequencies in postings.items()
+        }
+        self.doc_count = len(self.doc_lengths)
+        self.avg_doc_length = (
+            sum(self.doc_lengths) / self.doc_count if self.doc_count else 0.0
+        )
+        # Normalisation de longueur BM25 précalculée par verset
+        self.length_norms = array("f", (
+            1 - BM25_B + BM25_B * length / (self.avg_doc_length or 1)
+            for length in self.doc_lengths
+        ))
+
+    def term_count(self) -> int:
+        """Nombre de jetons distincts indexés"""
+        return len(self.postings)
+
+    def _docs(self, token: str) -> Set[int]:
+        posting = self.postings.get(token)
+        return set(posting[0]) if posting else set()
+
+    def _term_frequency(self, token: str, pos: int) -> int:
+        posting = self.postings.get(token)
+        if not posting:
+            return 0
+        docs, frequencies = posting
+        i = bisect_left(docs, pos)
+        if i < len(docs) and docs[i] == pos:
+            return frequencies[i]
+        return 0
+
+    def _phrase_docs(self, phrase: List[str], restrict: Optional[Set[int]] = None) -> Set[int]:
+        """
+        Versets contenant l'expression exacte (jetons consécutifs)
+
+        Seuls les candidats (versets contenant tous les jetons) sont normalisés,
+        à la demande depuis le corpus (projeté en mémoire partagée pour un .svb):
+        aucune copie normalisée du corpus ne reste résidente par worker.
+        """
+        doc_sets = [self._docs(token) for token in phrase]
+        if restrict is not None:
+            doc_sets.append(restrict)
+        candidates = self._intersect(doc_sets)
+        if len(phrase) == 1:
+            return candidates
+
+        needle = f" {' '.join(phrase)} "
+        return {pos for pos in candidates if needle in f" {' '.join(tokenize(self.index.texts[pos]))} "}
+
+    @staticmethod
+    def _intersect(doc_sets: List[Set[int]]) -> Set[int]:
+        if not doc_sets:
+            return set()
+        doc_sets = sorted(doc_sets, key=len)
+        result = set(doc_sets[0])
+        for docs in doc_sets[1:]:
+            if not result:
+                break
+            result &= docs
+        return result
+
+    def _idf(self, token: str) -> float:
+        df = len(self.postings[token][0])
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def _score(self, matches: Set[int], tokens: List[str]) -> Dict[int, float]:
+        """Scores BM25 des versets retenus"""
+        scores = dict.fromkeys(matches, 0.0)
+        for token in tokens:
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            docs, frequencies = posting
+            idf = self._idf(token)
+
+            if len(matches) * 8 < len(docs):
+                # Peu de candidats: recherche dichotomique dans la liste
+                pairs = ((pos, self._term_frequency(token, pos))
+                         for pos in matches)
+            else:
+                # Liste courte ou beaucoup de candidats: parcours linéaire
+                pairs = ((pos, tf) for pos, tf in zip(docs, frequencies)
+                         if pos in scores)
+
+            for pos, tf in pairs:
+                if tf:
+                    scores[pos] += idf * tf * (BM25_K1 + 1) / \
+                        (tf + BM25_K1 * self.length_norms[pos])
+        return scores
+
+    def search(
+        self,
+        terms: List[str],
+        phrases: Optional[List[List[str]]] = None,
+        mode: str = "and",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Recherche classée BM25
+
+        Args:
+            terms: Jetons simples (déjà normalisés)
+            phrases: Expressions exactes (listes de jetons normalisés)
+            mode: "and" (toutes les clauses) ou "or" (au moins une)
+            limit: Nombre maximum de résultats
+            offset: Décalage de pagination
+
+        Returns:
+            ([(position, score)], nombre total de résultats)
+        """
+        phrases = phrases or []
+        if not terms and not phrases:
+            return [], 0
+
+        clauses = [self._docs(term) for term in terms]
+        if mode == "or":
+            clauses += [self._phrase_docs(phrase) for phrase in phrases]
+            matches = set().union(*clauses)
+        else:
+            # Les expressions ne sont vérifiées que sur les candidats restants
+            matches = self._intersect(clauses) if clauses else None
+            for phrase in phrases:
+                matches = self._phrase_docs(phrase, matches)
+
+        scoring_tokens = list(dict.fromkeys(
+            terms + [token for phrase in phrases for token in phrase]))
+        scores = self._score(matches, scoring_tokens)
+        # Sélection partielle: seuls offset + limit résultats sont triés
+        ranked = heapq.nsmallest(
+            offset + limit,
+            scores.items(),
+            key=lambda item: (-item[1], item[0])
+        )
+        return ranked[offset:], len(matches)
@@ -1,19 +1,34 @@
-import requests
-import json
-from typing import Dict, Optional, List
 import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 from src.soul_verse_api.core.config import settings
 from src.soul_verse_api.schemas.verse_schema import BibleVerse
+from src.soul_verse_api.services.bible_corpus import get_bible_corpus
+from src.soul_verse_api.services.bible_index import TranslationIndex, make_verse_id
+from src.soul_verse_api.services.bible_reference import (
+    MAX_RANGE_VERSES, BookNameMatcher, VerseRange, parse_references
+)
+from src.soul_verse_api.services.bible_search import parse_query, tokenize
+from src.soul_verse_api.services.verse_recommender import (
+    CONCEPT_REFLECTIONS, DEFAULT_REFLECTION, VerseRecommender, theme_concepts
+)
+
+logger = logging.getLogger(__name__)
 
 
 class BibleService:
     def __init__(self):
-        self.github_base_url = "https://raw.githubusercontent.com/scrollmapper/bible_databases/master/formats/json"
-        self.available_translations = {
-            "FreBBB": "FreBBB.json",      # Français Bible Bovet Bonnet
-            "KJV": "KJV.json",            # King James Version
-            "FreCrampon": "FreCrampon.json"  # Bible Crampon
-        }
+        # Corpus partagé: chaque traduction n'est chargée qu'une fois par processus
+        self.corpus = get_bible_corpus()
+        self.github_base_url = self.corpus.github_base_url
+        self.available_translations = self.corpus.available_translations
+        # Résolution des noms de livres, une par traduction (construite depuis le corpus)
+        self._book_matchers: Dict[str, BookNameMatcher] = {}
+        # Correspondance des livres entre traductions: (source, cible) -> ids cibles
+        self._book_maps: Dict[Tuple[str, str], List[Optional[int]]] = {}
 
         # Mapping des noms de livres français → anglais (pour FreBBB)
         # La Bible FreBBB utilise des noms anglais même si c'est une traduction française
@@ -181,6 +196,18 @@ class BibleService:
             "revelation": "Revelation"
         }
 
+        # Premier nom français de chaque livre, pour l'affichage des références
+        self.display_names: Dict[str, str] = {}
+        for french, english in self.book_name_mapping.items():
+            self.display_names.setdefault(english, " ".join(
+                word if word in ("des", "de", "du") else word.capitalize()
+                for word in french.split()
+            ))
+
+    def display_book_name(self, book: str) -> str:
+        """Nom français d'affichage d'un livre du corpus ("I Corinthians" -> "1 Corinthiens")"""
+        return self.display_names.get(book, book)
+
     def normalize_book_name(self, book: str) -> str:
         """
         Normalise le nom d'un livre biblique pour correspondre au format de la base
@@ -194,75 +221,381 @@ class BibleService:
         book_lower = book.lower().strip()
         return self.book_name_mapping.get(book_lower, book)
 
-    async def load_bible_json(self, translation: str) -> Dict:
-        """Charge une traduction Bible depuis GitHub"""
-        if translation not in self.available_translations:
-            raise ValueError(f"Traduction {translation} non disponible")
+    def get_book_matcher(self, index: TranslationIndex) -> BookNameMatcher:
+        """Résolveur de noms de livres pour une traduction (créé au premier usage)"""
+        matcher = self._book_matchers.get(index.translation)
+        if matcher is None or matcher.book_names is not index.book_names:
+            matcher = BookNameMatcher(index.book_names, self.book_name_mapping)
+            self._book_matchers[index.translation] = matcher
+        return matcher
 
-        url = f"{self.github_base_url}/{self.available_translations[translation]}"
+    def resolve_book_id(self, index: TranslationIndex, book: str) -> Optional[int]:
+        """
+        Identifiant du livre dans l'index, quelle que soit la saisie
 
-        try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise Exception(f"Erreur chargement Bible {translation}: {e}")
+        Accepte noms français/anglais, abréviations ("1Co", "Ps", "Jn"),
+        formes longues ("Évangile selon Jean") et fautes de frappe légères.
+        """
+        return self.get_book_matcher(index).resolve(book)
+
+    async def load_translation(self, translation: str) -> TranslationIndex:
+        """Retourne l'index d'une traduction depuis le corpus résident en mémoire"""
+        return await self.corpus.get(translation)
+
+    def build_verse(self, index: TranslationIndex, pos: int) -> BibleVerse:
+        """Construit un BibleVerse à partir d'une position de l'index"""
+        book_id, chapter, verse = index.locate(pos)
+        return BibleVerse(
+            book=index.book_names[book_id],
+            chapter=chapter,
+            verse=verse,
+            text=index.text(pos),
+            translation=index.translation
+        )
 
     async def get_verse(self, translation: str, book: str, chapter: int, verse: int) -> Optional[BibleVerse]:
-        """Récupère un verset spécifique"""
-        import logging
-        logger = logging.getLogger(__name__)
+        """Récupère un verset spécifique (accès direct par l'index)"""
+        index = await self.load_translation(translation)
 
-        bible_data = await self.load_bible_json(translation)
+        book_id = self.resolve_book_id(index, book)
+        if book_id is None:
+            logger.warning(
+                f"❌ Livre '{book}' non trouvé. Livres disponibles: {index.book_names[:10]}...")
+            return None
 
-        # Normaliser le nom du livre
-        normalized_book = self.normalize_book_name(book)
-        logger.info(
+        normalized_book = index.book_names[book_id]
+        logger.debug(
             f"📖 Recherche: '{book}' → '{normalized_book}' {chapter}:{verse}")
 
-        # Structure JSON: books -> chapters -> verses
-        for bible_book in bible_data.get("books", []):
-            # Comparaison case-insensitive
-            if bible_book["name"].lower() == normalized_book.lower():
-                logger.info(f"✅ Livre trouvé: {bible_book['name']}")
-                for bible_chapter in bible_book["chapters"]:
-                    if bible_chapter["chapter"] == chapter:
-                        for bible_verse in bible_chapter["verses"]:
-                            if bible_verse["verse"] == verse:
-                                return BibleVerse(
-                                    book=bible_book["name"],
-                                    chapter=chapter,
-                                    verse=verse,
-                                    text=bible_verse["text"],
-                                    translation=translation
-                                )
-                logger.warning(
-                    f"⚠️ Chapitre/verset non trouvé: {chapter}:{verse}")
+        pos = index.position(book_id, chapter, verse)
+        if pos is None:
+            logger.warning(
+                f"⚠️ Chapitre/verset non trouvé: {normalized_book} {chapter}:{verse}")
+            return None
+
+        return self.build_verse(index, pos)
+
+    def resolve_range(self, index: TranslationIndex, verse_range: VerseRange) -> Optional[Tuple[int, int]]:
+        """
+        Positions [début, fin) d'une plage de versets dans l'index
+
+        Les plages sur plusieurs chapitres sont contiguës dans le tableau à plat.
+        Une borne haute au-delà du dernier verset est ramenée à la fin du chapitre.
+        """
+        book_id = self.resolve_book_id(index, verse_range.book)
+        if book_id is None:
+            return None
+
+        start_bounds = index.chapter_range(book_id, verse_range.start_chapter)
+        end_bounds = index.chapter_range(book_id, verse_range.end_chapter)
+        if start_bounds is None or end_bounds is None:
+            return None
+
+        if verse_range.start_verse is None:
+            start = start_bounds[0]
+        else:
+            start = index.position(
+                book_id, verse_range.start_chapter, verse_range.start_verse)
+            if start is None:
                 return None
 
-        # Si pas trouvé, logger tous les livres disponibles pour debug
-        available_books = [b["name"] for b in bible_data.get("books", [])]
-        logger.warning(
-            f"❌ Livre '{normalized_book}' non trouvé. Livres disponibles: {available_books[:10]}...")
-        return None
+        if verse_range.end_verse is None:
+            end = end_bounds[1]
+        else:
+            end = bisect_right(
+                index.verse_numbers, verse_range.end_verse, *end_bounds)
 
-    async def search_verses_by_keywords(self, translation: str, keywords: List[str]) -> List[BibleVerse]:
-        """Recherche des versets par mots-clés pour fallback IA"""
-        bible_data = await self.load_bible_json(translation)
+        if end <= start:
+            return None
+        return start, min(end, start + MAX_RANGE_VERSES)
+
+    def _passage_positions(self, index: TranslationIndex, reference: str) -> List[int]:
+        """Positions de tous les versets d'une référence (plages, listes ";")"""
+        positions: List[int] = []
+        for verse_range in parse_references(reference):
+            bounds = self.resolve_range(index, verse_range)
+            if bounds is None:
+                logger.warning(
+                    f"⚠️ Plage non trouvée: {verse_range.book} {verse_range.start_chapter}:{verse_range.start_verse}")
+                continue
+            positions.extend(range(*bounds))
+        return positions
+
+    async def get_passage(self, translation: str, reference: str) -> List[BibleVerse]:
+        """
+        Récupère tous les versets d'une référence
+
+        Args:
+            translation: Code de la traduction
+            reference: Ex: "Philippiens 4:6-7", "Jean 3:16-4:2", "Jean 3:16; 1 Jean 4:8"
+
+        Returns:
+            Versets dans l'ordre de la référence (liste vide si introuvable)
+        """
+        index = await self.load_translation(translation)
+        try:
+            positions = self._passage_positions(index, reference)
+        except ValueError as e:
+            logger.warning(f"❌ {e}")
+            return []
+        return [self.build_verse(index, pos) for pos in positions]
+
+    def merge_passage(self, verses: List[BibleVerse]) -> Optional[BibleVerse]:
+        """Regroupe un passage en un seul BibleVerse (premier verset, textes concaténés)"""
+        if not verses:
+            return None
+        first = verses[0]
+        return BibleVerse(
+            book=first.book,
+            chapter=first.chapter,
+            verse=first.verse,
+            text=" ".join(verse.text for verse in verses),
+            translation=first.translation
+        )
+
+    async def get_verses_batch(self, translation: str, references: List[str]) -> List[Dict[str, Any]]:
+        """
+        Résout plusieurs références en une seule passe sur l'index
+
+        Args:
+            translation: Code de la traduction
+            references: Liste de références (plages et listes ";" acceptées)
+
+        Returns:
+            Un résultat par référence: versets, texte du passage, found/error
+        """
+        index = await self.load_translation(translation)
         results = []
 
-        for book in bible_data.get("books", []):
-            for chapter in book["chapters"]:
-                for verse in chapter["verses"]:
-                    text_lower = verse["text"].lower()
-                    if any(keyword.lower() in text_lower for keyword in keywords):
-                        results.append(BibleVerse(
-                            book=book["name"],
-                            chapter=chapter["chapter"],
-                            verse=verse["verse"],
-                            text=verse["text"],
-                            translation=translation
-                        ))
-                        if len(results) >= 10:  # Limite résultats
-                            break
+        for reference in references:
+            try:
+                positions = self._passage_positions(index, reference)
+            except ValueError as e:
+                results.append({
+                    "reference": reference,
+                    "found": False,
+                    "error": str(e),
+                    "verses": [],
+                    "text": None
+                })
+                continue
+
+            verses = [self.build_verse(index, pos) for pos in positions]
+            results.append({
+                "reference": reference,
+                "found": bool(verses),
+                "verses": [verse.dict() for verse in verses],
+                "text": " ".join(verse.text for verse in verses) if verses else None
+            })
+
         return results
+
+    def chapter_slots(self, index: TranslationIndex, book_id: int, chapter: Optional[int] = None) -> List[int]:
+        """Emplacements des chapitres d'un livre (un seul si chapter est donné)"""
+        if chapter is not None:
+            slot = index.chapter_slot(book_id, chapter)
+            return [slot] if slot is not None else []
+        return list(range(index.book_chapter_starts[book_id],
+                          index.book_chapter_starts[book_id + 1]))
+
+    def iter_chapters(self, index: TranslationIndex, book_id: int, slots: List[int]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Parcourt les chapitres directement dans l'index, un chapitre à la fois
+
+        Aucun BibleVerse n'est construit: chaque verset est un dict sérialisable.
+        """
+        book = index.book_names[book_id]
+        for slot in slots:
+            chapter = index.chapter_numbers[slot]
+            yield [
+                {
+                    "book": book,
+                    "chapter": chapter,
+                    "verse": index.verse_numbers[pos],
+                    "text": index.text(pos),
+                    "translation": index.translation
+                }
+                for pos in range(index.chapter_starts[slot], index.chapter_starts[slot + 1])
+            ]
+
+    def content_etag(self, index: TranslationIndex, *parts: Any) -> str:
+        """ETag stable d'un contenu de l'index (le texte biblique ne change pas)"""
+        key = "|".join(str(part) for part in (index.translation, index.fingerprint, *parts))
+        return f'"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+    def book_map(self, source: TranslationIndex, target: TranslationIndex) -> List[Optional[int]]:
+        """Identifiant dans la traduction cible de chaque livre de la source (mémorisé)"""
+        key = (source.translation, target.translation)
+        mapping = self._book_maps.get(key)
+        if mapping is None or len(mapping) != len(source.book_names):
+            mapping = [self.resolve_book_id(target, name) for name in source.book_names]
+            self._book_maps[key] = mapping
+        return mapping
+
+    async def get_parallel_verses(self, reference: str, translations: List[str]) -> List[Dict[str, Any]]:
+        """
+        Une référence dans plusieurs traductions, alignée verset par verset
+
+        La référence est résolue une fois dans la première traduction (pivot);
+        chaque verset est identifié par son id canonique (livre, chapitre, verset)
+        et retrouvé dans les autres index par accès direct.
+
+        Args:
+            reference: Ex: "Jean 3:16", "Psaume 23:1-4"
+            translations: Codes des traductions, la première sert de pivot
+
+        Returns:
+            Une ligne par verset: id canonique, référence et textes par traduction
+            (None si le verset n'existe pas dans une traduction)
+
+        Raises:
+            ValueError: Référence illisible ou traduction indisponible
+        """
+        indexes = await asyncio.gather(*(self.load_translation(t) for t in translations))
+        pivot = indexes[0]
+        book_maps = [self.book_map(pivot, index) for index in indexes]
+
+        rows = []
+        for pos in self._passage_positions(pivot, reference):
+            book_id, chapter, verse = pivot.locate(pos)
+            texts: Dict[str, Optional[str]] = {}
+            for index, mapping in zip(indexes, book_maps):
+                target_book = mapping[book_id]
+                target_pos = (index.position(target_book, chapter, verse)
+                              if target_book is not None else None)
+                texts[index.translation] = (index.text(target_pos)
+                                            if target_pos is not None else None)
+            rows.append({
+                "verse_id": make_verse_id(book_id, chapter, verse),
+                "book": pivot.book_names[book_id],
+                "chapter": chapter,
+                "verse": verse,
+                "texts": texts
+            })
+        return rows
+
+    async def recommend_verses(
+        self,
+        translation: str,
+        mood: Optional[str] = None,
+        themes: Optional[List[str]] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Versets recommandés localement pour une humeur et des thèmes (sans LLM)
+
+        Args:
+            translation: Code de la traduction
+            mood: Humeur de l'utilisateur (ex: "anxiété")
+            themes: Thèmes d'une occasion (ex: special_occasion["themes"])
+            limit: Nombre de candidats
+
+        Returns:
+            Candidats classés: référence (nom français), verset et score
+        """
+        weights: Dict[str, float] = {}
+        # Les thèmes d'une occasion priment sur l'humeur, comme dans le prompt Gemini
+        for concept in theme_concepts(themes or []):
+            weights[concept] = weights.get(concept, 0.0) + 1.0
+        for concept in theme_concepts([mood] if mood else []):
+            weights[concept] = weights.get(concept, 0.0) + (0.5 if themes else 1.0)
+        if not weights:
+            weights = dict.fromkeys(theme_concepts(["paix"]), 1.0)
+
+        recommender = await self.corpus.get_recommender(translation)
+        index = await self.load_translation(translation)
+
+        candidates = []
+        for pos, score in recommender.recommend(weights, limit):
+            verse = self.build_verse(index, pos)
+            candidates.append({
+                "reference": f"{self.display_book_name(verse.book)} {verse.chapter}:{verse.verse}",
+                "verse_id": index.verse_id(pos),
+                "verse": verse.dict(),
+                "score": round(score, 4)
+            })
+        return candidates
+
+    async def recommend_daily_verse(
+        self,
+        mood: str,
+        special_occasion: dict = None,
+        translation: str = "FreBBB",
+        seed: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Verset du jour choisi localement, au format des réponses Gemini
+
+        Le choix tourne chaque jour parmi les meilleurs candidats (graine = date).
+
+        Returns:
+            {"reference", "reflection", "visual_elements", "source": "local"} ou None
+        """
+        themes = special_occasion.get("themes", []) if special_occasion else []
+        try:
+            candidates = await self.recommend_verses(translation, mood, themes, limit=20)
+        except Exception as e:
+            logger.warning(f"⚠️ Recommandation locale indisponible: {e}")
+            return None
+        if not candidates:
+            return None
+
+        seed = seed or datetime.now().strftime("%Y-%m-%d")
+        pick = VerseRecommender.daily_pick(
+            [(i, candidate["score"]) for i, candidate in enumerate(candidates)],
+            mood, special_occasion.get("name") if special_occasion else None, seed
+        )
+        candidate = candidates[pick]
+        concepts = theme_concepts(themes + [mood])
+        reflection = next(
+            (CONCEPT_REFLECTIONS[c] for c in concepts if c in CONCEPT_REFLECTIONS), DEFAULT_REFLECTION)
+
+        return {
+            "reference": candidate["reference"],
+            "reflection": reflection,
+            "visual_elements": "lumière douce, ciel paisible, Bible ouverte",
+            "source": "local"
+        }
+
+    async def search_verses(
+        self,
+        translation: str,
+        query: str,
+        mode: str = "and",
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Tuple[BibleVerse, float]], int]:
+        """
+        Recherche plein texte classée (BM25) dans une traduction
+
+        Args:
+            translation: Code de la traduction
+            query: Requête libre, expressions exactes entre guillemets
+            mode: "and" (tous les termes) ou "or" (au moins un)
+            limit: Nombre maximum de résultats
+            offset: Décalage de pagination
+
+        Returns:
+            ([(verset, score)], nombre total de résultats)
+        """
+        search_index = await self.corpus.get_search_index(translation)
+        terms, phrases = parse_query(query)
+        hits, total = search_index.search(terms, phrases, mode, limit, offset)
+        return [(self.build_verse(search_index.index, pos), score) for pos, score in hits], total
+
+    async def search_verses_by_keywords(self, translation: str, keywords: List[str]) -> List[BibleVerse]:
+        """Recherche des versets par mots-clés pour fallback IA"""
+        search_index = await self.corpus.get_search_index(translation)
+
+        # Un mot-clé composé de plusieurs mots est traité comme une expression
+        terms, phrases = [], []
+        for keyword in keywords:
+            tokens = tokenize(keyword)
+            if len(tokens) == 1:
+                terms.extend(tokens)
+            elif tokens:
+                phrases.append(tokens)
+
+        hits, _ = search_index.search(
+            terms, phrases, mode="or", limit=10)  # Limite résultats
+        return [self.build_verse(search_index.index, pos) for pos, _ in hits]
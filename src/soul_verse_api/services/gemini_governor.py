@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+from src.soul_verse_api.core.config import settings
+
+# Configuration des logs
+logger = logging.getLogger(__name__)
+
+# Décroissance multiplicative sur surcharge (429/5xx/timeout) et sur latence excessive
+OVERLOAD_DECREASE = 0.5
+LATENCY_DECREASE = 0.9
+# Une seule décroissance par fenêtre: les erreurs d'une même rafale ne s'additionnent pas
+DECREASE_COOLDOWN_SECONDS = 1.0
+MIN_CONCURRENCY = 1.0
+INITIAL_CONCURRENCY = 4.0
+LATENCY_EWMA_WEIGHT = 0.2
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classe d'erreur d'un appel Gemini
+
+    Returns:
+        "rate_limited" (429), "server_error" (5xx), "timeout" ou "client_error"
+    """
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code == 429 or "RESOURCE_EXHAUSTED" in str(error):
+        return "rate_limited"
+    if isinstance(code, int) and code >= 500:
+        return "server_error"
+    return "client_error"
+
+
+class TokenBucket:
+    """Seau à jetons: débit moyen `rate` par seconde, rafale d'au plus `burst` appels"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.waiting = 0
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme"""
+        self.waiting += 1
+        try:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+
+class SlotTiming:
+    """
+    Mesure d'un créneau: la latence retenue par le régulateur est la durée du
+    créneau, ou le délai jusqu'au premier fragment pour un flux (first_output)
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.first_output_latency: Optional[float] = None
+
+    def first_output(self):
+        """Marque l'arrivée du premier fragment (appels suivants ignorés)"""
+        if self.first_output_latency is None:
+            self.first_output_latency = time.monotonic() - self.started
+
+    def latency(self) -> float:
+        if self.first_output_latency is not None:
+            return self.first_output_latency
+        return time.monotonic() - self.started
+
+
+class GeminiGovernor:
+    """
+    Régulateur des appels Gemini: seau à jetons (débit) et limite de
+    concurrence AIMD.
+
+    - Succès rapide: croissance additive du débit et de la concurrence
+      (+1 environ par fenêtre complète d'appels)
+    - 429, 5xx ou timeout: décroissance multiplicative (x0.5) des deux
+    - Latence au-dessus de la cible: décroissance douce (x0.9) de la concurrence
+
+    Le débit converge ainsi vers le maximum soutenable par le quota de l'API
+    au lieu d'alterner rafales et temps morts.
+    """
+
+    def __init__(
+        self,
+        initial_rate: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        target_latency: Optional[float] = None,
+    ):
+        self.min_rate = min_rate or settings.GEMINI_RATE_LIMIT_MIN
+        self.max_rate = max_rate or settings.GEMINI_RATE_LIMIT_MAX
+        self.max_concurrency = float(max_concurrency or settings.GEMINI_MAX_CONCURRENCY)
+        self.target_latency = target_latency or settings.GEMINI_TARGET_LATENCY_SECONDS
+
+        rate = initial_rate or settings.GEMINI_RATE_LIMIT_INITIAL
+        self.bucket = TokenBucket(rate, burst=max(1.0, rate))
+        self.concurrency_limit = min(INITIAL_CONCURRENCY, self.max_concurrency)
+        self.active = 0
+        self._slot_waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.counters = {
+            "calls": 0,
+            "successes": 0,
+            "rate_limited": 0,
+            "server_error": 0,
+            "timeout": 0,
+            "client_error": 0,
+            "decreases": 0,
+        }
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[SlotTiming]:
+        """
+        Créneau régulé pour un appel Gemini (y compris un flux lu jusqu'au bout)
+
+        Le débit et la concurrence sont ajustés à la sortie du bloc selon
+        la latence (SlotTiming) et l'éventuelle erreur levée dans le bloc. Un
+        flux marque son premier fragment (timing.first_output()): sa durée totale,
+        proportionnelle à la longueur du texte, ne compte pas comme latence.
+        """
+        await self._acquire_slot()
+        try:
+            await self.bucket.acquire()
+            self.counters["calls"] += 1
+            timing = SlotTiming()
+            try:
+                yield timing
+            except Exception as e:
+                self._on_error(classify_error(e))
+                raise
+            self._on_success(timing.latency())
+        finally:
+            self._release_slot()
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Exécute un appel Gemini sous le régulateur
+
+        Args:
+            call: Fabrique de la coroutine d'appel (créée une fois le créneau obtenu)
+
+        Returns:
+            Résultat de l'appel (les erreurs sont relancées après ajustement)
+        """
+        async with self.slot():
+            return await call()
+
+    async def _acquire_slot(self):
+        if self.active < int(self.concurrency_limit) and not self._slot_waiters:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._slot_waiters.append(waiter)
+        try:
+            # Le créneau est transmis par _wake (active déjà incrémenté)
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            else:
+                try:
+                    self._slot_waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _release_slot(self):
+        self.active -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._slot_waiters and self.active < int(self.concurrency_limit):
+            waiter = self._slot_waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    def _on_success(self, latency: float):
+        self.counters["successes"] += 1
+        self.latency_ewma = latency if self.latency_ewma is None else (
+            LATENCY_EWMA_WEIGHT * latency + (1 - LATENCY_EWMA_WEIGHT) * self.latency_ewma)
+
+        if latency > self.target_latency:
+            self._decrease(LATENCY_DECREASE, rate_factor=1.0)
+            return
+
+        # Croissance additive: +1 après une fenêtre complète de succès
+        self.concurrency_limit = min(
+            self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+        self.bucket.rate = min(self.max_rate, self.bucket.rate + 1 / self.bucket.rate)
+        self.bucket.burst = max(1.0, self.bucket.rate)
+        self._wake()
+
+    def _on_error(self, error_class: str):
+        self.counters[error_class] += 1
+        if error_class in ("rate_limited", "server_error", "timeout"):
+            self._decrease(OVERLOAD_DECREASE, rate_factor=OVERLOAD_DECREASE)
+
+    def _decrease(self, factor: float, rate_factor: float):
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        self.counters["decreases"] += 1
+
+        self.concurrency_limit = max(MIN_CONCURRENCY, self.concurrency_limit * factor)
+        self.bucket.rate = max(self.min_rate, self.bucket.rate * rate_factor)
+        self.bucket.burst = max(1.0, self.bucket.rate)
+        self.bucket.tokens = min(self.bucket.tokens, self.bucket.burst)
+        logger.warning(
+            f"🐢 Gemini surchargé: {self.bucket.rate:.2f} appels/s, "
+            f"concurrence {int(self.concurrency_limit)}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Débit courant, concurrence, profondeur de file et compteurs"""
+        return {
+            "rate_per_second": round(self.bucket.rate, 3),
+            "concurrency_limit": int(self.concurrency_limit),
+            "active": self.active,
+            "queue_depth": len(self._slot_waiters) + self.bucket.waiting,
+            "latency_ewma_seconds": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "target_latency_seconds": self.target_latency,
+            **self.counters,
+        }
+
+
+# Instance globale partagée par toutes les instances de GeminiService du processus
+gemini_governor = GeminiGovernor()
+
+
+def get_gemini_governor() -> GeminiGovernor:
+    """Obtenir le régulateur des appels Gemini"""
+    return gemini_governor
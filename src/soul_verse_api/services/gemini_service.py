@@ -1,16 +1,127 @@
 import google.genai as genai
-from typing import Dict, Optional
+from google.genai import types
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+from datetime import datetime
 import json
+import time
+import uuid
 from src.soul_verse_api.core.config import settings
-from src.soul_verse_api.schemas.verse_schema import BibleVerse, VerseWithReflection
+from src.soul_verse_api.core.fake_providers import get_fake_genai_client, is_fake_backend
+from src.soul_verse_api.core.redis_client import redis_client
+from src.soul_verse_api.schemas.verse_schema import (
+    AIBatchVerseItem, AIPrayerResponse, AIVerseResponse, BibleVerse, VerseWithReflection)
+from src.soul_verse_api.services.bible_reference import parse_references
+from src.soul_verse_api.services.bible_service import BibleService
+from src.soul_verse_api.services.gemini_governor import gemini_governor
+from src.soul_verse_api.services.json_extractor import JSONStreamExtractor, extract_json
+from src.soul_verse_api.services.llm_cache import llm_cache
+from src.soul_verse_api.services.llm_metrics import llm_metrics
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Coalescence des appels identiques: les appelants concurrents d'un même prompt
+# attendent la même future dans le processus, et un verrou Redis désigne un seul
+# processus émetteur; les autres lisent le résultat partagé
+COALESCE_LOCK_PREFIX = "gemini_inflight"
+COALESCE_RESULT_PREFIX = "gemini_result"
+COALESCE_RESULT_TTL = 60  # secondes, le temps que les processus en attente le lisent
+COALESCE_POLL_SECONDS = 0.1
+# Prolongations du verrou par durée de vie: il tient pendant l'attente d'un créneau du régulateur
+COALESCE_LOCK_REFRESHES = 3
+
+# Appels en cours dans ce processus (partagés par toutes les instances du service)
+_inflight: Dict[str, asyncio.Future] = {}
+_coalesce_stats = {"calls": 0, "joined": 0, "remote": 0}
+# Lectures de flux Gemini en cours (référence forte: la tâche survit au client déconnecté)
+_stream_producers: Set[asyncio.Task] = set()
+
+
+def prompt_key(prompt: str, model: str = GEMINI_MODEL) -> str:
+    """Empreinte SHA-256 d'un prompt pour un modèle donné"""
+    return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+# Sortie JSON contrainte par un schéma, selon le type de contenu demandé
+RESPONSE_SCHEMAS = {
+    "verse": AIVerseResponse,
+    "morning_prayer": AIPrayerResponse,
+    "evening_prayer": AIPrayerResponse,
+    "verse_batch": list[AIBatchVerseItem],
+}
+# Validation champ par champ d'un objet décodé
+RESPONSE_MODELS = {
+    "verse": AIVerseResponse,
+    "morning_prayer": AIPrayerResponse,
+    "evening_prayer": AIPrayerResponse,
+}
+
+# Décodages réussis / en échec par méthode de génération
+_parse_stats: Dict[str, Dict[str, int]] = {}
+
+
+def validate_response(data: Any, content_type: str) -> Dict:
+    """
+    Valide champ par champ un objet décodé (types, champs requis non vides,
+    référence biblique lisible pour un verset)
+
+    Raises:
+        ValueError: Si un champ est absent ou invalide
+    """
+    model = RESPONSE_MODELS.get(content_type)
+    if model is None:
+        raise ValueError(f"Type de contenu sans schéma: {content_type}")
+    if not isinstance(data, dict):
+        raise ValueError("Objet JSON attendu")
+
+    result = model.model_validate(data).model_dump()
+    if content_type == "verse":
+        parse_references(result["reference"])
+    return result
+
+
+def decode_response(text: str, content_type: str, method: str) -> Dict:
+    """
+    Décode (de façon tolérante) et valide une réponse, en comptant les échecs par méthode
+
+    Raises:
+        ValueError: Si la réponse est illisible ou invalide
+    """
+    stats = _parse_stats.setdefault(method, {"ok": 0, "failures": 0})
+    try:
+        result = validate_response(extract_json(text), content_type)
+    except ValueError as e:
+        stats["failures"] += 1
+        raise ValueError(f"Réponse IA invalide ({method}): {e}") from e
+
+    stats["ok"] += 1
+    return result
+
+
+def get_parse_stats() -> Dict[str, Dict[str, int]]:
+    """Décodages réussis et échecs de décodage des réponses, par méthode"""
+    return {method: dict(stats) for method, stats in _parse_stats.items()}
+
+
+def get_coalesce_stats() -> Dict[str, int]:
+    """Compteurs de coalescence: appels émis, rejoints en local, lus depuis un autre processus"""
+    return {**_coalesce_stats, "inflight": len(_inflight)}
 
 
 class GeminiService:
     def __init__(self):
-        # Configuration pour la nouvelle API google.genai
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        # Configuration pour la nouvelle API google.genai (faux client hors ligne si PROVIDER_BACKEND=fake)
+        if is_fake_backend():
+            self.client = get_fake_genai_client()
+        else:
+            self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        # Recommandeur local (corpus partagé): mode rapide et secours de l'IA
+        self.bible_service = BibleService()
 
-    async def build_prompt(self, mood: str, role: str, translation: str = "FreBBB", special_occasion: dict = None) -> str:
+    async def build_prompt(self, mood: str, role: str, translation: str = "FreBBB", special_occasion: dict = None, date: datetime = None) -> str:
+        """Prompt du verset personnalisé, daté (aujourd'hui par défaut): la clé de cache change chaque jour"""
+        date = date or datetime.now()
         # Si une occasion spéciale est présente, l'intégrer dans le prompt
         if special_occasion:
             occasion_context = f"""
@@ -31,6 +142,7 @@ class GeminiService:
         - La personne se sent: {mood}
         - Son rôle/situation: {role}
         - Traduction souhaitée: {translation}
+        - Date: {date.strftime('%d/%m/%Y')}
         {occasion_context}
         
         Instructions:
@@ -66,37 +178,481 @@ class GeminiService:
         }}
         """
 
-    async def get_personalized_verse(self, mood: str, role: str = "croyant", translation: str = "FreBBB", special_occasion: dict = None) -> Dict:
-        """Génère un verset personnalisé avec l'IA Gemini"""
+    async def generate_text(self, prompt: str, model: str = GEMINI_MODEL, content_type: str = "text") -> str:
+        """
+        Texte généré pour un prompt, avec cache et coalescence des appels identiques
+
+        Une réponse déjà obtenue est servie par le cache (LRU mémoire puis Redis).
+        Sinon, les appelants concurrents d'un même prompt (même modèle) partagent
+        un seul appel Gemini: dans le processus via une future commune, entre
+        processus via un verrou Redis et un résultat partagé.
+
+        Args:
+            prompt: Prompt complet
+            model: Modèle Gemini
+            content_type: Type de contenu, qui fixe la durée de vie en cache
+
+        Returns:
+            Texte de la réponse (sans balises ```json)
+        """
+        key = prompt_key(prompt, model)
+
+        cached = await llm_cache.aget(key)
+        if cached is not None:
+            return cached
+
+        future = _inflight.get(key)
+        if future is not None:
+            _coalesce_stats["joined"] += 1
+            # shield: l'annulation d'un appelant n'annule pas l'appel partagé
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
         try:
-            prompt = await self.build_prompt(mood, role, translation, special_occasion)
+            text = await self._generate_shared(key, prompt, model, content_type)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            # Les appelants en attente reçoivent l'erreur et basculent sur leur secours
+            future.set_exception(
+                e if isinstance(e, Exception) else RuntimeError("Appel Gemini annulé"))
+            future.exception()  # évite l'avertissement si personne n'attendait
+            raise
+        finally:
+            _inflight.pop(key, None)
+
+    async def _generate_shared(self, key: str, prompt: str, model: str, content_type: str) -> str:
+        """
+        Appel Gemini unique entre processus (verrou Redis), sinon lecture du résultat partagé
 
-            # Nouvelle API google.genai
-            response = await self.client.aio.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=[{"parts": [{"text": prompt}]}]
-            )
+        Le client Redis est synchrone: chaque aller-retour passe par un thread
+        (asyncio.to_thread) pour ne pas bloquer la boucle d'événements.
 
-            # Parse réponse JSON
-            response_text = response.candidates[0].content.parts[0].text.strip(
+        Le verrou est prolongé tant que son détenteur attend un créneau de
+        gemini_governor puis la réponse: une longue file d'attente ne le fait
+        pas expirer (ce qui lancerait le même appel payant ailleurs). Les autres
+        processus attendent tant qu'il existe; un détenteur mort le laisse
+        expirer en une durée de vie.
+        """
+        lock_key = f"{COALESCE_LOCK_PREFIX}:{key}"
+        result_key = f"{COALESCE_RESULT_PREFIX}:{key}"
+        lock_ttl = int(settings.GEMINI_TIMEOUT_SECONDS) + 5
+        token = uuid.uuid4().hex
+
+        def poll() -> Tuple[Optional[Dict[str, str]], bool]:
+            # Résultat partagé et présence du verrou, en un seul passage par thread
+            return redis_client.get(result_key), redis_client.get(lock_key) is not None
+
+        async def keep_lock():
+            while True:
+                await asyncio.sleep(lock_ttl / COALESCE_LOCK_REFRESHES)
+                if not await asyncio.to_thread(redis_client.expire_if_equals, lock_key, token, lock_ttl):
+                    return
+
+        # Résultat tout juste produit par un autre processus
+        shared = await asyncio.to_thread(redis_client.get, result_key)
+        if shared is not None:
+            _coalesce_stats["remote"] += 1
+            return shared["text"]
+
+        acquired = await asyncio.to_thread(redis_client.set_if_absent, lock_key, token, lock_ttl)
+        if acquired is False:
+            # Un autre processus génère déjà ce prompt: attendre son résultat
+            # (le verrou est prolongé par son détenteur tant que l'appel est en cours)
+            while True:
+                shared, locked = await asyncio.to_thread(poll)
+                if shared is not None:
+                    _coalesce_stats["remote"] += 1
+                    return shared["text"]
+                if not locked:
+                    # Verrou libéré ou expiré sans résultat (échec de l'émetteur): appeler nous-mêmes
+                    break
+                await asyncio.sleep(COALESCE_POLL_SECONDS)
+
+            # Résultat écrit entre les deux lectures de poll(), juste avant la libération
+            shared = await asyncio.to_thread(redis_client.get, result_key)
+            if shared is not None:
+                _coalesce_stats["remote"] += 1
+                return shared["text"]
+
+        refresher = asyncio.create_task(keep_lock()) if acquired else None
+        try:
+            text = await self._call_gemini(prompt, model, content_type)
+            await asyncio.to_thread(redis_client.set, result_key, {"text": text}, COALESCE_RESULT_TTL)
+            if self._is_cacheable(text, content_type):
+                await llm_cache.aset(key, text, content_type)
+            return text
+        finally:
+            if refresher is not None:
+                refresher.cancel()
+            # Ne libérer que notre propre verrou (il a pu expirer et être repris):
+            # comparaison et suppression atomiques côté Redis
+            if acquired:
+                await asyncio.to_thread(redis_client.delete_if_equals, lock_key, token)
+
+    @staticmethod
+    def _is_cacheable(text: str, content_type: str) -> bool:
+        """Les contenus structurés (verset, prières) ne sont cachés que s'ils passent la validation"""
+        if content_type == "text":
+            return True
+        try:
+            validate_response(extract_json(text), content_type)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _generation_config(content_type: str) -> Optional[types.GenerateContentConfig]:
+        """Configuration de sortie JSON contrainte par le schéma du type de contenu"""
+        schema = RESPONSE_SCHEMAS.get(content_type)
+        if schema is None:
+            return None
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=schema
+        )
+
+    async def _call_gemini(self, prompt: str, model: str, content_type: str = "text") -> str:
+        """Appel à l'API Gemini sous le régulateur de débit (abandonné si Gemini est trop lent)"""
+        _coalesce_stats["calls"] += 1
+
+        async def call():
+            # Durée de generate_content seule (hors attente du régulateur)
+            started = time.monotonic()
+            response = await asyncio.wait_for(
+                self.client.aio.models.generate_content(
+                    model=model,
+                    contents=[{"parts": [{"text": prompt}]}],
+                    config=self._generation_config(content_type)
+                ),
+                timeout=settings.GEMINI_TIMEOUT_SECONDS
             )
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
+            llm_metrics.record_api_call(time.monotonic() - started, response.usage_metadata)
+            return response
+
+        response = await gemini_governor.run(call)
 
-            result = json.loads(response_text)
+        return response.candidates[0].content.parts[0].text.strip()
+
+    async def stream_text(self, prompt: str, model: str = GEMINI_MODEL, content_type: str = "text") -> AsyncIterator[str]:
+        """
+        Fragments de texte au fil de la génération (generate_content_stream)
+
+        Une réponse en cache est rendue en un seul fragment. Sinon, le texte
+        assemblé est mis en cache à la fin du flux, comme pour generate_text.
+        Le flux n'est pas coalescé: chaque client reçoit ses propres fragments.
+
+        La lecture de Gemini (sous créneau du régulateur) est découplée du client
+        par une file: un client lent ne retient pas le créneau, et un client qui
+        se déconnecte n'empêche pas la mise en cache de la réponse.
+
+        Args:
+            prompt: Prompt complet
+            model: Modèle Gemini
+            content_type: Type de contenu, qui fixe la durée de vie en cache
+
+        Yields:
+            Fragments de texte bruts
+        """
+        key = prompt_key(prompt, model)
+        cached = await llm_cache.aget(key)
+        if cached is not None:
+            yield cached
+            return
+
+        # Fragments, puis None (fin) ou l'exception du producteur
+        queue: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._produce_stream(prompt, model, content_type, key, queue))
+        _stream_producers.add(producer)
+        producer.add_done_callback(_stream_producers.discard)
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    async def _produce_stream(self, prompt: str, model: str, content_type: str, key: str, queue: asyncio.Queue):
+        """Lit le flux Gemini sous créneau du régulateur et le pousse dans la file du client"""
+        parts: List[str] = []
+        usage = None
+        try:
+            async with gemini_governor.slot() as timing:
+                _coalesce_stats["calls"] += 1
+                stream = await asyncio.wait_for(
+                    self.client.aio.models.generate_content_stream(
+                        model=model,
+                        contents=[{"parts": [{"text": prompt}]}],
+                        config=self._generation_config(content_type)
+                    ),
+                    timeout=settings.GEMINI_TIMEOUT_SECONDS
+                )
+                chunks = stream.__aiter__()
+                while True:
+                    # Délai appliqué à chaque fragment: un flux bloqué est abandonné
+                    try:
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(), timeout=settings.GEMINI_TIMEOUT_SECONDS)
+                    except StopAsyncIteration:
+                        break
+                    # Le dernier fragment porte l'usage cumulé de la réponse
+                    usage = chunk.usage_metadata or usage
+                    text = chunk.text or ""
+                    if text:
+                        # Latence vue par le régulateur: délai jusqu'au premier fragment
+                        timing.first_output()
+                        parts.append(text)
+                        queue.put_nowait(text)
+        except BaseException as e:
+            queue.put_nowait(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        llm_metrics.record_api_call(None, usage, method=f"stream_{content_type}")
+        response_text = "".join(parts).strip()
+        if self._is_cacheable(response_text, content_type):
+            await llm_cache.aset(key, response_text, content_type)
+        queue.put_nowait(None)
+
+    async def stream_personalized_verse(self, mood: str, role: str = "croyant", translation: str = "FreBBB", special_occasion: dict = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Verset personnalisé en streaming
+
+        Yields:
+            ("token", fragment brut) et ("field", {"name", "delta"}) pour chaque
+            champ texte qui progresse, puis ("done", résultat) au même format que
+            get_personalized_verse (secours inclus)
+        """
+        if settings.VERSE_SELECTION_MODE == "local":
+            yield "done", await self.get_personalized_verse(mood, role, translation, special_occasion)
+            return
+
+        extractor = JSONStreamExtractor()
+        try:
+            prompt = await self.build_prompt(mood, role, translation, special_occasion)
+            async for text in self.stream_text(prompt, content_type="verse"):
+                yield "token", text
+                for name, delta in extractor.feed(text).items():
+                    yield "field", {"name": name, "delta": delta}
+
+            result = decode_response(extractor.buffer, "verse", "stream_personalized_verse")
+        except Exception as e:
+            print(f"Erreur streaming verset: {e}")
+            result = await self.get_fallback_verse(mood, special_occasion, translation)
+
+        yield "done", result
+
+    async def stream_prayer(self, prayer_type: str, mood: str = "paix", special_occasion: dict = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Prière du matin ou du soir en streaming
+
+        Yields:
+            ("token", fragment brut) et ("field", {"name", "delta"}) pour chaque
+            champ texte qui progresse, puis ("done", prière) au même format que
+            generate_morning_prayer / generate_evening_prayer
+        """
+        extractor = JSONStreamExtractor()
+        try:
+            if prayer_type == "morning":
+                prompt = await self.build_morning_prayer_prompt(mood, special_occasion)
+            else:
+                prompt = await self.build_evening_prayer_prompt(mood, special_occasion)
+
+            async for text in self.stream_text(prompt, content_type=f"{prayer_type}_prayer"):
+                yield "token", text
+                for name, delta in extractor.feed(text).items():
+                    yield "field", {"name": name, "delta": delta}
+
+            result = decode_response(extractor.buffer, f"{prayer_type}_prayer", "stream_prayer")
+        except Exception as e:
+            print(f"Erreur streaming prière ({prayer_type}): {e}")
+            if prayer_type == "morning":
+                result = await self._get_fallback_morning_prayer(mood, special_occasion)
+            else:
+                result = await self._get_fallback_evening_prayer(mood, special_occasion)
+
+        yield "done", result
+
+    async def build_batch_prompt(self, items: List[Dict], role: str = "croyant", date: datetime = None) -> str:
+        """Prompt unique pour plusieurs demandes de verset (instructions pastorales partagées), daté comme build_prompt"""
+        date = date or datetime.now()
+        requests = []
+        for index, item in enumerate(items, start=1):
+            occasion = item.get("special_occasion")
+            line = f"{index}. Émotion: {item['mood']} | Traduction: {item.get('translation', 'FreBBB')}"
+            if occasion:
+                line += (f" | OCCASION SPÉCIALE (prioritaire sur l'émotion): {occasion.get('description', '')}"
+                         f" - thèmes: {', '.join(occasion.get('themes', []))}")
+            requests.append(line)
+        requests_text = "\n        ".join(requests)
+
+        return f"""
+        Tu es un PASTEUR expérimenté et bienveillant qui enseigne les Écritures à ses disciples avec sagesse et profondeur.
+
+        Rôle/situation des personnes: {role}
+        Date: {date.strftime('%d/%m/%Y')}
+
+        Demandes (une par ligne):
+        {requests_text}
+
+        Instructions, pour CHAQUE demande:
+        1. Si une OCCASION SPÉCIALE est indiquée, choisis un verset qui correspond PARFAITEMENT à cet événement chrétien; sinon propose UN SEUL verset biblique pertinent en français pour l'émotion
+        2. Assure-toi que le verset existe réellement dans la Bible
+        3. Comme un PASTEUR qui prêche et enseigne, donne une réflexion DÉTAILLÉE et PROFONDE (5-7 phrases minimum) qui explique le contexte biblique, développe la signification spirituelle, l'applique à la vie quotidienne, encourage avec des exemples concrets et inspire à l'action et à la foi
+        4. Des demandes différentes doivent recevoir des versets différents
+
+        Réponds EXACTEMENT par un tableau JSON, un objet par demande, dans ce format:
+        [
+          {{
+            "index": 1,
+            "reference": "Livre Chapitre:Verset",
+            "reflection": "Réflexion pastorale détaillée (5-7 phrases)",
+            "visual_elements": "Éléments visuels du verset pour illustration"
+          }}
+        ]
+        """
+
+    @staticmethod
+    def _parse_batch_response(text: str, count: int) -> List[Optional[Dict]]:
+        """
+        Associe les objets d'une réponse groupée aux demandes et valide chacun
+
+        Returns:
+            Un résultat par demande, None si l'objet est absent ou invalide
+        """
+        results: List[Optional[Dict]] = [None] * count
+        stats = _parse_stats.setdefault("get_personalized_verses_batch", {"ok": 0, "failures": 0})
+        try:
+            entries = extract_json(text)
+        except ValueError:
+            entries = None
+        if isinstance(entries, dict):
+            entries = [entries]
+        if not isinstance(entries, list):
+            stats["failures"] += count
+            return results
+
+        for position, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("index", position + 1)
+            if not isinstance(index, int) or not 1 <= index <= count:
+                continue
+            try:
+                results[index - 1] = validate_response(entry, "verse")
+            except ValueError:
+                continue
+
+        succeeded = sum(1 for result in results if result is not None)
+        stats["ok"] += succeeded
+        stats["failures"] += count - succeeded
+        return results
+
+    @llm_metrics.instrument("verse_batch")
+    async def get_personalized_verses_batch(self, items: List[Dict], role: str = "croyant", date: datetime = None) -> List[Dict]:
+        """
+        Génère les versets de plusieurs demandes avec un seul appel Gemini par lot
+
+        Les demandes déjà en cache sont servies directement. Les autres sont
+        regroupées (GEMINI_BATCH_SIZE par appel); chaque objet de la réponse est
+        validé et mis en cache sous la clé du prompt unitaire, de sorte qu'un
+        appel à get_personalized_verse pour la même demande ne refait pas
+        d'appel. Seules les demandes en échec sont relancées une par une.
+
+        Args:
+            items: Demandes {"mood", "translation"?, "special_occasion"?}
+            role: Rôle/situation commun aux demandes
+            date: Jour des versets (aujourd'hui par défaut), fixé une fois pour tout le lot
+
+        Returns:
+            Un résultat par demande, dans l'ordre (même format que get_personalized_verse)
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        # Même jour pour les clés unitaires, le lot et les relances (lot à cheval sur minuit)
+        date = date or datetime.now()
+
+        if settings.VERSE_SELECTION_MODE != "local":
+            pending = []
+            for position, item in enumerate(items):
+                prompt = await self.build_prompt(
+                    item["mood"], role, item.get("translation", "FreBBB"), item.get("special_occasion"), date)
+                key = prompt_key(prompt)
+                cached = await llm_cache.aget(key)
+                try:
+                    results[position] = validate_response(extract_json(cached or ""), "verse")
+                except ValueError:
+                    pending.append((position, key))
+
+            batch_size = max(1, settings.GEMINI_BATCH_SIZE)
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                try:
+                    batch_prompt = await self.build_batch_prompt(
+                        [items[position] for position, _ in chunk], role, date)
+                    response_text = await self.generate_text(batch_prompt, content_type="verse_batch")
+                    parsed = self._parse_batch_response(response_text, len(chunk))
+                except Exception as e:
+                    print(f"Erreur génération groupée ({len(chunk)} demandes): {e}")
+                    llm_metrics.record_error(e)
+                    parsed = [None] * len(chunk)
+
+                for (position, key), result in zip(chunk, parsed):
+                    if result is not None:
+                        results[position] = result
+                        await llm_cache.aset(key, json.dumps(result, ensure_ascii=False), "verse")
+
+                failed = sum(1 for result in parsed if result is None)
+                if failed:
+                    print(f"⚠️ Lot Gemini: {failed}/{len(chunk)} demandes invalides, relancées individuellement")
+
+        # Relance unitaire des seules demandes en échec (cache, coalescence et secours inclus)
+        retries = [position for position, result in enumerate(results) if result is None]
+        retried = await asyncio.gather(*[
+            self.get_personalized_verse(
+                items[position]["mood"], role,
+                items[position].get("translation", "FreBBB"),
+                items[position].get("special_occasion"),
+                date)
+            for position in retries
+        ])
+        for position, result in zip(retries, retried):
+            results[position] = result
+
+        return results
+
+    @llm_metrics.instrument("verse")
+    async def get_personalized_verse(self, mood: str, role: str = "croyant", translation: str = "FreBBB", special_occasion: dict = None, date: datetime = None) -> Dict:
+        """Génère un verset personnalisé avec l'IA Gemini (un verset nouveau chaque jour, y compris en cache)"""
+        # Mode rapide: sélection locale sans aller-retour LLM
+        if settings.VERSE_SELECTION_MODE == "local":
+            local_verse = await self.bible_service.recommend_daily_verse(mood, special_occasion, translation)
+            if local_verse:
+                return local_verse
+
+        try:
+            prompt = await self.build_prompt(mood, role, translation, special_occasion, date)
 
-            # Validation format
-            if "reference" not in result or "reflection" not in result:
-                raise ValueError("Format réponse IA invalide")
+            # Appel coalescé: un seul appel Gemini pour les prompts identiques concurrents
+            response_text = await self.generate_text(prompt, content_type="verse")
 
-            return result
+            # Décodage tolérant et validation champ par champ
+            return decode_response(response_text, "verse", "get_personalized_verse")
 
         except Exception as e:
+            llm_metrics.record_error(e)
             # Fallback: verset par défaut selon mood ou occasion
-            return await self.get_fallback_verse(mood, special_occasion)
+            return await self.get_fallback_verse(mood, special_occasion, translation)
 
-    async def get_fallback_verse(self, mood: str, special_occasion: dict = None) -> Dict:
-        """Fallback si IA échoue - versets pré-définis par mood ou occasion"""
+    async def get_fallback_verse(self, mood: str, special_occasion: dict = None, translation: str = "FreBBB") -> Dict:
+        """Fallback si IA échoue - recommandeur local, sinon versets pré-définis par mood ou occasion"""
+        llm_metrics.record_fallback()
+        local_verse = await self.bible_service.recommend_daily_verse(mood, special_occasion, translation)
+        if local_verse:
+            return local_verse
 
         # Versets pour occasions spéciales (prioritaire)
         occasion_fallbacks = {
@@ -156,174 +712,163 @@ class GeminiService:
 
         return fallbacks.get(mood, fallbacks["default"])
 
-    async def generate_morning_prayer(self, mood: str = "paix", special_occasion: dict = None) -> Dict:
+    async def build_morning_prayer_prompt(self, mood: str = "paix", special_occasion: dict = None, date: datetime = None) -> str:
+        """Prompt de la prière du matin (partagé par la génération complète et le streaming), daté si demandé"""
+        date_context = f"\n        - Date: {date.strftime('%d/%m/%Y')}" if date else ""
+        if special_occasion:
+            occasion_context = f"""
+            OCCASION SPÉCIALE (PRIORITAIRE):
+            - Événement: {special_occasion.get('description', '')}
+            - Thèmes spirituels: {', '.join(special_occasion.get('themes', []))}
+            
+            Cette prière du MATIN doit être adaptée à cette occasion.
+            """
+        else:
+            occasion_context = ""
+
+        return f"""
+        Tu es un PASTEUR qui guide ses fidèles dans la prière matinale.
+        
+        Contexte:
+        - Moment: MATIN - Début de journée
+        - État émotionnel: {mood}{date_context}
+        {occasion_context}
+        
+        Instructions:
+        1. Compose une PRIÈRE DU MATIN authentique et profonde (4-6 phrases)
+        2. {'Intègre l\'occasion spéciale dans la prière' if special_occasion else 'Adapte la prière à l\'état émotionnel'}
+        3. Structure de la prière:
+           - Adoration: Reconnaitre qui est Dieu
+           - Gratitude: Remercier pour la nouvelle journée
+           - Supplication: Demander Sa présence et Sa guidance
+           - Engagement: S'engager à vivre pour Lui aujourd'hui
+        4. Ton pastoral, chaleureux, inspirant
+        5. Inclure une bénédiction finale
+        
+        Réponds EXACTEMENT dans ce format JSON:
+        {{
+          "prayer_title": "Titre de la prière (ex: 'Prière du Matin - Nouvel An')",
+          "prayer_text": "Texte complet de la prière, riche et profond",
+          "blessing": "Bénédiction finale courte",
+          "suggested_verse": "Référence biblique en lien (ex: 'Psaume 5:3')"
+        }}
+        
+        Exemple pour Nouvel An:
+        {{
+          "prayer_title": "Prière du Matin - Nouvelle Année",
+          "prayer_text": "Père céleste, en ce premier matin d'une nouvelle année, nous venons devant Ton trône avec des cœurs reconnaissants. Tu as été fidèle hier, Tu es présent aujourd'hui, et Tu seras là demain. Nous Te remettons cette année entière - nos rêves, nos projets, nos incertitudes. Guide nos pas sur le chemin que Tu as préparé pour nous. Que chaque jour soit marqué par Ta présence, chaque décision éclairée par Ta sagesse, et chaque épreuve transformée par Ta grâce. Nous choisissons de marcher dans la foi, sachant que Tu es avec nous.",
+          "blessing": "Que l'Éternel te bénisse et te garde en cette nouvelle année. Amen.",
+          "suggested_verse": "Lamentations 3:22-23"
+        }}
+        """
+
+    @llm_metrics.instrument("morning_prayer")
+    async def generate_morning_prayer(self, mood: str = "paix", special_occasion: dict = None, date: datetime = None) -> Dict:
         """
         Génère une prière du matin personnalisée avec l'IA Gemini
 
         Args:
             mood: État émotionnel de l'utilisateur
             special_occasion: Occasion spéciale chrétienne si applicable
+            date: Jour de la prière (une prière nouvelle chaque jour, y compris en cache)
 
         Returns:
             Dictionnaire avec la prière et les métadonnées
         """
         try:
-            # Construire le prompt pour la prière du matin
-            if special_occasion:
-                occasion_context = f"""
-                OCCASION SPÉCIALE (PRIORITAIRE):
-                - Événement: {special_occasion.get('description', '')}
-                - Thèmes spirituels: {', '.join(special_occasion.get('themes', []))}
-                
-                Cette prière du MATIN doit être adaptée à cette occasion.
-                """
-            else:
-                occasion_context = ""
-
-            prompt = f"""
-            Tu es un PASTEUR qui guide ses fidèles dans la prière matinale.
-            
-            Contexte:
-            - Moment: MATIN - Début de journée
-            - État émotionnel: {mood}
-            {occasion_context}
-            
-            Instructions:
-            1. Compose une PRIÈRE DU MATIN authentique et profonde (4-6 phrases)
-            2. {'Intègre l\'occasion spéciale dans la prière' if special_occasion else 'Adapte la prière à l\'état émotionnel'}
-            3. Structure de la prière:
-               - Adoration: Reconnaitre qui est Dieu
-               - Gratitude: Remercier pour la nouvelle journée
-               - Supplication: Demander Sa présence et Sa guidance
-               - Engagement: S'engager à vivre pour Lui aujourd'hui
-            4. Ton pastoral, chaleureux, inspirant
-            5. Inclure une bénédiction finale
-            
-            Réponds EXACTEMENT dans ce format JSON:
-            {{
-              "prayer_title": "Titre de la prière (ex: 'Prière du Matin - Nouvel An')",
-              "prayer_text": "Texte complet de la prière, riche et profond",
-              "blessing": "Bénédiction finale courte",
-              "suggested_verse": "Référence biblique en lien (ex: 'Psaume 5:3')"
-            }}
-            
-            Exemple pour Nouvel An:
-            {{
-              "prayer_title": "Prière du Matin - Nouvelle Année",
-              "prayer_text": "Père céleste, en ce premier matin d'une nouvelle année, nous venons devant Ton trône avec des cœurs reconnaissants. Tu as été fidèle hier, Tu es présent aujourd'hui, et Tu seras là demain. Nous Te remettons cette année entière - nos rêves, nos projets, nos incertitudes. Guide nos pas sur le chemin que Tu as préparé pour nous. Que chaque jour soit marqué par Ta présence, chaque décision éclairée par Ta sagesse, et chaque épreuve transformée par Ta grâce. Nous choisissons de marcher dans la foi, sachant que Tu es avec nous.",
-              "blessing": "Que l'Éternel te bénisse et te garde en cette nouvelle année. Amen.",
-              "suggested_verse": "Lamentations 3:22-23"
-            }}
-            """
+            prompt = await self.build_morning_prayer_prompt(mood, special_occasion, date)
 
             # Générer avec Gemini
-            response = await self.client.aio.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=[{"parts": [{"text": prompt}]}]
-            )
-
-            response_text = response.candidates[0].content.parts[0].text.strip(
-            )
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-
-            result = json.loads(response_text)
-
-            # Validation
-            if "prayer_text" not in result:
-                raise ValueError("Format réponse IA invalide")
+            response_text = await self.generate_text(prompt, content_type="morning_prayer")
 
-            return result
+            # Décodage tolérant et validation champ par champ
+            return decode_response(response_text, "morning_prayer", "generate_morning_prayer")
 
         except Exception as e:
             print(f"Erreur génération prière du matin: {e}")
+            llm_metrics.record_error(e)
             return await self._get_fallback_morning_prayer(mood, special_occasion)
 
-    async def generate_evening_prayer(self, mood: str = "paix", special_occasion: dict = None) -> Dict:
+    async def build_evening_prayer_prompt(self, mood: str = "paix", special_occasion: dict = None, date: datetime = None) -> str:
+        """Prompt de la prière du soir (partagé par la génération complète et le streaming), daté si demandé"""
+        date_context = f"\n        - Date: {date.strftime('%d/%m/%Y')}" if date else ""
+        if special_occasion:
+            occasion_context = f"""
+            OCCASION SPÉCIALE (PRIORITAIRE):
+            - Événement: {special_occasion.get('description', '')}
+            - Thèmes spirituels: {', '.join(special_occasion.get('themes', []))}
+            
+            Cette prière du SOIR doit être adaptée à cette occasion.
+            """
+        else:
+            occasion_context = ""
+
+        return f"""
+        Tu es un PASTEUR qui guide ses fidèles dans la prière du soir.
+        
+        Contexte:
+        - Moment: SOIR - Fin de journée
+        - État émotionnel: {mood}{date_context}
+        {occasion_context}
+        
+        Instructions:
+        1. Compose une PRIÈRE DU SOIR authentique et profonde (4-6 phrases)
+        2. {'Intègre l\'occasion spéciale dans la prière' if special_occasion else 'Adapte la prière à l\'état émotionnel'}
+        3. Structure de la prière:
+           - Reconnaissance: Reconnaître la présence de Dieu durant la journée
+           - Bilan: Remercier pour les bénédictions du jour
+           - Repentance: Confesser les manquements
+           - Repos: Demander Sa paix et Sa protection pour la nuit
+        4. Ton apaisant, réconfortant, rassurant
+        5. Inclure une bénédiction finale pour la nuit
+        
+        Réponds EXACTEMENT dans ce format JSON:
+        {{
+          "prayer_title": "Titre de la prière (ex: 'Prière du Soir - Paix')",
+          "prayer_text": "Texte complet de la prière, riche et apaisant",
+          "blessing": "Bénédiction finale pour la nuit",
+          "suggested_verse": "Référence biblique en lien (ex: 'Psaume 4:8')"
+        }}
+        
+        Exemple pour Fin d'année:
+        {{
+          "prayer_title": "Prière du Soir - Fin d'Année",
+          "prayer_text": "Seigneur, alors que ce jour s'achève et que cette année touche à sa fin, nous venons devant Toi avec des cœurs remplis de gratitude. Tu nous as portés à travers chaque saison, chaque épreuve, chaque victoire. Nous Te remettons toutes les joies et les peines de cette année, sachant que Tu as travaillé toutes choses pour notre bien. Pardonne nos erreurs, reçois nos remerciements, et accorde-nous un repos paisible cette nuit. Que nous nous réveillions demain avec des cœurs renouvelés, prêts à embrasser tout ce que Tu as préparé.",
+          "blessing": "Que tu reposes dans la paix du Seigneur cette nuit. Amen.",
+          "suggested_verse": "Psaume 103:2"
+        }}
+        """
+
+    @llm_metrics.instrument("evening_prayer")
+    async def generate_evening_prayer(self, mood: str = "paix", special_occasion: dict = None, date: datetime = None) -> Dict:
         """
         Génère une prière du soir personnalisée avec l'IA Gemini
 
         Args:
             mood: État émotionnel de l'utilisateur
             special_occasion: Occasion spéciale chrétienne si applicable
+            date: Jour de la prière (une prière nouvelle chaque jour, y compris en cache)
 
         Returns:
             Dictionnaire avec la prière et les métadonnées
         """
         try:
-            # Construire le prompt pour la prière du soir
-            if special_occasion:
-                occasion_context = f"""
-                OCCASION SPÉCIALE (PRIORITAIRE):
-                - Événement: {special_occasion.get('description', '')}
-                - Thèmes spirituels: {', '.join(special_occasion.get('themes', []))}
-                
-                Cette prière du SOIR doit être adaptée à cette occasion.
-                """
-            else:
-                occasion_context = ""
-
-            prompt = f"""
-            Tu es un PASTEUR qui guide ses fidèles dans la prière du soir.
-            
-            Contexte:
-            - Moment: SOIR - Fin de journée
-            - État émotionnel: {mood}
-            {occasion_context}
-            
-            Instructions:
-            1. Compose une PRIÈRE DU SOIR authentique et profonde (4-6 phrases)
-            2. {'Intègre l\'occasion spéciale dans la prière' if special_occasion else 'Adapte la prière à l\'état émotionnel'}
-            3. Structure de la prière:
-               - Reconnaissance: Reconnaître la présence de Dieu durant la journée
-               - Bilan: Remercier pour les bénédictions du jour
-               - Repentance: Confesser les manquements
-               - Repos: Demander Sa paix et Sa protection pour la nuit
-            4. Ton apaisant, réconfortant, rassurant
-            5. Inclure une bénédiction finale pour la nuit
-            
-            Réponds EXACTEMENT dans ce format JSON:
-            {{
-              "prayer_title": "Titre de la prière (ex: 'Prière du Soir - Paix')",
-              "prayer_text": "Texte complet de la prière, riche et apaisant",
-              "blessing": "Bénédiction finale pour la nuit",
-              "suggested_verse": "Référence biblique en lien (ex: 'Psaume 4:8')"
-            }}
-            
-            Exemple pour Fin d'année:
-            {{
-              "prayer_title": "Prière du Soir - Fin d'Année",
-              "prayer_text": "Seigneur, alors que ce jour s'achève et que cette année touche à sa fin, nous venons devant Toi avec des cœurs remplis de gratitude. Tu nous as portés à travers chaque saison, chaque épreuve, chaque victoire. Nous Te remettons toutes les joies et les peines de cette année, sachant que Tu as travaillé toutes choses pour notre bien. Pardonne nos erreurs, reçois nos remerciements, et accorde-nous un repos paisible cette nuit. Que nous nous réveillions demain avec des cœurs renouvelés, prêts à embrasser tout ce que Tu as préparé.",
-              "blessing": "Que tu reposes dans la paix du Seigneur cette nuit. Amen.",
-              "suggested_verse": "Psaume 103:2"
-            }}
-            """
+            prompt = await self.build_evening_prayer_prompt(mood, special_occasion, date)
 
             # Générer avec Gemini
-            response = await self.client.aio.models.generate_content(
-                model="gemini-1.5-flash",
-                contents=[{"parts": [{"text": prompt}]}]
-            )
-
-            response_text = response.candidates[0].content.parts[0].text.strip(
-            )
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-
-            result = json.loads(response_text)
-
-            # Validation
-            if "prayer_text" not in result:
-                raise ValueError("Format réponse IA invalide")
+            response_text = await self.generate_text(prompt, content_type="evening_prayer")
 
-            return result
+            # Décodage tolérant et validation champ par champ
+            return decode_response(response_text, "evening_prayer", "generate_evening_prayer")
 
         except Exception as e:
             print(f"Erreur génération prière du soir: {e}")
+            llm_metrics.record_error(e)
             return await self._get_fallback_evening_prayer(mood, special_occasion)
 
     async def _get_fallback_morning_prayer(self, mood: str, special_occasion: dict = None) -> Dict:
         """Prière du matin de fallback si l'IA échoue"""
+        llm_metrics.record_fallback()
 
         # Prières pour occasions spéciales
         occasion_prayers = {
@@ -341,8 +886,9 @@ class GeminiService:
             }
         }
 
+        # is_fallback: prière générique, à ne pas figer dans les caches partagés
         if special_occasion and special_occasion.get("name") in occasion_prayers:
-            return occasion_prayers[special_occasion["name"]]
+            return {**occasion_prayers[special_occasion["name"]], "is_fallback": True}
 
         # Prières par mood
         mood_prayers = {
@@ -360,10 +906,11 @@ class GeminiService:
             }
         }
 
-        return mood_prayers.get(mood, mood_prayers["paix"])
+        return {**mood_prayers.get(mood, mood_prayers["paix"]), "is_fallback": True}
 
     async def _get_fallback_evening_prayer(self, mood: str, special_occasion: dict = None) -> Dict:
         """Prière du soir de fallback si l'IA échoue"""
+        llm_metrics.record_fallback()
 
         # Prières pour occasions spéciales
         occasion_prayers = {
@@ -381,8 +928,9 @@ class GeminiService:
             }
         }
 
+        # is_fallback: prière générique, à ne pas figer dans les caches partagés
         if special_occasion and special_occasion.get("name") in occasion_prayers:
-            return occasion_prayers[special_occasion["name"]]
+            return {**occasion_prayers[special_occasion["name"]], "is_fallback": True}
 
         # Prières par mood
         mood_prayers = {
@@ -400,4 +948,4 @@ class GeminiService:
             }
         }
 
-        return mood_prayers.get(mood, mood_prayers["paix"])
+        return {**mood_prayers.get(mood, mood_prayers["paix"]), "is_fallback": True}
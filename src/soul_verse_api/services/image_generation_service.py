@@ -12,7 +12,6 @@ from pathlib import Path
 # Imports conditionnels avec fallback
 try:
     from PIL import Image, ImageDraw, ImageFont
-    import textwrap
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
@@ -27,7 +26,16 @@ except ImportError:
     logging.warning(
         "httpx not available - API image generation will be disabled")
 
+try:
+    import h2  # noqa: F401 - HTTP/2 pour le pool de connexions httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 from src.soul_verse_api.core.config import settings
+from src.soul_verse_api.core.fake_providers import fake_image_app, is_fake_backend
+from src.soul_verse_api.services.image_renderer import ImageRenderPool, RenderQueueFull, supported_formats
+from src.soul_verse_api.services.image_store import METHOD_QUALITY, ImageStore, parse_filename
 
 # Configuration des logs
 logging.basicConfig(level=logging.INFO)
@@ -41,6 +49,9 @@ class ImageGenerationService:
         self.local_images_dir = Path("storage/verse_images")
         self.local_images_dir.mkdir(parents=True, exist_ok=True)
 
+        # Index des images par empreinte (toutes variantes et fournisseurs)
+        self.store = ImageStore(self.local_images_dir)
+
         # Configuration OpenAI DALL-E
         self.openai_api_key = getattr(settings, 'OPENAI_API_KEY', None)
 
@@ -50,6 +61,32 @@ class ImageGenerationService:
         # Configuration Gemini (pour génération d'images)
         self.gemini_api_key = getattr(settings, 'GEMINI_API_KEY', None)
 
+        # Fournisseurs simulés: API d'images servies en processus par le faux serveur
+        if is_fake_backend():
+            self.openai_api_key = self.openai_api_key or "fake"
+            self.stability_api_key = self.stability_api_key or "fake"
+
+        # Client HTTP partagé (pool keep-alive, HTTP/2), créé au premier appel d'API
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Rendu PIL local dans un pool de processus borné
+        self.render_pool = ImageRenderPool(
+            workers=settings.IMAGE_RENDER_WORKERS,
+            queue_size=settings.IMAGE_RENDER_QUEUE_SIZE,
+            wait_seconds=settings.IMAGE_RENDER_WAIT_SECONDS
+        )
+        # Formats des déclinaisons disponibles dans cette installation de Pillow
+        self.variant_formats = supported_formats(settings.IMAGE_VARIANT_FORMATS)
+
+        # Délais par fournisseur (secondes), le téléchargement DALL-E à part
+        self.provider_timeouts = {
+            "dalle": settings.IMAGE_TIMEOUT_DALLE_SECONDS,
+            "stability": settings.IMAGE_TIMEOUT_STABILITY_SECONDS,
+            "gemini": settings.IMAGE_TIMEOUT_GEMINI_SECONDS,
+            "download": settings.IMAGE_TIMEOUT_DOWNLOAD_SECONDS,
+        }
+
         # Template couleurs et styles
         self.color_themes = {
             "paix": {
@@ -84,6 +121,44 @@ class ImageGenerationService:
             }
         }
 
+    def _create_http_client(self) -> "httpx.AsyncClient":
+        """Client HTTP des API d'images (faux serveur en processus si PROVIDER_BACKEND=fake)"""
+        if is_fake_backend():
+            return httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_image_app))
+
+        return httpx.AsyncClient(
+            http2=settings.IMAGE_HTTP2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.IMAGE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.IMAGE_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.IMAGE_HTTP_KEEPALIVE_SECONDS
+            ),
+            timeout=httpx.Timeout(settings.IMAGE_TIMEOUT_STABILITY_SECONDS, connect=10.0)
+        )
+
+    async def get_http_client(self) -> "httpx.AsyncClient":
+        """
+        Client HTTP partagé par tous les appels d'API d'images
+
+        Les connexions (TCP + TLS) restent ouvertes entre deux images au lieu
+        d'une poignée de main par image. Le client est lié à la boucle
+        d'événements qui l'a créé: une autre boucle (script, test) en obtient un neuf.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = self._create_http_client()
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        """Ferme le pool de connexions HTTP et arrête les processus de rendu (arrêt de l'application)"""
+        self.render_pool.shutdown()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Pool HTTP des API d'images fermé")
+        self._client = None
+        self._client_loop = None
+
     def _generate_image_hash(self, text: str, reference: str, mood: str) -> str:
         """Génère un hash unique pour éviter la régénération d'images identiques"""
         content = f"{text}_{reference}_{mood}".encode('utf-8')
@@ -196,27 +271,36 @@ class ImageGenerationService:
             Dict avec path, url, method utilisée
         """
         try:
-            # Vérifier si l'image existe déjà
+            # Méthode effective: génération locale si la clé du fournisseur manque
+            api_keys = {
+                "gemini": self.gemini_api_key,
+                "dalle": self.openai_api_key,
+                "stability": self.stability_api_key
+            }
+            if not api_keys.get(method):
+                method = "local"
+
+            # Vérifier si l'image existe déjà (toute variante de qualité suffisante)
             image_hash = self._generate_image_hash(verse_text, reference, mood)
-            existing_image = await self._check_existing_image(image_hash)
+            existing_image = await self._check_existing_image(image_hash, method)
 
             if existing_image:
-                logger.info(f"Image existante trouvée: {image_hash}")
-                return existing_image
+                logger.info(f"Image existante trouvée: {image_hash} ({existing_image['variant']})")
+                return await self._attach_variants(existing_image)
 
             # Générer nouvelle image selon la méthode
-            if method == "gemini" and self.gemini_api_key:
+            if method == "gemini":
                 result = await self._generate_with_gemini(verse_text, reference, mood, image_hash)
-            elif method == "dalle" and self.openai_api_key:
+            elif method == "dalle":
                 result = await self._generate_with_dalle(verse_text, reference, mood, image_hash)
-            elif method == "stability" and self.stability_api_key:
+            elif method == "stability":
                 result = await self._generate_with_stability(verse_text, reference, mood, image_hash, ai_visual_elements)
             else:
                 result = await self._generate_local_image(verse_text, reference, mood, image_hash)
 
             if result:
                 logger.info(f"Image générée avec succès: {result['method']}")
-                return result
+                return await self._attach_variants(result)
             else:
                 logger.error("Échec génération image")
                 return None
@@ -225,21 +309,71 @@ class ImageGenerationService:
             logger.error(f"Erreur génération image: {e}")
             return None
 
-    async def _check_existing_image(self, image_hash: str) -> Optional[Dict[str, Any]]:
-        """Vérifie si une image existe déjà"""
-        local_path = self.local_images_dir / f"{image_hash}.png"
+    async def _check_existing_image(self, image_hash: str, method: str = "local") -> Optional[Dict[str, Any]]:
+        """
+        Vérifie si une image existe déjà, quel que soit le fournisseur qui l'a produite
+
+        Un placeholder SVG ne satisfait aucune méthode, une image locale ne
+        satisfait pas une demande Stability/DALL-E (elle serait figée en cache).
+        """
+        # Relecture éventuelle du manifeste (autre worker) hors de la boucle d'événements
+        record = await asyncio.to_thread(self.store.lookup, image_hash, METHOD_QUALITY.get(method, 1))
 
-        if local_path.exists():
+        if record:
             return {
-                "image_path": str(local_path),
-                "image_url": f"/static/verse_images/{image_hash}.png",
+                "image_path": str(self.local_images_dir / record["file"]),
+                "image_url": f"/static/verse_images/{record['file']}",
                 "image_hash": image_hash,
                 "method": "cached",
-                "generated_at": datetime.fromtimestamp(local_path.stat().st_mtime).isoformat()
+                "variant": record["variant"],
+                "source_method": record["method"],
+                "generated_at": record["generated_at"]
             }
 
         return None
 
+    async def _attach_variants(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ajoute au résultat les URLs des déclinaisons WebP/AVIF et du JPEG de notification
+
+        Les déclinaisons sont produites une seule fois par image (pool de rendu)
+        puis lues dans le manifeste. En cas d'échec ou de file pleine, l'image
+        d'origine reste servie seule.
+        """
+        if not PIL_AVAILABLE or not result.get("image_path"):
+            return result
+
+        filename = Path(result["image_path"]).name
+        parsed = parse_filename(filename)
+        record = self.store.record_for(filename)
+        if parsed is None or record is None or parsed[1] == "placeholder":
+            return result
+
+        derivatives = record.get("derivatives")
+        if derivatives is None:
+            try:
+                derivatives = await self.render_pool.derive(
+                    result["image_path"],
+                    settings.IMAGE_VARIANT_WIDTHS,
+                    self.variant_formats,
+                    settings.IMAGE_NOTIFICATION_WIDTH,
+                    settings.IMAGE_NOTIFICATION_MAX_BYTES
+                )
+            except RenderQueueFull as e:
+                logger.warning(f"{e} - déclinaisons reportées")
+                return result
+            except Exception as e:
+                logger.error(f"Erreur déclinaisons image {filename}: {e}")
+                return result
+            await asyncio.to_thread(self.store.set_derivatives, parsed[0], parsed[1], derivatives)
+
+        result["variants"] = {
+            fmt: {width: f"/static/verse_images/{name}" for width, name in derivatives[fmt].items()}
+            for fmt in self.variant_formats if fmt in derivatives
+        }
+        result["notification_image_url"] = f"/static/verse_images/{derivatives['notification']}"
+        return result
+
     async def _generate_local_image(
         self,
         verse_text: str,
@@ -256,89 +390,15 @@ class ImageGenerationService:
             return await self._create_simple_placeholder(verse_text, reference, mood, image_hash)
 
         try:
-            # Dimensions de l'image
-            width, height = 800, 600
-
             # Thème couleur selon mood
             theme = self.color_themes.get(mood, self.color_themes["default"])
+            tmp_path = self.store.temp_path_for(image_hash, "local")
 
-            # Créer l'image
-            image = Image.new('RGBA', (width, height), theme["background"])
-            draw = ImageDraw.Draw(image)
-
-            # Charger ou créer une font
-            try:
-                # Essayer de charger une belle police
-                font_large = ImageFont.truetype(
-                    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-                font_medium = ImageFont.truetype(
-                    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 20)
-                font_small = ImageFont.truetype(
-                    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-            except (OSError, IOError):
-                # Fallback vers police par défaut
-                font_large = ImageFont.load_default()
-                font_medium = ImageFont.load_default()
-                font_small = ImageFont.load_default()
-
-            # Wrapper le texte pour qu'il tienne dans l'image
-            wrapper = textwrap.TextWrapper(width=50)
-            wrapped_verse = wrapper.wrap(verse_text)
-
-            # Position de départ
-            y_offset = 80
-            line_height = 35
-
-            # Dessiner le titre "Verset du Jour"
-            title = "Verset du Jour"
-            title_bbox = draw.textbbox((0, 0), title, font=font_large)
-            title_width = title_bbox[2] - title_bbox[0]
-            draw.text(
-                ((width - title_width) // 2, 30),
-                title,
-                fill=theme["accent"],
-                font=font_large
-            )
-
-            # Dessiner le texte du verset
-            for line in wrapped_verse:
-                line_bbox = draw.textbbox((0, 0), line, font=font_medium)
-                line_width = line_bbox[2] - line_bbox[0]
-                draw.text(
-                    ((width - line_width) // 2, y_offset),
-                    line,
-                    fill=theme["text"],
-                    font=font_medium
-                )
-                y_offset += line_height
-
-            # Dessiner la référence
-            ref_bbox = draw.textbbox((0, 0), reference, font=font_small)
-            ref_width = ref_bbox[2] - ref_bbox[0]
-            draw.text(
-                ((width - ref_width) // 2, height - 60),
-                reference,
-                fill=theme["accent"],
-                font=font_small
-            )
-
-            # Ajouter un mood indicator (petit cercle coloré)
-            mood_color = {
-                "paix": (0, 255, 0, 255),      # Vert
-                "joie": (255, 255, 0, 255),    # Jaune
-                "tristesse": (128, 128, 128, 255),  # Gris
-                "anxiété": (128, 0, 128, 255),  # Violet
-                "gratitude": (255, 140, 0, 255)  # Orange foncé
-            }.get(mood, (255, 255, 255, 255))
-
-            draw.ellipse(
-                [width - 50, height - 50, width - 20, height - 20],
-                fill=mood_color
-            )
-
-            # Sauvegarder l'image
-            image_path = self.local_images_dir / f"{image_hash}.png"
-            image.save(image_path, "PNG", quality=95)
+            # Dessin, mesure du texte et encodage PNG dans un processus de rendu
+            await self.render_pool.render(verse_text, reference, mood, theme, str(tmp_path))
+            # Manifeste sous verrou fcntl (autres workers): hors de la boucle d'événements
+            image_path = await asyncio.to_thread(
+                self.store.commit, image_hash, "local", tmp_path, "local_generation", mood)
 
             return {
                 "image_path": str(image_path),
@@ -349,6 +409,11 @@ class ImageGenerationService:
                 "mood_theme": mood
             }
 
+        except RenderQueueFull as e:
+            # Contre-pression: placeholder SVG immédiat plutôt qu'une attente sans fin
+            logger.warning(f"{e} - placeholder SVG")
+            return await self._create_simple_placeholder(verse_text, reference, mood, image_hash)
+
         except Exception as e:
             logger.error(f"Erreur génération locale: {e}")
             return None
@@ -410,10 +475,8 @@ class ImageGenerationService:
 </svg>"""
 
             # Sauvegarder le SVG
-            image_path = self.local_images_dir / \
-                f"{image_hash}_placeholder.svg"
-            with open(image_path, 'w', encoding='utf-8') as f:
-                f.write(svg_content)
+            image_path = await asyncio.to_thread(
+                self.store.write, image_hash, "placeholder", svg_content, "svg_placeholder", mood)
 
             return {
                 "image_path": str(image_path),
@@ -465,51 +528,50 @@ class ImageGenerationService:
             No specific text needed in the image.
             """
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                headers = {
-                    "Authorization": f"Bearer {self.openai_api_key}",
-                    "Content-Type": "application/json"
-                }
+            client = await self.get_http_client()
+            headers = {
+                "Authorization": f"Bearer {self.openai_api_key}",
+                "Content-Type": "application/json"
+            }
 
-                data = {
-                    "model": "dall-e-3",
-                    "prompt": prompt,
-                    "size": "1024x1024",
-                    "quality": "standard",
-                    "n": 1
-                }
+            data = {
+                "model": "dall-e-3",
+                "prompt": prompt,
+                "size": "1024x1024",
+                "quality": "standard",
+                "n": 1
+            }
 
-                response = await client.post(
-                    "https://api.openai.com/v1/images/generations",
-                    headers=headers,
-                    json=data
-                )
+            response = await client.post(
+                f"{settings.OPENAI_API_BASE_URL}/v1/images/generations",
+                headers=headers,
+                json=data,
+                timeout=self.provider_timeouts["dalle"]
+            )
 
-                if response.status_code == 200:
-                    result = response.json()
-                    image_url = result["data"][0]["url"]
-
-                    # Télécharger et sauvegarder l'image
-                    image_response = await client.get(image_url)
-                    if image_response.status_code == 200:
-                        image_path = self.local_images_dir / \
-                            f"{image_hash}_dalle.png"
-
-                        with open(image_path, "wb") as f:
-                            f.write(image_response.content)
-
-                        return {
-                            "image_path": str(image_path),
-                            "image_url": f"/static/verse_images/{image_hash}_dalle.png",
-                            "image_hash": image_hash,
-                            "method": "dalle_3",
-                            "generated_at": datetime.now().isoformat(),
-                            "original_url": image_url
-                        }
-
-                logger.error(
-                    f"Erreur DALL-E: {response.status_code} - {response.text}")
-                return None
+            if response.status_code == 200:
+                result = response.json()
+                image_url = result["data"][0]["url"]
+
+                # Télécharger et sauvegarder l'image
+                image_response = await client.get(
+                    image_url, timeout=self.provider_timeouts["download"])
+                if image_response.status_code == 200:
+                    image_path = await asyncio.to_thread(
+                        self.store.write, image_hash, "dalle", image_response.content, "dalle_3", mood)
+
+                    return {
+                        "image_path": str(image_path),
+                        "image_url": f"/static/verse_images/{image_hash}_dalle.png",
+                        "image_hash": image_hash,
+                        "method": "dalle_3",
+                        "generated_at": datetime.now().isoformat(),
+                        "original_url": image_url
+                    }
+
+            logger.error(
+                f"Erreur DALL-E: {response.status_code} - {response.text}")
+            return None
 
         except Exception as e:
             logger.error(f"Erreur DALL-E: {e}")
@@ -550,78 +612,80 @@ class ImageGenerationService:
             High quality, beautiful composition, peaceful atmosphere.
             """
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                headers = {
-                    "Authorization": f"Bearer {self.gemini_api_key}",
-                    "Content-Type": "application/json"
-                }
+            client = await self.get_http_client()
+            headers = {
+                "Authorization": f"Bearer {self.gemini_api_key}",
+                "Content-Type": "application/json"
+            }
 
-                # Utiliser l'API Gemini pour la génération d'images
-                data = {
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.4,
-                        "candidateCount": 1,
-                        "maxOutputTokens": 2048,
-                    }
+            # Utiliser l'API Gemini pour la génération d'images
+            data = {
+                "contents": [{
+                    "parts": [{
+                        "text": prompt
+                    }]
+                }],
+                "generationConfig": {
+                    "temperature": 0.4,
+                    "candidateCount": 1,
+                    "maxOutputTokens": 2048,
                 }
+            }
 
-                # Note: URL d'exemple - l'API Gemini pour images peut différer
-                response = await client.post(
-                    f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro-vision:generateContent?key={self.gemini_api_key}",
-                    headers=headers,
-                    json=data
-                )
+            # Note: URL d'exemple - l'API Gemini pour images peut différer
+            response = await client.post(
+                f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro-vision:generateContent?key={self.gemini_api_key}",
+                headers=headers,
+                json=data,
+                timeout=self.provider_timeouts["gemini"]
+            )
 
-                if response.status_code == 200:
-                    result = response.json()
-
-                    # Traiter la réponse Gemini (adapter selon l'API réelle)
-                    if "candidates" in result and result["candidates"]:
-                        candidate = result["candidates"][0]
-
-                        # Si Gemini retourne une URL d'image ou des données d'image
-                        if "content" in candidate:
-                            # Sauvegarder l'image générée
-                            image_path = self.local_images_dir / \
-                                f"{image_hash}_gemini.png"
-
-                            # Créer une image placeholder pour l'instant
-                            # En attente de l'implémentation complète de l'API Gemini images
-                            if PIL_AVAILABLE:
-                                from PIL import Image, ImageDraw, ImageFont
-                                img = Image.new(
-                                    'RGB', (512, 512), color=(220, 220, 255))
-                                draw = ImageDraw.Draw(img)
-
-                                try:
-                                    font = ImageFont.truetype(
-                                        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
-                                except:
-                                    font = ImageFont.load_default()
-
-                                draw.text((50, 200), "Gemini Generated",
-                                          fill=(100, 50, 150), font=font)
-                                draw.text((50, 250), f"Mood: {mood}", fill=(
-                                    150, 100, 200), font=font)
-                                img.save(image_path)
-
-                                return {
-                                    "image_path": str(image_path),
-                                    "image_url": f"/static/verse_images/{image_hash}_gemini.png",
-                                    "image_hash": image_hash,
-                                    "method": "gemini",
-                                    "generated_at": datetime.now().isoformat(),
-                                    "mood_theme": mood
-                                }
-
-                logger.error(
-                    f"Erreur Gemini: {response.status_code} - {response.text}")
-                return None
+            if response.status_code == 200:
+                result = response.json()
+
+                # Traiter la réponse Gemini (adapter selon l'API réelle)
+                if "candidates" in result and result["candidates"]:
+                    candidate = result["candidates"][0]
+
+                    # Si Gemini retourne une URL d'image ou des données d'image
+                    if "content" in candidate:
+                        # Sauvegarder l'image générée
+                        tmp_path = self.store.temp_path_for(image_hash, "gemini")
+
+                        # Créer une image placeholder pour l'instant
+                        # En attente de l'implémentation complète de l'API Gemini images
+                        if PIL_AVAILABLE:
+                            from PIL import Image, ImageDraw, ImageFont
+                            img = Image.new(
+                                'RGB', (512, 512), color=(220, 220, 255))
+                            draw = ImageDraw.Draw(img)
+
+                            try:
+                                font = ImageFont.truetype(
+                                    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
+                            except:
+                                font = ImageFont.load_default()
+
+                            draw.text((50, 200), "Gemini Generated",
+                                      fill=(100, 50, 150), font=font)
+                            draw.text((50, 250), f"Mood: {mood}", fill=(
+                                150, 100, 200), font=font)
+                            img.save(tmp_path, "PNG")
+                            image_path = await asyncio.to_thread(
+                                self.store.commit, image_hash, "gemini", tmp_path, "gemini", mood)
+
+                            return {
+                                "image_path": str(image_path),
+                                "image_url": f"/static/verse_images/{image_hash}_gemini.png",
+                                "image_hash": image_hash,
+                                "method": "gemini",
+                                "generated_at": datetime.now().isoformat(),
+                                "mood_theme": mood
+                            }
+
+            logger.error(
+                f"Erreur Gemini: {response.status_code} - {response.text}")
+            return None
 
         except Exception as e:
             logger.error(f"Erreur Gemini: {e}")
@@ -739,62 +803,60 @@ class ImageGenerationService:
             photographic, realistic photo, selfie, contemporary clothing
             """
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                headers = {
-                    "Authorization": f"Bearer {self.stability_api_key}",
-                    "Accept": "application/json"
-                }
-
-                data = {
-                    "text_prompts": [
-                        {
-                            "text": prompt.strip(),
-                            "weight": 1.0
-                        },
-                        {
-                            "text": negative_prompt.strip(),
-                            "weight": -1.0
-                        }
-                    ],
-                    "cfg_scale": 9,  # Augmenté pour meilleure adhérence au prompt
-                    "height": 1024,
-                    "width": 1024,
-                    "samples": 1,
-                    "steps": 40,  # Augmenté pour meilleure qualité
-                    "style_preset": "digital-art",  # Style artistique
-                    "sampler": "K_DPMPP_2M"  # Meilleur sampler pour détails
-                }
+            client = await self.get_http_client()
+            headers = {
+                "Authorization": f"Bearer {self.stability_api_key}",
+                "Accept": "application/json"
+            }
 
-                response = await client.post(
-                    "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
-                    headers=headers,
-                    json=data
-                )
+            data = {
+                "text_prompts": [
+                    {
+                        "text": prompt.strip(),
+                        "weight": 1.0
+                    },
+                    {
+                        "text": negative_prompt.strip(),
+                        "weight": -1.0
+                    }
+                ],
+                "cfg_scale": 9,  # Augmenté pour meilleure adhérence au prompt
+                "height": 1024,
+                "width": 1024,
+                "samples": 1,
+                "steps": 40,  # Augmenté pour meilleure qualité
+                "style_preset": "digital-art",  # Style artistique
+                "sampler": "K_DPMPP_2M"  # Meilleur sampler pour détails
+            }
 
-                if response.status_code == 200:
-                    result = response.json()
+            response = await client.post(
+                f"{settings.STABILITY_API_BASE_URL}/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
+                headers=headers,
+                json=data,
+                timeout=self.provider_timeouts["stability"]
+            )
 
-                    # Décoder l'image base64
-                    image_data = base64.b64decode(
-                        result["artifacts"][0]["base64"])
+            if response.status_code == 200:
+                result = response.json()
 
-                    image_path = self.local_images_dir / \
-                        f"{image_hash}_stability.png"
+                # Décoder l'image base64
+                image_data = base64.b64decode(
+                    result["artifacts"][0]["base64"])
 
-                    with open(image_path, "wb") as f:
-                        f.write(image_data)
+                image_path = await asyncio.to_thread(
+                    self.store.write, image_hash, "stability", image_data, "stability_ai", mood)
 
-                    return {
-                        "image_path": str(image_path),
-                        "image_url": f"/static/verse_images/{image_hash}_stability.png",
-                        "image_hash": image_hash,
-                        "method": "stability_ai",
-                        "generated_at": datetime.now().isoformat()
-                    }
+                return {
+                    "image_path": str(image_path),
+                    "image_url": f"/static/verse_images/{image_hash}_stability.png",
+                    "image_hash": image_hash,
+                    "method": "stability_ai",
+                    "generated_at": datetime.now().isoformat()
+                }
 
-                logger.error(
-                    f"Erreur Stability: {response.status_code} - {response.text}")
-                return None
+            logger.error(
+                f"Erreur Stability: {response.status_code} - {response.text}")
+            return None
 
         except Exception as e:
             logger.error(f"Erreur Stability AI: {e}")
@@ -853,16 +915,10 @@ class ImageGenerationService:
         }
 
     async def cleanup_old_images(self, days_old: int = 7):
-        """Nettoie les images anciennes"""
+        """Nettoie les images anciennes (toutes variantes, manifeste mis à jour)"""
         try:
-            import time
-            current_time = time.time()
-
-            for image_file in self.local_images_dir.glob("*.png"):
-                file_age = current_time - image_file.stat().st_mtime
-                if file_age > (days_old * 24 * 3600):  # Convertir jours en secondes
-                    image_file.unlink()
-                    logger.info(f"Image supprimée: {image_file.name}")
+            await asyncio.to_thread(
+                self.store.remove_older_than, days_old * 24 * 3600)  # Convertir jours en secondes
 
         except Exception as e:
             logger.error(f"Erreur nettoyage images: {e}")
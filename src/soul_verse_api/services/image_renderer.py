@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import os
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Module chargé par les processus de rendu: aucune dépendance à l'application
+try:
+    from PIL import Image, ImageDraw, ImageFont, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Configuration des logs
+logger = logging.getLogger(__name__)
+
+IMAGE_SIZE = (800, 600)
+FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+FONT_REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+MOOD_COLORS = {
+    "paix": (0, 255, 0, 255),      # Vert
+    "joie": (255, 255, 0, 255),    # Jaune
+    "tristesse": (128, 128, 128, 255),  # Gris
+    "anxiété": (128, 0, 128, 255),  # Violet
+    "gratitude": (255, 140, 0, 255)  # Orange foncé
+}
+
+# Réglages d'encodage des déclinaisons (qualité perçue proche du PNG, poids divisé)
+DERIVATIVE_ENCODERS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", {"quality": 55, "speed": 8}),
+}
+NOTIFICATION_QUALITIES = (85, 75, 65, 55)
+
+# Polices du processus de rendu, chargées une fois par l'initialiseur du pool
+_fonts: Optional[Tuple[Any, Any, Any]] = None
+
+
+class RenderQueueFull(Exception):
+    """File de rendu pleine au-delà du délai d'attente (contre-pression)"""
+    pass
+
+
+def load_fonts() -> Tuple[Any, Any, Any]:
+    """Polices titre, verset et référence (police par défaut si DejaVu est absente)"""
+    global _fonts
+    if _fonts is None:
+        try:
+            _fonts = (
+                ImageFont.truetype(FONT_BOLD, 24),
+                ImageFont.truetype(FONT_REGULAR, 20),
+                ImageFont.truetype(FONT_REGULAR, 16),
+            )
+        except (OSError, IOError):
+            default = ImageFont.load_default()
+            _fonts = (default, default, default)
+    return _fonts
+
+
+def render_verse_image(verse_text: str, reference: str, mood: str, theme: Dict[str, tuple], image_path: str):
+    """
+    Dessine l'image d'un verset et l'enregistre en PNG (exécuté dans un processus de rendu)
+
+    Args:
+        verse_text: Texte du verset
+        reference: Référence biblique
+        mood: Mood (couleur de l'indicateur)
+        theme: Couleurs "background", "text" et "accent" (RGBA)
+        image_path: Fichier PNG de destination
+    """
+    width, height = IMAGE_SIZE
+    font_large, font_medium, font_small = load_fonts()
+
+    image = Image.new('RGBA', (width, height), theme["background"])
+    draw = ImageDraw.Draw(image)
+
+    # Titre centré
+    title = "Verset du Jour"
+    title_bbox = draw.textbbox((0, 0), title, font=font_large)
+    draw.text(((width - (title_bbox[2] - title_bbox[0])) // 2, 30),
+              title, fill=theme["accent"], font=font_large)
+
+    # Texte du verset, ligne par ligne
+    y_offset, line_height = 80, 35
+    for line in textwrap.TextWrapper(width=50).wrap(verse_text):
+        line_bbox = draw.textbbox((0, 0), line, font=font_medium)
+        draw.text(((width - (line_bbox[2] - line_bbox[0])) // 2, y_offset),
+                  line, fill=theme["text"], font=font_medium)
+        y_offset += line_height
+
+    # Référence
+    ref_bbox = draw.textbbox((0, 0), reference, font=font_small)
+    draw.text(((width - (ref_bbox[2] - ref_bbox[0])) // 2, height - 60),
+              reference, fill=theme["accent"], font=font_small)
+
+    # Indicateur de mood (petit cercle coloré)
+    draw.ellipse([width - 50, height - 50, width - 20, height - 20],
+                 fill=MOOD_COLORS.get(mood, (255, 255, 255, 255)))
+
+    image.save(image_path, "PNG")
+
+
+def supported_formats(formats: List[str]) -> List[str]:
+    """Formats de déclinaison pris en charge par l'installation de Pillow"""
+    if not PIL_AVAILABLE:
+        return []
+    return [fmt for fmt in formats if fmt in DERIVATIVE_ENCODERS and features.check(fmt)]
+
+
+def _save_atomic(image, path: str, encoder: str, **options) -> int:
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.getpid()}.{os.path.basename(path)}")
+    image.save(tmp_path, encoder, **options)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def render_derivatives(
+    source_path: str,
+    widths: List[int],
+    formats: List[str],
+    notification_width: int,
+    notification_max_bytes: int
+) -> Dict[str, Any]:
+    """
+    Déclinaisons d'une image stockée (exécuté dans un processus de rendu)
+
+    Pour chaque format et chaque largeur (bornée par la largeur d'origine):
+    {stem}.w{largeur}.{format}. Plus un JPEG de notification {stem}.notification.jpg,
+    dont la qualité baisse jusqu'à passer sous notification_max_bytes.
+
+    Returns:
+        {"webp": {"320": fichier, ...}, "avif": {...}, "notification": fichier, "bytes": {fichier: taille}}
+    """
+    directory = os.path.dirname(source_path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    derivatives: Dict[str, Any] = {"bytes": {}}
+
+    with Image.open(source_path) as source:
+        source.load()
+        image = source.convert("RGBA") if source.mode not in ("RGB", "RGBA") else source
+
+        for width in sorted({min(width, image.width) for width in widths}):
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                encoder, options = DERIVATIVE_ENCODERS[fmt]
+                filename = f"{stem}.w{width}.{fmt}"
+                derivatives["bytes"][filename] = _save_atomic(
+                    resized, os.path.join(directory, filename), encoder, **options)
+                derivatives.setdefault(fmt, {})[str(width)] = filename
+
+        # JPEG de notification: pas de transparence, taille bornée pour FCM
+        width = min(notification_width, image.width)
+        notification = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        if notification.mode == "RGBA":
+            background = Image.new("RGB", notification.size, (255, 255, 255))
+            background.paste(notification, mask=notification.getchannel("A"))
+            notification = background
+        filename = f"{stem}.notification.jpg"
+        for quality in NOTIFICATION_QUALITIES:
+            size = _save_atomic(notification.convert("RGB"), os.path.join(directory, filename),
+                                "JPEG", quality=quality, optimize=True, progressive=True)
+            if size <= notification_max_bytes:
+                break
+        derivatives["notification"] = filename
+        derivatives["bytes"][filename] = size
+
+    return derivatives
+
+
+class ImageRenderPool:
+    """
+    Rendu PIL des images locales dans un pool de processus.
+
+    Le dessin, la mesure du texte et l'encodage PNG ne bloquent plus la boucle
+    d'événements. Les rendus admis sont bornés (processus + file d'attente): au-delà,
+    l'appelant attend une place au plus `wait_seconds` puis reçoit RenderQueueFull,
+    pour que le pic d'images du job quotidien ne fasse pas grimper la latence de l'API.
+    """
+
+    def __init__(self, workers: int, queue_size: int, wait_seconds: float):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.wait_seconds = wait_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {"rendered": 0, "rejected": 0, "errors": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Polices chargées une fois par processus, pas à chaque image
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=load_fonts)
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.capacity)
+            self._slots_loop = loop
+        return self._slots
+
+    async def render(self, verse_text: str, reference: str, mood: str, theme: Dict[str, tuple], image_path: str):
+        """
+        Rend une image dans un processus du pool
+
+        Raises:
+            RenderQueueFull: Aucune place libérée dans le délai d'attente
+        """
+        await self._run(render_verse_image, verse_text, reference, mood, theme, image_path)
+
+    async def derive(self, source_path: str, widths: List[int], formats: List[str],
+                     notification_width: int, notification_max_bytes: int) -> Dict[str, Any]:
+        """
+        Produit les déclinaisons WebP/AVIF et le JPEG de notification dans un processus du pool
+
+        Raises:
+            RenderQueueFull: Aucune place libérée dans le délai d'attente
+        """
+        return await self._run(render_derivatives, source_path, widths, formats,
+                               notification_width, notification_max_bytes)
+
+    async def _run(self, function: Callable, *args) -> Any:
+        """Exécute une tâche de rendu avec contre-pression (places bornées)"""
+        slots = self._get_slots()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.wait_seconds)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise RenderQueueFull(f"File de rendu pleine ({self.capacity} images en cours)")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(self._get_executor(), function, *args)
+            except BrokenProcessPool:
+                # Processus de rendu tué (mémoire, signal): pool recréé au prochain appel
+                self._executor = None
+                self.stats["errors"] += 1
+                raise
+            self.stats["rendered"] += 1
+            return result
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Processus, capacité, rendus en cours, en attente et compteurs"""
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            **self.stats,
+        }
+
+    def shutdown(self):
+        """Arrête les processus de rendu (arrêt de l'application)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Pool de rendu des images arrêté")
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+# Verrou inter-processus (workers uvicorn) sur le manifeste, POSIX uniquement
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Configuration des logs
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+# Délai max avant qu'une recherche voie les écritures des autres workers
+REFRESH_INTERVAL_SECONDS = 1.0
+
+# Variante -> (suffixe du fichier, qualité). Un appel payant n'est évité que par
+# une image de qualité au moins égale: un placeholder ne remplace jamais Stability.
+VARIANTS = {
+    "local": ("", 1),
+    "stability": ("_stability", 2),
+    "dalle": ("_dalle", 2),
+    "gemini": ("_gemini", 2),
+    "placeholder": ("_placeholder", 0),
+}
+VARIANT_EXTENSIONS = {"placeholder": ".svg"}
+SUFFIX_VARIANTS = {suffix: variant for variant, (suffix, _) in VARIANTS.items()}
+
+# Qualité minimale acceptée en cache selon la méthode demandée
+METHOD_QUALITY = {"local": 1, "stability": 2, "dalle": 2, "gemini": 2}
+
+
+def variant_filename(image_hash: str, variant: str) -> str:
+    """Nom du fichier d'une variante (ex: {hash}_stability.png)"""
+    suffix, _ = VARIANTS[variant]
+    return f"{image_hash}{suffix}{VARIANT_EXTENSIONS.get(variant, '.png')}"
+
+
+def parse_filename(filename: str) -> Optional[Tuple[str, str]]:
+    """(hash, variante) d'un fichier du répertoire d'images, None si inconnu ou temporaire"""
+    stem, extension = os.path.splitext(filename)
+    if stem.startswith("."):
+        return None
+    image_hash, _, suffix = stem.partition("_")
+    variant = SUFFIX_VARIANTS.get(f"_{suffix}" if suffix else "")
+    if variant is None or extension != VARIANT_EXTENSIONS.get(variant, ".png"):
+        return None
+    return image_hash, variant
+
+
+class ImageStore:
+    """
+    Stockage des images de versets adressé par empreinte de contenu.
+
+    Un manifeste (en mémoire et sur disque) indexe chaque empreinte avec toutes
+    ses variantes (local, Stability, DALL-E, placeholder): la recherche est une
+    lecture de dictionnaire, sans accès au disque. Fichiers et manifeste sont
+    écrits de façon atomique (fichier temporaire + os.replace): un autre worker
+    ne voit jamais une image partielle ni un manifeste tronqué.
+
+    Le manifeste sur disque fait foi: toute modification relit le disque,
+    applique le changement et réécrit, sous un verrou fcntl partagé par les
+    workers. La copie en mémoire est remplacée (pas fusionnée) à chaque
+    relecture: une suppression faite par un autre worker n'est pas réintroduite.
+
+    Au démarrage, le manifeste est réconcilié avec le répertoire (fichiers
+    antérieurs au manifeste indexés, entrées sans fichier retirées).
+    """
+
+    def __init__(self, directory: Path, manifest_path: Optional[Path] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = Path(manifest_path or self.directory.parent / f"{self.directory.name}_manifest.json")
+        # Fichier de verrou distinct: le manifeste change d'inode à chaque os.replace
+        self.lock_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".lock")
+        # empreinte -> variante -> métadonnées (fichier, méthode, date, taille)
+        self._images: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # (inode, mtime ns) du manifeste lu ou écrit en dernier
+        self._manifest_version: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "removed": 0}
+        with self._locked():
+            self._load()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Verrou exclusif sur le manifeste: threads du processus et autres workers"""
+        with self._lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _disk_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self._manifest_version = (os.fstat(f.fileno()).st_ino, os.fstat(f.fileno()).st_mtime_ns)
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifeste d'images illisible ({e}) - reconstruction depuis le répertoire")
+            self._manifest_version = None
+            return {}
+        return manifest.get("images", {}) if manifest.get("version") == MANIFEST_VERSION else {}
+
+    def _load(self):
+        """Charge le manifeste puis le réconcilie avec le contenu du répertoire (sous verrou)"""
+        images = self._read_manifest()
+        indexed = {
+            record["file"]
+            for variants in images.values() for record in variants.values()
+        }
+        present = set()
+        added = 0
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                present.add(entry.name)
+                if entry.name in indexed or not entry.is_file():
+                    continue
+                parsed = parse_filename(entry.name)
+                if parsed is None:
+                    continue
+                image_hash, variant = parsed
+                stat = entry.stat()
+                images.setdefault(image_hash, {})[variant] = {
+                    "file": entry.name,
+                    "method": variant,
+                    "generated_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    "bytes": stat.st_size,
+                }
+                added += 1
+
+        removed = 0
+        for image_hash in list(images):
+            for variant in [v for v, r in images[image_hash].items() if r["file"] not in present]:
+                del images[image_hash][variant]
+                removed += 1
+            if not images[image_hash]:
+                del images[image_hash]
+
+        self._images = images
+        if added or removed or self._manifest_version is None:
+            self._persist()
+        logger.info(
+            f"🗂️ Manifeste d'images: {len(images)} empreintes ({added} fichiers indexés, {removed} entrées orphelines retirées)")
+
+    def _refresh_if_changed(self) -> bool:
+        """Remplace la copie en mémoire par le manifeste sur disque s'il a changé (un stat)"""
+        self._last_check = time.monotonic()
+        version = self._disk_version()
+        if version is None or version == self._manifest_version:
+            return False
+        self._images = self._read_manifest()
+        return True
+
+    def _persist(self):
+        """Écrit le manifeste de façon atomique (appelé sous _locked)"""
+        payload = {"version": MANIFEST_VERSION, "images": self._images}
+        tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_version = self._disk_version()
+
+    def path_for(self, image_hash: str, variant: str) -> Path:
+        """Chemin final d'une variante"""
+        return self.directory / variant_filename(image_hash, variant)
+
+    def temp_path_for(self, image_hash: str, variant: str) -> Path:
+        """Chemin temporaire (même répertoire, même extension) avant commit()"""
+        path = self.path_for(image_hash, variant)
+        return path.with_name(f".{os.getpid()}.{path.name}")
+
+    def _best(self, image_hash: str, min_quality: int) -> Optional[Dict[str, Any]]:
+        variants = self._images.get(image_hash)
+        if not variants:
+            return None
+        candidates = [
+            (VARIANTS[variant][1], record["generated_at"], variant)
+            for variant, record in variants.items()
+            if variant in VARIANTS and VARIANTS[variant][1] >= min_quality
+        ]
+        if not candidates:
+            return None
+        _, _, variant = max(candidates)
+        return {"variant": variant, **variants[variant]}
+
+    def lookup(self, image_hash: str, min_quality: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Meilleure variante connue d'une empreinte (sans accès disque si présente)
+
+        Args:
+            image_hash: Empreinte du contenu (texte, référence, mood)
+            min_quality: Qualité minimale acceptée (voir METHOD_QUALITY)
+
+        Returns:
+            Métadonnées de la variante ("variant", "file", "method", ...) ou None
+        """
+        # Écritures des autres workers: relecture au plus une fois par intervalle,
+        # ou immédiatement en cas d'absence (un autre worker a pu la produire)
+        if time.monotonic() - self._last_check > REFRESH_INTERVAL_SECONDS:
+            with self._lock:
+                self._refresh_if_changed()
+        record = self._best(image_hash, min_quality)
+        if record is None:
+            with self._lock:
+                if self._refresh_if_changed():
+                    record = self._best(image_hash, min_quality)
+        self.stats["hits" if record else "misses"] += 1
+        return record
+
+    def record_for(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Métadonnées de la variante servie sous ce nom de fichier (lecture mémoire)"""
+        parsed = parse_filename(filename)
+        if parsed is None:
+            return None
+        return self._images.get(parsed[0], {}).get(parsed[1])
+
+    def set_derivatives(self, image_hash: str, variant: str, derivatives: Dict[str, Any]):
+        """Rattache les déclinaisons (WebP/AVIF, JPEG de notification) à une variante"""
+        with self._locked():
+            self._refresh_if_changed()
+            record = self._images.get(image_hash, {}).get(variant)
+            if record is None:
+                return
+            record["derivatives"] = derivatives
+            self._persist()
+
+    def commit(self, image_hash: str, variant: str, tmp_path: Path, method: str, mood: Optional[str] = None) -> Path:
+        """
+        Publie un fichier écrit à temp_path_for() et l'indexe
+
+        Returns:
+            Chemin final de la variante
+        """
+        path = self.path_for(image_hash, variant)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        record = {
+            "file": path.name,
+            "method": method,
+            "generated_at": datetime.now().isoformat(),
+            "bytes": size,
+        }
+        if mood:
+            record["mood"] = mood
+
+        with self._locked():
+            # Manifeste relu (autres workers) avant modification et réécriture
+            self._refresh_if_changed()
+            self._images.setdefault(image_hash, {})[variant] = record
+            self._persist()
+        self.stats["stores"] += 1
+        return path
+
+    def write(self, image_hash: str, variant: str, content: Union[bytes, str], method: str,
+              mood: Optional[str] = None) -> Path:
+        """Écrit une variante de façon atomique et l'indexe"""
+        tmp_path = self.temp_path_for(image_hash, variant)
+        if isinstance(content, str):
+            tmp_path.write_text(content, encoding="utf-8")
+        else:
+            tmp_path.write_bytes(content)
+        return self.commit(image_hash, variant, tmp_path, method, mood)
+
+    def remove_older_than(self, seconds: float) -> int:
+        """Supprime les variantes générées il y a plus de `seconds` (d'après le manifeste)"""
+        cutoff = datetime.fromtimestamp(time.time() - seconds).isoformat()
+        removed = []
+        with self._locked():
+            self._refresh_if_changed()
+            for image_hash in list(self._images):
+                variants = self._images[image_hash]
+                for variant in [v for v, r in variants.items() if r["generated_at"] < cutoff]:
+                    record = variants.pop(variant)
+                    removed.append(record["file"])
+                    removed.extend(record.get("derivatives", {}).get("bytes", {}))
+                if not variants:
+                    del self._images[image_hash]
+            if removed:
+                self._persist()
+
+            for filename in removed:
+                try:
+                    (self.directory / filename).unlink()
+                    logger.info(f"🧹 Image supprimée: {filename}")
+                except FileNotFoundError:
+                    pass
+        self.stats["removed"] += len(removed)
+        return len(removed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Empreintes, variantes par fournisseur et compteurs de recherche"""
+        variants: Dict[str, int] = {}
+        for image_variants in self._images.values():
+            for variant in image_variants:
+                variants[variant] = variants.get(variant, 0) + 1
+        return {
+            "images": len(self._images),
+            "variants": variants,
+            "manifest": str(self.manifest_path),
+            **self.stats,
+        }
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Enveloppes Markdown ("```json", "```") n'importe où dans la réponse
+CODE_FENCE = re.compile(r"```(?:json|JSON)?")
+CLOSING_AHEAD = re.compile(r"\s*[}\]]")
+MAX_REPAIR_STEPS = 8
+
+_decoder = json.JSONDecoder()
+
+
+def _scan(text: str) -> Tuple[List[str], bool, List[int]]:
+    """
+    Parcourt un document JSON (éventuellement tronqué)
+
+    Returns:
+        (conteneurs encore ouverts, chaîne ouverte, positions des virgules hors chaînes)
+    """
+    stack: List[str] = []
+    commas: List[int] = []
+    in_string = escaped = False
+
+    for pos, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+        elif char == ",":
+            commas.append(pos)
+
+    return stack, in_string, commas
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Retire les virgules finales ("[1, 2,]", '{"a": 1,}') hors des chaînes"""
+    _, _, commas = _scan(text)
+    trailing = [pos for pos in commas if CLOSING_AHEAD.match(text, pos + 1)]
+    for pos in reversed(trailing):
+        text = text[:pos] + text[pos + 1:]
+    return text
+
+
+def close_json(text: str) -> str:
+    """Ferme la chaîne et les conteneurs laissés ouverts par un document tronqué"""
+    stack, in_string, _ = _scan(text)
+    if in_string:
+        if text.endswith("\\"):
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip().rstrip(",")
+    return text + "".join(reversed(stack))
+
+
+def _decode_partial(text: str) -> Any:
+    """Décode un document tronqué: fermeture, puis recul jusqu'au dernier élément complet"""
+    candidate = text
+    for _ in range(MAX_REPAIR_STEPS):
+        try:
+            return _decoder.raw_decode(close_json(candidate))[0]
+        except ValueError:
+            # Clé sans valeur, nombre coupé...: abandonner le dernier élément
+            _, _, commas = _scan(candidate)
+            if not commas:
+                break
+            candidate = candidate[:commas[-1]]
+    raise ValueError("Document JSON incomplet")
+
+
+def extract_json(text: str, partial: bool = False) -> Any:
+    """
+    Premier document JSON (objet ou tableau) d'une réponse de LLM, de façon tolérante
+
+    Ignore le texte autour du document et les balises ```json, corrige les
+    virgules finales et, si partial=True, complète un document tronqué (flux
+    en cours de génération).
+
+    Args:
+        text: Réponse brute
+        partial: Accepter un document inachevé
+
+    Returns:
+        Objet ou tableau décodé
+
+    Raises:
+        ValueError: Si aucun document JSON n'est lisible
+    """
+    text = CODE_FENCE.sub("", text)
+    starts = [pos for pos in (text.find("{"), text.find("[")) if pos >= 0]
+    if not starts:
+        raise ValueError("Aucun document JSON dans la réponse")
+    # Pas de strip(): en flux, l'espace final d'une chaîne ouverte fait partie du texte
+    candidate = text[min(starts):]
+
+    try:
+        return _decoder.raw_decode(candidate)[0]
+    except ValueError:
+        pass
+
+    repaired = strip_trailing_commas(candidate)
+    try:
+        return _decoder.raw_decode(repaired)[0]
+    except ValueError:
+        if not partial:
+            raise
+    return _decode_partial(repaired)
+
+
+class JSONStreamExtractor:
+    """
+    Extraction incrémentale des champs texte d'un objet JSON généré en flux
+
+    feed() renvoie, pour chaque champ texte de premier niveau, le texte
+    apparu depuis l'appel précédent; result() décode le document complet.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._emitted: Dict[str, int] = {}
+
+    def feed(self, chunk: str) -> Dict[str, str]:
+        """
+        Ajoute un fragment et renvoie les nouveaux morceaux de texte par champ
+
+        Args:
+            chunk: Fragment brut du flux
+
+        Returns:
+            {champ: texte ajouté} (vide si rien de nouveau n'est lisible)
+        """
+        self.buffer += chunk
+        try:
+            current = extract_json(self.buffer, partial=True)
+        except ValueError:
+            return {}
+        if not isinstance(current, dict):
+            return {}
+
+        deltas: Dict[str, str] = {}
+        for field, value in current.items():
+            if not isinstance(value, str):
+                continue
+            emitted = self._emitted.get(field, 0)
+            if len(value) > emitted:
+                deltas[field] = value[emitted:]
+                self._emitted[field] = len(value)
+        return deltas
+
+    def result(self) -> Optional[Any]:
+        """Document complet décodé (tolérant), None s'il est illisible"""
+        try:
+            return extract_json(self.buffer)
+        except ValueError:
+            return None
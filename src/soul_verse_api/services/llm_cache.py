@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.soul_verse_api.core.config import settings
+from src.soul_verse_api.core.redis_client import redis_client
+
+# Configuration des logs
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_PREFIX = "llm_cache"
+
+
+def content_ttls() -> Dict[str, int]:
+    """Durées de vie (secondes) des réponses par type de contenu"""
+    return {
+        "verse": settings.GEMINI_CACHE_TTL_VERSE,
+        "morning_prayer": settings.GEMINI_CACHE_TTL_PRAYER,
+        "evening_prayer": settings.GEMINI_CACHE_TTL_PRAYER,
+        "text": settings.GEMINI_CACHE_TTL_DEFAULT,
+        # Réponses groupées: chaque verset est caché sous son prompt unitaire
+        "verse_batch": 0,
+    }
+
+
+class LLMResponseCache:
+    """
+    Cache des réponses Gemini, clé = empreinte (modèle, prompt).
+
+    Deux niveaux: un LRU en mémoire (borné, par processus) devant Redis
+    (partagé entre workers). Chaque type de contenu a sa durée de vie; une
+    entrée lue depuis Redis est recopiée en mémoire jusqu'à son expiration.
+    Depuis du code async, aget()/aset() gardent la lecture mémoire synchrone
+    et font l'aller-retour Redis dans un thread.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.GEMINI_CACHE_MAX_ENTRIES
+        # clé -> (expiration epoch, texte), ordre = du moins au plus récemment utilisé
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    def ttl(self, content_type: str) -> int:
+        ttls = content_ttls()
+        return ttls.get(content_type, ttls["text"])
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Réponse en cache pour une empreinte de prompt (appel bloquant si Redis est consulté)
+
+        Args:
+            key: Empreinte (modèle, prompt)
+
+        Returns:
+            Texte de la réponse, ou None (absente ou expirée)
+        """
+        text = self._get_memory(key)
+        if text is not None:
+            return text
+        return self._accept_redis(key, self._read_redis(key))
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Comme get(), depuis la boucle d'événements: le LRU mémoire est lu
+        directement, l'aller-retour Redis passe par un thread
+        """
+        text = self._get_memory(key)
+        if text is not None:
+            return text
+        return self._accept_redis(key, await asyncio.to_thread(self._read_redis, key))
+
+    def set(self, key: str, text: str, content_type: str = "text"):
+        """
+        Met en cache une réponse selon la durée de vie de son type de contenu
+
+        Args:
+            key: Empreinte (modèle, prompt)
+            text: Texte de la réponse
+            content_type: "verse", "morning_prayer", "evening_prayer" ou "text"
+        """
+        entry = self._store_memory(key, text, content_type)
+        if entry is not None:
+            self._write_redis(key, *entry)
+
+    async def aset(self, key: str, text: str, content_type: str = "text"):
+        """Comme set(), l'écriture Redis passant par un thread"""
+        entry = self._store_memory(key, text, content_type)
+        if entry is not None:
+            await asyncio.to_thread(self._write_redis, key, *entry)
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[1]
+            del self._entries[key]
+        return None
+
+    @staticmethod
+    def _read_redis(key: str) -> Optional[Dict]:
+        return redis_client.get(f"{LLM_CACHE_PREFIX}:{key}")
+
+    def _accept_redis(self, key: str, cached: Optional[Dict]) -> Optional[str]:
+        """Recopie en mémoire une entrée Redis encore valide (sur la boucle, pas dans le thread)"""
+        if cached and cached.get("expires_at", 0) > time.time():
+            self._remember(key, cached["expires_at"], cached["text"])
+            self.stats["redis_hits"] += 1
+            return cached["text"]
+
+        self.stats["misses"] += 1
+        return None
+
+    def _store_memory(self, key: str, text: str, content_type: str) -> Optional[Tuple[str, float, str, int]]:
+        """Niveau mémoire d'un set(); renvoie les arguments de l'écriture Redis, None si non caché"""
+        ttl = self.ttl(content_type)
+        if ttl <= 0:
+            return None
+
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, text)
+        self.stats["stores"] += 1
+        return text, expires_at, content_type, ttl
+
+    @staticmethod
+    def _write_redis(key: str, text: str, expires_at: float, content_type: str, ttl: int):
+        redis_client.set(
+            f"{LLM_CACHE_PREFIX}:{key}",
+            {"text": text, "expires_at": expires_at, "content_type": content_type},
+            ttl
+        )
+
+    def _remember(self, key: str, expires_at: float, text: str):
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        """Vide le niveau mémoire et les entrées Redis"""
+        self._entries.clear()
+        redis_client.delete_pattern(f"{LLM_CACHE_PREFIX}:*")
+        logger.info("🧹 Cache des réponses Gemini vidé")
+
+    def get_stats(self) -> Dict[str, float]:
+        """Compteurs de hits/miss et taux de réussite"""
+        hits = self.stats["memory_hits"] + self.stats["redis_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Instance globale du cache des réponses
+llm_cache = LLMResponseCache()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Obtenir le cache des réponses Gemini"""
+    return llm_cache
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.soul_verse_api.core.config import settings
+from src.soul_verse_api.services.gemini_governor import classify_error
+
+# Configuration des logs
+logger = logging.getLogger(__name__)
+
+# Latences conservées par méthode pour le calcul des percentiles
+LATENCY_SAMPLES = 1024
+# Bilans des derniers passages du scheduler
+RECENT_RUNS = 20
+PERCENTILES = (50, 90, 99)
+
+
+def error_class(error: BaseException) -> str:
+    """
+    Classe d'erreur d'une méthode Gemini
+
+    Returns:
+        "invalid_response" (réponse illisible ou invalide), sinon la classe
+        de l'appel API ("timeout", "rate_limited", "server_error", "client_error")
+    """
+    if isinstance(error, ValueError):
+        return "invalid_response"
+    return classify_error(error)
+
+
+def percentiles(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    """Percentiles (rang le plus proche) et moyenne d'un échantillon de latences, en secondes"""
+    if not samples:
+        return {**{f"p{p}": None for p in PERCENTILES}, "mean": None}
+    ordered = sorted(samples)
+    result = {
+        f"p{p}": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 4)
+        for p in PERCENTILES
+    }
+    result["mean"] = round(sum(ordered) / len(ordered), 4)
+    return result
+
+
+def estimate_cost(input_tokens: int, output_tokens: int) -> float:
+    """Coût estimé (USD) d'un volume de jetons selon le tarif configuré"""
+    return round(
+        input_tokens * settings.GEMINI_COST_INPUT_PER_MILLION / 1_000_000
+        + output_tokens * settings.GEMINI_COST_OUTPUT_PER_MILLION / 1_000_000,
+        6
+    )
+
+
+class MethodMetrics:
+    """Compteurs d'une méthode: appels, latences (méthode et API), jetons, secours et erreurs"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fallbacks = 0
+        self.api_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.errors: Dict[str, int] = {}
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.api_latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "latency_seconds": percentiles(self.latencies),
+            "fallbacks": self.fallbacks,
+            "fallback_rate": round(self.fallbacks / self.calls, 4) if self.calls else 0.0,
+            "errors": dict(self.errors),
+            "api_calls": self.api_calls,
+            "api_latency_seconds": percentiles(self.api_latencies),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "estimated_cost_usd": estimate_cost(self.input_tokens, self.output_tokens),
+        }
+
+
+class MetricsWindow:
+    """Métriques par méthode sur une période (depuis le démarrage, ou un passage du scheduler)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now()
+        self.methods: Dict[str, MethodMetrics] = {}
+
+    def method(self, name: str) -> MethodMetrics:
+        return self.methods.setdefault(name, MethodMetrics())
+
+    def summary(self) -> Dict[str, Any]:
+        methods = {name: metrics.summary() for name, metrics in self.methods.items()}
+        input_tokens = sum(m.input_tokens for m in self.methods.values())
+        output_tokens = sum(m.output_tokens for m in self.methods.values())
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "methods": methods,
+            "api_calls": sum(m.api_calls for m in self.methods.values()),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "estimated_cost_usd": estimate_cost(input_tokens, output_tokens),
+        }
+
+
+class CallState:
+    """Appel en cours d'une méthode instrumentée (les secours y sont signalés)"""
+
+    def __init__(self, method: str):
+        self.method = method
+        self.fallback = False
+
+
+# Appel instrumenté et passage du scheduler en cours (hérités par les tâches filles)
+_current_call: ContextVar[Optional[CallState]] = ContextVar("llm_current_call", default=None)
+_current_run: ContextVar[Optional[MetricsWindow]] = ContextVar("llm_current_run", default=None)
+
+
+class LLMMetrics:
+    """
+    Instrumentation des appels Gemini.
+
+    `instrument(nom)` décore une méthode de GeminiService: latence de bout en
+    bout (cache compris), secours et erreurs par méthode. Les appels API réels
+    (latence de generate_content, jetons d'entrée et de sortie) sont rattachés
+    à la méthode en cours. `track_run(nom)` décore un job du scheduler: tout ce
+    qui est appelé pendant le job est aussi agrégé dans le bilan de ce passage.
+    """
+
+    def __init__(self):
+        self.totals = MetricsWindow("total")
+        self.runs: Deque[Dict[str, Any]] = deque(maxlen=RECENT_RUNS)
+        self._active_runs: List[MetricsWindow] = []
+
+    def _windows(self) -> List[MetricsWindow]:
+        run = _current_run.get()
+        return [self.totals, run] if run is not None else [self.totals]
+
+    def instrument(self, method: str) -> Callable:
+        """Décorateur d'une méthode asynchrone de GeminiService"""
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                state = CallState(method)
+                token = _current_call.set(state)
+                started = time.monotonic()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _current_call.reset(token)
+                    latency = time.monotonic() - started
+                    for window in self._windows():
+                        metrics = window.method(method)
+                        metrics.calls += 1
+                        metrics.latencies.append(latency)
+                        if state.fallback:
+                            metrics.fallbacks += 1
+            return wrapper
+        return decorator
+
+    def track_run(self, name: str) -> Callable:
+        """Décorateur d'un job du scheduler: bilan des appels Gemini de chaque passage"""
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                window = MetricsWindow(name)
+                token = _current_run.set(window)
+                self._active_runs.append(window)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _current_run.reset(token)
+                    self._active_runs.remove(window)
+                    summary = window.summary()
+                    summary["duration_seconds"] = round(
+                        (datetime.now() - window.started_at).total_seconds(), 2)
+                    self.runs.append(summary)
+                    logger.info(
+                        f"📊 LLM [{name}]: {summary['api_calls']} appels API, "
+                        f"{summary['input_tokens']}+{summary['output_tokens']} jetons, "
+                        f"~{summary['estimated_cost_usd']}$ en {summary['duration_seconds']}s")
+            return wrapper
+        return decorator
+
+    def record_fallback(self):
+        """Signale que la méthode en cours a servi un contenu de secours"""
+        state = _current_call.get()
+        if state is not None:
+            state.fallback = True
+
+    def record_error(self, error: BaseException):
+        """Compte une erreur (classée) de la méthode en cours"""
+        state = _current_call.get()
+        if state is None:
+            return
+        name = error_class(error)
+        for window in self._windows():
+            errors = window.method(state.method).errors
+            errors[name] = errors.get(name, 0) + 1
+
+    def record_api_call(self, latency: Optional[float], usage: Any, method: Optional[str] = None):
+        """
+        Enregistre un appel generate_content réel
+
+        Args:
+            latency: Durée de l'appel en secondes (None pour un flux)
+            usage: usage_metadata de la réponse (prompt_token_count, candidates_token_count)
+            method: Méthode à créditer hors méthode instrumentée (ex: flux)
+        """
+        state = _current_call.get()
+        method = state.method if state is not None else (method or "other")
+        input_tokens = getattr(usage, "prompt_token_count", None) or 0
+        output_tokens = getattr(usage, "candidates_token_count", None) or 0
+        for window in self._windows():
+            metrics = window.method(method)
+            metrics.api_calls += 1
+            metrics.input_tokens += input_tokens
+            metrics.output_tokens += output_tokens
+            if latency is not None:
+                metrics.api_latencies.append(latency)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métriques depuis le démarrage, passages en cours et bilans des derniers passages"""
+        return {
+            "totals": self.totals.summary(),
+            "active_runs": [window.summary() for window in self._active_runs],
+            "recent_runs": list(self.runs),
+        }
+
+
+# Instance globale partagée par toutes les instances de GeminiService du processus
+llm_metrics = LLMMetrics()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """Obtenir l'instrumentation des appels Gemini"""
+    return llm_metrics
@@ -16,6 +16,9 @@ class RedisService:
         self.DAILY_VERSE_TTL = 7200  # 2 heures
         self.USER_MOOD_TTL = 86400   # 24 heures
         self.USER_DATA_TTL = 604800  # 7 jours
+        self.COHORT_VERSE_TTL = 86400  # 24 heures (contenu partagé d'une cohorte)
+        self.SHARED_PRAYER_TTL = 172800  # 48 heures (pré-générée la veille, servie le jour même)
+        self.SHARED_PRAYER_FALLBACK_TTL = 900  # 15 minutes (prière de secours, regénérée ensuite)
 
     async def get_daily_verse(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -67,6 +70,84 @@ class RedisService:
 
         return self.redis_client.delete(cache_key)
 
+    async def get_cohort_verse(self, cohort_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère le contenu du verset du jour d'une cohorte
+
+        Args:
+            cohort_key: Clé de cohorte (humeur:occasion:traduction:date)
+
+        Returns:
+            Contenu partagé (réponse IA, verset, image) ou None
+        """
+        cached_data = self.redis_client.get(f"daily_verse_cohort:{cohort_key}")
+        if cached_data:
+            return cached_data
+
+        return None
+
+    async def cache_cohort_verse(self, cohort_key: str, content: Dict[str, Any]) -> bool:
+        """
+        Met en cache le contenu du verset du jour d'une cohorte
+
+        Args:
+            cohort_key: Clé de cohorte (humeur:occasion:traduction:date)
+            content: Contenu partagé par tous les membres de la cohorte
+
+        Returns:
+            True si le cache a réussi, False sinon
+        """
+        return self.redis_client.set(
+            f"daily_verse_cohort:{cohort_key}", content, self.COHORT_VERSE_TTL)
+
+    @staticmethod
+    def shared_prayer_key(prayer_type: str, mood: str, special_occasion: Optional[str] = None, date: datetime = None) -> str:
+        """Clé partagée d'une prière: type:humeur:occasion:date (indépendante de l'utilisateur)"""
+        day = (date or datetime.now()).strftime("%Y-%m-%d")
+        return f"shared_prayer:{prayer_type}:{mood}:{special_occasion or 'aucune'}:{day}"
+
+    async def get_shared_prayer(self, prayer_type: str, mood: str, special_occasion: Optional[str] = None,
+                                date: datetime = None) -> Optional[Dict[str, Any]]:
+        """
+        Récupère une prière partagée (matrice humeur x matin/soir pré-générée)
+
+        Args:
+            prayer_type: "morning" ou "evening"
+            mood: Humeur
+            special_occasion: Nom de l'occasion spéciale du jour (optionnel)
+            date: Jour de la prière (par défaut aujourd'hui)
+
+        Returns:
+            Données de la prière ou None
+        """
+        cached_data = self.redis_client.get(
+            self.shared_prayer_key(prayer_type, mood, special_occasion, date))
+        if cached_data:
+            return cached_data
+
+        return None
+
+    async def cache_shared_prayer(self, prayer_type: str, mood: str, prayer_data: Dict[str, Any],
+                                  special_occasion: Optional[str] = None, date: datetime = None,
+                                  ttl: Optional[int] = None) -> bool:
+        """
+        Met en cache une prière partagée par tous les utilisateurs d'une humeur
+
+        Args:
+            prayer_type: "morning" ou "evening"
+            mood: Humeur
+            prayer_data: Données de la prière
+            special_occasion: Nom de l'occasion spéciale du jour (optionnel)
+            date: Jour de la prière (par défaut aujourd'hui)
+            ttl: Durée de vie en secondes (par défaut SHARED_PRAYER_TTL)
+
+        Returns:
+            True si le cache a réussi, False sinon
+        """
+        return self.redis_client.set(
+            self.shared_prayer_key(prayer_type, mood, special_occasion, date),
+            prayer_data, ttl or self.SHARED_PRAYER_TTL)
+
     async def get_user_mood(self, user_id: str) -> Optional[str]:
         """
         Récupère le mood actuel de l'utilisateur
@@ -4,7 +4,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import asyncio
 import logging
@@ -17,6 +17,7 @@ from src.soul_verse_api.models.Models import User
 from src.soul_verse_api.database.session import SessionLocal
 from src.soul_verse_api.services.redis_service import RedisService
 from src.soul_verse_api.services.gemini_service import GeminiService
+from src.soul_verse_api.services.llm_metrics import llm_metrics
 from src.soul_verse_api.services.bible_service import BibleService
 from src.soul_verse_api.core.notification_client import NotificationClient, NotificationPushType
 
@@ -36,6 +37,22 @@ from src.soul_verse_api.core.config import settings
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Générations de cohortes (appels Gemini + images) menées en parallèle
+COHORT_CONCURRENCY = 5
+# Jetons FCM par appel d'envoi groupé
+NOTIFICATION_BATCH_SIZE = 500
+# Matrice des prières pré-générées chaque nuit: humeur x moment
+PRAYER_MOODS = [
+    "joie", "paix", "tristesse", "anxiété", "gratitude",
+    "espoir", "doute", "colère", "amour", "peur", "fatigue",
+    "reconnaissance", "pardon", "force", "patience"
+]
+PRAYER_TYPES = ("morning", "evening")
+PRAYER_DEFAULTS = {
+    "morning": ("Prière du Matin", "Que Dieu te bénisse aujourd'hui. Amen."),
+    "evening": ("Prière du Soir", "Que tu reposes dans la paix de Dieu. Amen."),
+}
+
 
 class SchedulerService:
     """Service de planification pour les versets quotidiens et notifications"""
@@ -265,6 +282,16 @@ class SchedulerService:
             max_instances=1
         )
 
+        # Pré-génération des prières du lendemain (humeur x matin/soir) à 23h00
+        self.scheduler.add_job(
+            func=self._pregenerate_prayers_job,
+            trigger=CronTrigger(hour=23, minute=0, timezone="Africa/Lome"),
+            id="prayers_pregeneration",
+            name="Pré-génération prières du lendemain",
+            replace_existing=True,
+            max_instances=1
+        )
+
         # Nettoyage cache expiré à 2h00
         self.scheduler.add_job(
             func=self._cleanup_expired_cache_job,
@@ -353,9 +380,50 @@ class SchedulerService:
             logger.error(f"Erreur lors de la récupération par timezone: {e}")
             return []
 
+    def get_cohort_key(self, mood: str, translation: str, special_occasion: dict = None,
+                       date: datetime = None) -> str:
+        """
+        Clé de cohorte du verset quotidien: le contenu ne dépend que de
+        (humeur, occasion, traduction, date), pas de l'utilisateur
+
+        Returns:
+            Ex: "anxiété:noel:FreBBB:2025-12-25"
+        """
+        occasion = special_occasion.get("name") if special_occasion else "aucune"
+        day = (date or datetime.now()).strftime("%Y-%m-%d")
+        return f"{mood}:{occasion}:{translation}:{day}"
+
+    async def _group_users_by_cohort(self, users: List[User], special_occasion: dict = None) -> Dict[str, List[Tuple[User, str]]]:
+        """
+        Regroupe les utilisateurs sans verset du jour par cohorte
+
+        Returns:
+            Clé de cohorte -> liste de (utilisateur, mood)
+        """
+        cohorts: Dict[str, List[Tuple[User, str]]] = {}
+        for user in users:
+            user_id = str(user.id)
+
+            # Vérifier si le verset du jour existe déjà
+            if await self.redis_service.get_daily_verse(user_id):
+                logger.debug(
+                    f"Verset déjà en cache pour utilisateur {user_id[:8]}...")
+                continue
+
+            # Récupérer le mood de l'utilisateur (depuis DB ou Redis)
+            mood = user.mood or await self.redis_service.get_user_mood(user_id) or "paix"
+            translation = user.preferred_translation or "FreBBB"
+            key = self.get_cohort_key(mood, translation, special_occasion)
+            cohorts.setdefault(key, []).append((user, mood))
+        return cohorts
+
+    @llm_metrics.track_run("daily_verses")
     async def _generate_daily_verses_job(self):
         """
         Job principal: génère les versets quotidiens pour tous les utilisateurs
+
+        Un seul contenu (IA, verset, image) est généré par cohorte
+        (humeur, occasion, traduction, date), puis distribué à ses membres.
         """
         logger.info("🌅 Début génération des versets quotidiens")
 
@@ -367,37 +435,45 @@ class SchedulerService:
                 logger.warning("Aucun utilisateur actif trouvé")
                 return
 
-            # Traiter les utilisateurs par batch pour éviter la surcharge
-            batch_size = 50
-            total_processed = 0
-            total_errors = 0
-
-            for i in range(0, len(users), batch_size):
-                batch = users[i:i + batch_size]
-                logger.info(
-                    f"Traitement du batch {i//batch_size + 1}: {len(batch)} utilisateurs")
-
-                # Traiter le batch
-                batch_results = await asyncio.gather(
-                    *[self._generate_user_daily_verse(user) for user in batch],
-                    return_exceptions=True
-                )
-
-                # Compter les succès/échecs
-                for result in batch_results:
-                    if isinstance(result, Exception):
-                        total_errors += 1
-                        logger.error(
-                            f"Erreur traitement utilisateur: {result}")
-                    else:
-                        total_processed += 1
+            # Occasion spéciale calculée une fois pour tout le job
+            special_occasion = self.get_special_occasion()
+            cohorts = await self._group_users_by_cohort(users, special_occasion)
+            pending_users = sum(len(members) for members in cohorts.values())
+            logger.info(
+                f"👥 {pending_users} utilisateurs à servir répartis en {len(cohorts)} cohortes")
+
+            # Versets de toutes les cohortes demandés en quelques appels groupés
+            await self._prefetch_cohort_verses(cohorts, special_occasion)
+
+            # Générations limitées en parallèle pour ne pas saturer Gemini
+            semaphore = asyncio.Semaphore(COHORT_CONCURRENCY)
+
+            async def process(members: List[Tuple[User, str]]) -> int:
+                user, mood = members[0]
+                async with semaphore:
+                    content = await self._generate_cohort_verse(
+                        mood, user.preferred_translation or "FreBBB", special_occasion)
+                if not content:
+                    return 0
+                return await self._deliver_cohort_verse(content, members)
+
+            cohort_results = await asyncio.gather(
+                *[process(members) for members in cohorts.values()],
+                return_exceptions=True
+            )
 
-                # Pause entre les batches pour éviter la surcharge
-                if i + batch_size < len(users):
-                    await asyncio.sleep(1)
+            # Compter les succès/échecs
+            total_processed = 0
+            for key, result in zip(cohorts, cohort_results):
+                if isinstance(result, Exception):
+                    logger.error(f"Erreur traitement cohorte {key}: {result}")
+                else:
+                    total_processed += result
+            total_errors = pending_users - total_processed
 
             logger.info(
-                f"✅ Génération terminée: {total_processed} succès, {total_errors} erreurs sur {len(users)} utilisateurs")
+                f"✅ Génération terminée: {total_processed} succès, {total_errors} erreurs sur {len(users)} utilisateurs "
+                f"({len(cohorts)} générations au lieu de {pending_users})")
 
         except Exception as e:
             logger.error(
@@ -425,134 +501,176 @@ class SchedulerService:
 
             # Récupérer le mood de l'utilisateur (depuis DB ou Redis)
             mood = user.mood or await self.redis_service.get_user_mood(user_id) or "paix"
-
-            # Vérifier s'il y a une occasion spéciale aujourd'hui
             special_occasion = self.get_special_occasion()
 
-            # Prioriser l'occasion spéciale sur le mood si elle existe
-            if special_occasion and special_occasion.get("priority", 0) >= 7:
-                # Occasion de haute priorité : utiliser l'occasion au lieu du mood
-                logger.info(
-                    f"🎊 Génération avec occasion spéciale prioritaire: {special_occasion['description']}")
-                context = special_occasion["name"]
-                context_type = "occasion"
-            else:
-                # Pas d'occasion prioritaire : utiliser le mood
-                context = mood
-                context_type = "mood"
-                if special_occasion:
-                    logger.info(
-                        f"📅 Occasion détectée mais mood prioritaire: {special_occasion['description']}")
-
-            # Générer le verset avec l'IA
-            try:
-                ai_response = await self.gemini_service.get_personalized_verse(
-                    mood=mood,
-                    special_occasion=special_occasion
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Erreur IA pour utilisateur {user_id[:8]}...: {e}")
-                # Fallback vers un verset prédéfini
-                ai_response = await self._get_fallback_verse(mood, special_occasion)
-
-            if not ai_response:
+            # Même contenu que les autres membres de sa cohorte
+            content = await self._generate_cohort_verse(
+                mood, user.preferred_translation or "FreBBB", special_occasion)
+            if not content:
                 logger.error(
                     f"Impossible de générer verset pour utilisateur {user_id[:8]}...")
                 return False
 
-            # Récupérer le texte complet du verset depuis la Bible
-            translation = user.preferred_translation or "FreBBB"
-            bible_verse = await self.get_bible_verse_from_reference(
-                ai_response["reference"],
-                translation
+            return await self._deliver_cohort_verse(content, [(user, mood)]) == 1
+
+        except Exception as e:
+            logger.error(
+                f"Erreur génération verset utilisateur {user.id}: {e}")
+            return False
+
+    async def _prefetch_cohort_verses(self, cohorts: Dict[str, List[Tuple[User, str]]], special_occasion: dict = None):
+        """
+        Pré-génère en lots les réponses IA des cohortes pas encore servies aujourd'hui
+
+        Les réponses validées sont mises en cache sous le prompt unitaire de chaque
+        cohorte: _generate_cohort_verse les relit ensuite sans appel Gemini.
+        """
+        if settings.VERSE_SELECTION_MODE == "local":
+            return
+
+        items = []
+        for key, members in cohorts.items():
+            if await self.redis_service.get_cohort_verse(key):
+                continue
+            user, mood = members[0]
+            items.append({
+                "mood": mood,
+                "translation": user.preferred_translation or "FreBBB",
+                "special_occasion": special_occasion,
+            })
+
+        if not items:
+            return
+
+        try:
+            await self.gemini_service.get_personalized_verses_batch(items)
+            logger.info(f"🧺 Réponses IA pré-générées en lots pour {len(items)} cohortes")
+        except Exception as e:
+            # Chaque cohorte retombe sur son appel unitaire
+            logger.warning(f"Pré-génération groupée impossible: {e}")
+
+    async def _generate_cohort_verse(self, mood: str, translation: str, special_occasion: dict = None) -> Optional[dict]:
+        """
+        Génère (ou relit) le contenu du verset du jour d'une cohorte
+
+        Args:
+            mood: Humeur de la cohorte
+            translation: Traduction de la cohorte
+            special_occasion: Occasion spéciale du jour
+
+        Returns:
+            Contenu partagé (réponse IA, verset, image) ou None
+        """
+        cohort_key = self.get_cohort_key(mood, translation, special_occasion)
+
+        # Déjà généré aujourd'hui (autre worker, relance du job, appel unitaire)
+        cached_content = await self.redis_service.get_cohort_verse(cohort_key)
+        if cached_content:
+            return cached_content
+
+        # Prioriser l'occasion spéciale sur le mood si elle existe
+        if special_occasion and special_occasion.get("priority", 0) >= 7:
+            # Occasion de haute priorité : utiliser l'occasion au lieu du mood
+            logger.info(
+                f"🎊 Génération avec occasion spéciale prioritaire: {special_occasion['description']}")
+        elif special_occasion:
+            logger.info(
+                f"📅 Occasion détectée mais mood prioritaire: {special_occasion['description']}")
+
+        # Générer le verset avec l'IA
+        try:
+            ai_response = await self.gemini_service.get_personalized_verse(
+                mood=mood,
+                translation=translation,
+                special_occasion=special_occasion
             )
+        except Exception as e:
+            logger.warning(f"Erreur IA pour cohorte {cohort_key}: {e}")
+            # Fallback vers le recommandeur local, puis un verset prédéfini
+            ai_response = await self._get_fallback_verse(mood, special_occasion, translation)
 
-            # Générer l'image du verset (si le service est disponible)
-            verse_image = None
-            try:
-                if self.image_service and IMAGE_SERVICE_AVAILABLE:
-                    # Extraire les éléments visuels suggérés par l'IA
-                    ai_visual_elements = ai_response.get(
-                        "visual_elements", None)
-
-                    if bible_verse:
-                        verse_image = await self.image_service.generate_multiple_methods(
-                            verse_text=bible_verse.text,
-                            reference=ai_response["reference"],
-                            mood=special_occasion.get(
-                                "name") if special_occasion else mood,
-                            ai_visual_elements=ai_visual_elements
-                        )
-                    else:
-                        # Fallback avec texte de la réflexion si pas de verset
-                        verse_image = await self.image_service.generate_multiple_methods(
-                            verse_text=ai_response.get("reflection", "")[
-                                :100] + "...",
-                            reference=ai_response["reference"],
-                            mood=special_occasion.get(
-                                "name") if special_occasion else mood,
-                            ai_visual_elements=ai_visual_elements
-                        )
+        if not ai_response:
+            logger.error(f"Impossible de générer verset pour cohorte {cohort_key}")
+            return None
+
+        # Récupérer le texte complet du verset depuis la Bible
+        bible_verse = await self.get_bible_verse_from_reference(
+            ai_response["reference"],
+            translation
+        )
+
+        # Générer l'image du verset (si le service est disponible)
+        verse_image = None
+        try:
+            if self.image_service and IMAGE_SERVICE_AVAILABLE:
+                # Extraire les éléments visuels suggérés par l'IA
+                ai_visual_elements = ai_response.get(
+                    "visual_elements", None)
+
+                if bible_verse:
+                    verse_text = bible_verse.text
                 else:
-                    logger.info(
-                        "Service de génération d'images non disponible - verset sans image")
-            except Exception as e:
-                logger.warning(
-                    f"Erreur génération image pour {user_id[:8]}...: {e}")
-
-            # Construire les données complètes du verset
-            verse_data = {
-                "verse": bible_verse.dict() if bible_verse else None,
-                "ai_response": ai_response,
-                "ai_reflection": ai_response.get("reflection", ""),
-                "verse_image": verse_image,
-                "mood_context": mood,
-                "special_occasion": special_occasion.get("name") if special_occasion else None,
-                "occasion_description": special_occasion.get("description") if special_occasion else None,
-                "reference": ai_response["reference"],
-                "generated_at": datetime.now().isoformat(),
-                "user_id": user_id,
-                "translation": user.preferred_translation or "FreBBB",
-                "has_full_verse": bible_verse is not None,
-                "has_image": verse_image is not None and verse_image.get("image_url") != "/static/default_verse.png"
-            }
+                    # Fallback avec texte de la réflexion si pas de verset
+                    verse_text = ai_response.get("reflection", "")[:100] + "..."
+
+                verse_image = await self.image_service.generate_multiple_methods(
+                    verse_text=verse_text,
+                    reference=ai_response["reference"],
+                    mood=special_occasion.get(
+                        "name") if special_occasion else mood,
+                    ai_visual_elements=ai_visual_elements
+                )
+            else:
+                logger.info(
+                    "Service de génération d'images non disponible - verset sans image")
+        except Exception as e:
+            logger.warning(
+                f"Erreur génération image pour cohorte {cohort_key}: {e}")
+
+        content = {
+            "cohort": cohort_key,
+            "verse": bible_verse.dict() if bible_verse else None,
+            "ai_response": ai_response,
+            "ai_reflection": ai_response.get("reflection", ""),
+            "verse_image": verse_image,
+            "mood_context": mood,
+            "special_occasion": special_occasion.get("name") if special_occasion else None,
+            "occasion_description": special_occasion.get("description") if special_occasion else None,
+            "reference": ai_response["reference"],
+            "generated_at": datetime.now().isoformat(),
+            "translation": translation,
+            "has_full_verse": bible_verse is not None,
+            "has_image": verse_image is not None and verse_image.get("image_url") != "/static/default_verse.png"
+        }
 
-            # Mettre en cache
-            success = await self.redis_service.cache_daily_verse(user_id, verse_data)
+        await self.redis_service.cache_cohort_verse(cohort_key, content)
+        logger.info(f"✨ Verset de la cohorte {cohort_key} généré: {ai_response['reference']}")
+        return content
 
-            if success:
+    async def _deliver_cohort_verse(self, content: dict, members: List[Tuple[User, str]]) -> int:
+        """
+        Distribue le contenu d'une cohorte: cache par utilisateur puis notifications groupées
+
+        Args:
+            content: Contenu partagé de la cohorte
+            members: Liste de (utilisateur, mood)
+
+        Returns:
+            Nombre d'utilisateurs servis
+        """
+        delivered = 0
+        tokens = []
+        for user, mood in members:
+            user_id = str(user.id)
+            verse_data = {**content, "user_id": user_id, "mood_context": mood}
+
+            # Mettre en cache
+            if await self.redis_service.cache_daily_verse(user_id, verse_data):
+                delivered += 1
                 logger.debug(
                     f"✅ Verset généré et mis en cache pour {user_id[:8]}...")
-
-                # Envoyer notification push si l'utilisateur a un token FCM
-                if hasattr(user, 'fcm_token') and user.fcm_token:
-                    try:
-                        # Préparer les données pour la notification
-                        verse_text = bible_verse.text if bible_verse else ai_response.get("reflection", "")[
-                            :100] + "..."
-                        image_url = verse_image.get("image_url") if verse_image and verse_image.get(
-                            "image_url") != "/static/default_verse.png" else None
-
-                        # Envoyer la notification
-                        notification_sent = self.notification_client.send_daily_verse(
-                            verse_content=verse_text,
-                            verse_reference=ai_response["reference"],
-                            reflection=ai_response.get("reflection"),
-                            image_url=image_url,
-                            tokens=[user.fcm_token]
-                        )
-
-                        if notification_sent:
-                            logger.debug(
-                                f"📱 Notification envoyée pour {user_id[:8]}...")
-                        else:
-                            logger.warning(
-                                f"❌ Échec envoi notification pour {user_id[:8]}...")
-
-                    except Exception as notif_error:
-                        logger.error(
-                            f"Erreur envoi notification pour {user_id[:8]}...: {notif_error}")
+                if getattr(user, "fcm_token", None):
+                    tokens.append(user.fcm_token)
                 else:
                     logger.debug(
                         f"👤 Utilisateur {user_id[:8]}... sans token FCM - notification ignorée")
@@ -560,88 +678,89 @@ class SchedulerService:
                 logger.warning(
                     f"⚠️ Verset généré mais erreur cache pour {user_id[:8]}...")
 
-            return True
+        if not tokens:
+            return delivered
 
-        except Exception as e:
-            logger.error(
-                f"Erreur génération verset utilisateur {user.id}: {e}")
-            return False
+        # Une notification identique pour toute la cohorte
+        verse = content.get("verse")
+        verse_text = verse["text"] if verse else content.get("ai_reflection", "")[:100] + "..."
+        # JPEG de notification (poids borné pour FCM), sinon l'image d'origine
+        image_url = None
+        if content.get("has_image"):
+            verse_image = content["verse_image"]
+            image_url = verse_image.get("notification_image_url") or verse_image.get("image_url")
+
+        for start in range(0, len(tokens), NOTIFICATION_BATCH_SIZE):
+            batch = tokens[start:start + NOTIFICATION_BATCH_SIZE]
+            try:
+                # Envoi FCM bloquant: hors de la boucle d'événements
+                notification_sent = await asyncio.to_thread(
+                    self.notification_client.send_daily_verse,
+                    verse_content=verse_text,
+                    verse_reference=content["reference"],
+                    reflection=content.get("ai_reflection"),
+                    image_url=image_url,
+                    tokens=batch
+                )
+                if notification_sent:
+                    logger.debug(
+                        f"📱 Notifications envoyées pour {len(batch)} utilisateurs ({content.get('cohort')})")
+                else:
+                    logger.warning(
+                        f"❌ Échec envoi notifications pour {len(batch)} utilisateurs ({content.get('cohort')})")
+            except Exception as notif_error:
+                logger.error(
+                    f"Erreur envoi notifications cohorte {content.get('cohort')}: {notif_error}")
+
+        return delivered
 
     async def get_bible_verse_from_reference(self, reference: str, translation: str = "FreBBB"):
         """
-        Récupère le texte complet d'un verset depuis une référence
+        Récupère le texte complet d'un verset ou d'un passage depuis une référence
 
         Args:
-            reference: Référence du verset (ex: "Jean 3:16", "Jérémie 29:11")
+            reference: Référence (ex: "Jean 3:16", "Philippiens 4:6-7", "Jean 3:16; 1 Jean 4:8")
             translation: Traduction biblique à utiliser
 
         Returns:
-            BibleVerse si trouvé, None sinon
+            BibleVerse si trouvé (textes d'un passage concaténés), None sinon
         """
         try:
             logger.info(f"🔍 Parsing référence: '{reference}'")
 
-            # Parser la référence
-            ref_parts = reference.strip().split()
-
-            if len(ref_parts) >= 2:
-                # Le dernier élément devrait être chapitre:verset
-                chapter_verse_part = ref_parts[-1]
-                # Tout le reste est le nom du livre
-                book = " ".join(ref_parts[:-1])
+            verses = await self.bible_service.get_passage(translation, reference)
+            bible_verse = self.bible_service.merge_passage(verses)
 
+            if bible_verse:
                 logger.info(
-                    f"📖 Livre: '{book}', Partie: '{chapter_verse_part}'")
-
-                # Parser chapitre:verset
-                chapter_verse = chapter_verse_part.split(":")
-
-                if len(chapter_verse) == 2:
-                    try:
-                        chapter = int(chapter_verse[0])
-                        verse_num = int(chapter_verse[1])
-
-                        logger.info(
-                            f"📍 Recherche: {book} {chapter}:{verse_num}")
-
-                        # Récupérer le verset complet depuis la Bible
-                        bible_verse = await self.bible_service.get_verse(
-                            translation, book, chapter, verse_num
-                        )
-
-                        if bible_verse:
-                            logger.info(
-                                f"✅ Verset trouvé: {bible_verse.text[:50]}...")
-                        else:
-                            logger.warning(
-                                f"⚠️ Verset non trouvé: {book} {chapter}:{verse_num}")
-
-                        return bible_verse
-
-                    except ValueError as ve:
-                        logger.warning(f"❌ Erreur conversion nombres: {ve}")
-                else:
-                    logger.warning(
-                        f"❌ Format chapitre:verset invalide: '{chapter_verse_part}'")
+                    f"✅ Passage trouvé ({len(verses)} verset(s)): {bible_verse.text[:50]}...")
             else:
-                logger.warning(f"❌ Référence trop courte: '{reference}'")
+                logger.warning(f"⚠️ Verset non trouvé: '{reference}'")
+
+            return bible_verse
 
         except Exception as e:
             logger.warning(f"❌ Erreur parsing référence '{reference}': {e}")
 
         return None
 
-    async def _get_fallback_verse(self, mood: str, special_occasion: dict = None) -> dict:
+    async def _get_fallback_verse(self, mood: str, special_occasion: dict = None, translation: str = "FreBBB") -> dict:
         """
         Verset de fallback si l'IA échoue
 
         Args:
             mood: Le mood de l'utilisateur
             special_occasion: Occasion spéciale si elle existe
+            translation: Traduction pour la recommandation locale
 
         Returns:
             Dictionnaire avec le verset de fallback
         """
+        # Recommandation locale depuis le corpus (varie chaque jour)
+        local_verse = await self.bible_service.recommend_daily_verse(mood, special_occasion, translation)
+        if local_verse:
+            return local_verse
+
         # Versets pour occasions spéciales (prioritaire)
         occasion_verses = {
             "nouvel_an": {
@@ -747,39 +866,154 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"❌ Erreur mise à jour stats: {e}")
 
+    def build_prayer_data(self, prayer: dict, prayer_type: str, special_occasion: dict = None) -> dict:
+        """Données de prière servies et mises en cache (titre et bénédiction par défaut selon le moment)"""
+        default_title, default_blessing = PRAYER_DEFAULTS[prayer_type]
+        return {
+            "prayer_title": prayer.get("prayer_title") or default_title,
+            "prayer_text": prayer.get("prayer_text", ""),
+            "blessing": prayer.get("blessing") or default_blessing,
+            "suggested_verse": prayer.get("suggested_verse", ""),
+            "special_occasion": special_occasion.get("name") if special_occasion else None,
+            "occasion_description": special_occasion.get("description") if special_occasion else None,
+            "generated_at": datetime.now().isoformat(),
+            "prayer_type": prayer_type,
+            "is_fallback": bool(prayer.get("is_fallback"))
+        }
+
+    async def _generate_shared_prayer(self, prayer_type: str, mood: str, special_occasion: dict = None,
+                                      date: datetime = None) -> dict:
+        """
+        Génère une prière de la matrice et la met en cache sous sa clé partagée
+
+        Une prière de secours (Gemini indisponible) n'est cachée que brièvement
+        (SHARED_PRAYER_FALLBACK_TTL): elle est regénérée à la prochaine demande
+        ou au prochain passage du job, au lieu d'être servie toute la journée.
+        """
+        occasion_name = special_occasion.get("name") if special_occasion else None
+        try:
+            if prayer_type == "morning":
+                prayer = await self.gemini_service.generate_morning_prayer(mood, special_occasion, date)
+            else:
+                prayer = await self.gemini_service.generate_evening_prayer(mood, special_occasion, date)
+        except Exception as e:
+            logger.warning(f"Erreur génération prière IA ({prayer_type}, {mood}): {e}")
+            if prayer_type == "morning":
+                prayer = await self.gemini_service._get_fallback_morning_prayer(mood, special_occasion)
+            else:
+                prayer = await self.gemini_service._get_fallback_evening_prayer(mood, special_occasion)
+
+        prayer_data = self.build_prayer_data(prayer, prayer_type, special_occasion)
+        ttl = self.redis_service.SHARED_PRAYER_FALLBACK_TTL if prayer_data["is_fallback"] else None
+        await self.redis_service.cache_shared_prayer(
+            prayer_type, mood, prayer_data, occasion_name, date, ttl)
+        return prayer_data
+
+    async def get_shared_prayer(self, prayer_type: str, mood: str = "paix",
+                                date: datetime = None) -> Tuple[dict, bool]:
+        """
+        Prière du jour pour une humeur, lue dans la matrice pré-générée
+
+        Args:
+            prayer_type: "morning" ou "evening"
+            mood: Humeur de l'utilisateur
+            date: Jour de la prière (par défaut aujourd'hui)
+
+        Returns:
+            (données de la prière, True si elle venait du cache). Une case
+            absente (humeur hors matrice, job non passé) est générée puis cachée.
+        """
+        date = date or datetime.now()
+        special_occasion = self.get_special_occasion(date)
+        occasion_name = special_occasion.get("name") if special_occasion else None
+
+        cached = await self.redis_service.get_shared_prayer(prayer_type, mood, occasion_name, date)
+        if cached:
+            return cached, True
+
+        return await self._generate_shared_prayer(prayer_type, mood, special_occasion, date), False
+
+    @llm_metrics.track_run("prayers_pregeneration")
+    async def _pregenerate_prayers_job(self, date: datetime = None) -> dict:
+        """
+        Job nocturne: pré-génère la matrice humeur x {matin, soir} du lendemain
+
+        Les requêtes du jour ne font ensuite que des lectures de cache partagées
+        par humeur, au lieu d'une génération par utilisateur.
+
+        Args:
+            date: Jour à préparer (par défaut demain)
+
+        Returns:
+            Statistiques du job (générées, déjà présentes, durée)
+        """
+        target = date or (datetime.now() + timedelta(days=1))
+        special_occasion = self.get_special_occasion(target)
+        occasion_name = special_occasion.get("name") if special_occasion else None
+        logger.info(
+            f"🙏 Pré-génération des prières du {target.strftime('%Y-%m-%d')} "
+            f"({len(PRAYER_MOODS)} humeurs x {len(PRAYER_TYPES)} moments"
+            f"{f', occasion: {occasion_name}' if occasion_name else ''})")
+
+        started = datetime.now()
+        semaphore = asyncio.Semaphore(COHORT_CONCURRENCY)
+
+        async def prepare(prayer_type: str, mood: str) -> Optional[bool]:
+            """True si générée, False si déjà prête, None si prière de secours"""
+            # Case déjà prête (relance du job, autre worker); une prière de secours est regénérée
+            cached = await self.redis_service.get_shared_prayer(prayer_type, mood, occasion_name, target)
+            if cached and not cached.get("is_fallback"):
+                return False
+            async with semaphore:
+                prayer_data = await self._generate_shared_prayer(prayer_type, mood, special_occasion, target)
+            return None if prayer_data["is_fallback"] else True
+
+        results = await asyncio.gather(
+            *[prepare(prayer_type, mood) for mood in PRAYER_MOODS for prayer_type in PRAYER_TYPES],
+            return_exceptions=True
+        )
+
+        generated = sum(1 for result in results if result is True)
+        fallbacks = sum(1 for result in results if result is None)
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.error(f"Erreur pré-génération prière: {error}")
+
+        stats = {
+            "date": target.strftime("%Y-%m-%d"),
+            "special_occasion": occasion_name,
+            "total": len(results),
+            "generated": generated,
+            "fallbacks": fallbacks,
+            "already_cached": len(results) - generated - fallbacks - len(errors),
+            "errors": len(errors),
+            "duration_seconds": round((datetime.now() - started).total_seconds(), 2),
+        }
+        logger.info(
+            f"✅ Prières pré-générées: {generated} nouvelles, {stats['already_cached']} déjà prêtes, "
+            f"{len(errors)} erreurs en {stats['duration_seconds']}s")
+        if fallbacks:
+            logger.warning(
+                f"⚠️ {fallbacks} prières de secours (Gemini indisponible), cachées "
+                f"{self.redis_service.SHARED_PRAYER_FALLBACK_TTL}s puis regénérées")
+        return stats
+
+    @llm_metrics.track_run("morning_prayer")
     async def _send_morning_prayer_job(self):
         """Job pour envoyer les notifications de prière du matin"""
         logger.info("🌅 Début envoi notifications prière du matin")
 
         try:
-            # Détecter l'occasion spéciale du jour
-            special_occasion = self.get_special_occasion()
-
-            # Générer la prière du matin avec l'IA
-            mood = "paix"  # Mood par défaut pour les prières globales
-            try:
-                prayer = await self.gemini_service.generate_morning_prayer(mood, special_occasion)
-            except Exception as e:
-                logger.warning(f"Erreur génération prière IA: {e}")
-                prayer = await self.gemini_service._get_fallback_morning_prayer(mood, special_occasion)
-
-            # Préparer les données de la prière
-            prayer_data = {
-                "prayer_title": prayer.get("prayer_title", "Prière du Matin"),
-                "prayer_text": prayer.get("prayer_text", ""),
-                "blessing": prayer.get("blessing", "Que Dieu te bénisse aujourd'hui. Amen."),
-                "suggested_verse": prayer.get("suggested_verse", ""),
-                "special_occasion": special_occasion.get("name") if special_occasion else None,
-                "occasion_description": special_occasion.get("description") if special_occasion else None,
-                "generated_at": datetime.now().isoformat(),
-                "prayer_type": "morning"
-            }
+            # Prière globale: case "paix" de la matrice pré-générée (générée si absente)
+            prayer_data, _ = await self.get_shared_prayer("morning", "paix")
 
             # Mettre en cache la prière globale
             await self.redis_service.cache_morning_prayer(prayer_data)
 
             # Envoyer via topic pour tous les utilisateurs abonnés
-            success = self.notification_client.send_morning_prayer(
+            # Envoi FCM bloquant: hors de la boucle d'événements
+            success = await asyncio.to_thread(
+                self.notification_client.send_morning_prayer,
                 # Texte court pour notification
                 prayer_text=prayer_data["prayer_text"][:100] + "...",
                 topic="morning_prayers"
@@ -794,39 +1028,22 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"❌ Erreur envoi notifications prière du matin: {e}")
 
+    @llm_metrics.track_run("evening_prayer")
     async def _send_evening_prayer_job(self):
         """Job pour envoyer les notifications de prière du soir"""
         logger.info("🌙 Début envoi notifications prière du soir")
 
         try:
-            # Détecter l'occasion spéciale du jour
-            special_occasion = self.get_special_occasion()
-
-            # Générer la prière du soir avec l'IA
-            mood = "paix"  # Mood par défaut pour les prières globales
-            try:
-                prayer = await self.gemini_service.generate_evening_prayer(mood, special_occasion)
-            except Exception as e:
-                logger.warning(f"Erreur génération prière IA: {e}")
-                prayer = await self.gemini_service._get_fallback_evening_prayer(mood, special_occasion)
-
-            # Préparer les données de la prière
-            prayer_data = {
-                "prayer_title": prayer.get("prayer_title", "Prière du Soir"),
-                "prayer_text": prayer.get("prayer_text", ""),
-                "blessing": prayer.get("blessing", "Que tu reposes dans la paix de Dieu. Amen."),
-                "suggested_verse": prayer.get("suggested_verse", ""),
-                "special_occasion": special_occasion.get("name") if special_occasion else None,
-                "occasion_description": special_occasion.get("description") if special_occasion else None,
-                "generated_at": datetime.now().isoformat(),
-                "prayer_type": "evening"
-            }
+            # Prière globale: case "paix" de la matrice pré-générée (générée si absente)
+            prayer_data, _ = await self.get_shared_prayer("evening", "paix")
 
             # Mettre en cache la prière globale
             await self.redis_service.cache_evening_prayer(prayer_data)
 
             # Envoyer via topic pour tous les utilisateurs abonnés
-            success = self.notification_client.send_evening_prayer(
+            # Envoi FCM bloquant: hors de la boucle d'événements
+            success = await asyncio.to_thread(
+                self.notification_client.send_evening_prayer,
                 # Texte court pour notification
                 prayer_text=prayer_data["prayer_text"][:100] + "...",
                 topic="evening_prayers"
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Recommandation locale de versets par humeur et occasion, sans appel LLM.
+
+Chaque verset reçoit un score par concept spirituel (paix, joie, consolation,
+salut...), calculé une fois depuis l'index plein texte: somme BM25 des mots
+du lexique du concept présents dans le verset. La matrice versets × concepts
+est gardée en NumPy; une requête combine les concepts de l'humeur et des
+thèmes de l'occasion et ne score que la présélection de chaque concept.
+"""
+
+import hashlib
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.soul_verse_api.services.bible_search import BM25_K1, SearchIndex, fold_text
+
+# Lexiques (français et anglais, sans accents). "*" = préfixe ("rejoui*")
+CONCEPT_LEXICON: Dict[str, List[str]] = {
+    "paix": ["paix", "paisible*", "repos", "tranquill*", "calme*", "peace*", "rest", "quiet*"],
+    "joie": ["joie*", "joyeu*", "rejoui*", "allegresse", "joy*", "rejoic*", "glad*"],
+    "consolation": ["consol*", "larme*", "pleur*", "afflig*", "affliction*", "brise*",
+                    "deuil", "comfort*", "tears", "weep*", "mourn*", "broken", "sorrow*"],
+    "confiance": ["inquiet*", "souci*", "angoiss*", "fardeau*", "confi*", "refuge",
+                  "anxious*", "careful", "burden*", "trust*"],
+    "courage": ["crains", "craignez", "peur", "effroi", "epouvant*", "courage*",
+                "fear", "afraid", "dismay*"],
+    "gratitude": ["grace*", "louange*", "loue*", "celebr*", "reconnaiss*", "bienfait*",
+                  "thank*", "praise*", "benefits"],
+    "esperance": ["esperance", "esper*", "avenir", "attente", "hope*", "expectation"],
+    "foi": ["foi", "croi*", "croyez", "fidele*", "faith*", "believ*"],
+    "patience": ["patien*", "persever*", "endur*", "lent", "colere", "courrou*",
+                 "longsuffering", "wrath", "anger", "slow"],
+    "amour": ["amour", "aime*", "charite", "bonte*", "love*", "loveth", "charity", "kindness"],
+    "force": ["force*", "fortifi*", "puissan*", "vaillan*", "strength*", "strong*", "might*",
+              "fatigu*", "las", "lasse*", "weary", "faint"],
+    "pardon": ["pardon*", "misericord*", "remission", "peche*", "forgive*", "mercy",
+               "merciful", "sins"],
+    "renouveau": ["nouveau*", "nouvelle*", "renouvel*", "matin*", "commencement", "new",
+                  "renew*", "morning"],
+    "dessein": ["dessein*", "projet*", "pensees", "avenir", "purpose*", "thoughts", "plans"],
+    "benediction": ["beni*", "benediction*", "bless*"],
+    "fidelite": ["fidel*", "verite", "faithful*", "faithfulness", "truth"],
+    "incarnation": ["parole", "chair", "enfant", "naissance", "emmanuel", "word", "flesh",
+                    "child", "born"],
+    "salut": ["salut", "sauv*", "sauveur", "redempt*", "rachet*", "salvation", "saved",
+              "saviour", "redeem*"],
+    "attente": ["attend*", "prepar*", "veill*", "wait*", "prepare*", "watch*"],
+    "lumiere": ["lumiere*", "eclair*", "lampe", "briller", "light", "shine*", "lamp"],
+    "mission": ["envoy*", "nations", "annonc*", "evangile", "prech*", "sent", "preach*", "gospel"],
+    "gloire": ["ciel", "cieux", "gloire*", "glorifi*", "heaven*", "glory", "glorif*"],
+    "adoration": ["ador*", "chant*", "cantique*", "worship*", "sing*", "song"],
+    "saintete": ["saint*", "sanctifi*", "purifi*", "holy", "holiness", "sanctif*"],
+    "communion": ["communion", "ensemble", "freres", "corps", "pain", "coupe",
+                  "fellowship", "brethren", "bread", "cup"],
+    "provision": ["pain", "nourri*", "pourvoi*", "besoin*", "provide*", "need", "supply"],
+    "resurrection": ["ressusc*", "resurrection", "victoire", "vainqu*", "vivant", "risen",
+                     "victory", "overcome*", "alive"],
+    "sacrifice": ["sacrifice*", "croix", "sang", "cross", "blood", "offering"],
+    "service": ["servi*", "humbl*", "humilit*", "prochain", "serve*", "servant*", "humble*",
+                "neighbour"],
+    "royaute": ["roi", "messie", "christ", "hosanna", "king", "messiah"],
+    "esprit": ["esprit", "souffle", "transform*", "spirit", "power"],
+    "presence": ["presence", "proche", "demeure*", "near", "abide*", "dwell*"],
+}
+
+# Humeurs et thèmes d'occasion -> concepts (clés sans accents)
+THEME_CONCEPTS: Dict[str, List[str]] = {
+    "paix": ["paix", "confiance"],
+    "joie": ["joie", "adoration"],
+    "tristesse": ["consolation", "esperance"],
+    "anxiete": ["confiance", "paix"],
+    "gratitude": ["gratitude", "benediction"],
+    "reconnaissance": ["gratitude", "fidelite"],
+    "espoir": ["esperance", "dessein"],
+    "doute": ["foi", "fidelite"],
+    "colere": ["patience", "pardon"],
+    "amour": ["amour"],
+    "peur": ["courage", "confiance"],
+    "fatigue": ["force", "paix"],
+    "pardon": ["pardon", "amour"],
+    "force": ["force", "courage"],
+    "patience": ["patience", "attente"],
+    # Thèmes des occasions spéciales (SchedulerService.get_special_occasion)
+    "nouveau_depart": ["renouveau"],
+    "projets": ["dessein"],
+    "bilan": ["gratitude", "fidelite"],
+    "fidelite_divine": ["fidelite"],
+    "amour_divin": ["amour"],
+    "esperance": ["esperance"],
+    "espoir_celeste": ["esperance", "gloire"],
+    "esperance_celeste": ["esperance", "gloire"],
+    "vie_nouvelle": ["resurrection", "renouveau"],
+    "victoire": ["resurrection"],
+    "redemption": ["salut", "sacrifice"],
+    "amour_fraternel": ["amour", "communion"],
+    "humilite": ["service"],
+    "messie": ["royaute"],
+    "saint_esprit": ["esprit"],
+    "puissance": ["esprit", "force"],
+    "transformation": ["esprit", "renouveau"],
+    "presence_divine": ["presence"],
+    "revelation": ["lumiere"],
+    "preparation": ["attente"],
+    "devotion": ["adoration"],
+    "louange": ["adoration", "gratitude"],
+    "sanctification": ["saintete"],
+    "resurrection": ["resurrection"],
+    **{concept: [concept] for concept in CONCEPT_LEXICON},
+}
+
+# Réflexions courtes accompagnant un verset choisi localement (par concept dominant)
+CONCEPT_REFLECTIONS: Dict[str, str] = {
+    "paix": "Dieu t'offre une paix que le monde ne peut donner. Prends un moment pour te reposer en Sa présence.",
+    "confiance": "Tu n'as pas à porter seul(e) tes soucis. Dépose-les devant Dieu: Il prend soin de toi.",
+    "joie": "La joie du Seigneur est ta force. Réjouis-toi aujourd'hui de Sa bonté.",
+    "consolation": "Dieu est proche de ceux qui ont le cœur brisé. Il voit tes larmes et veut te consoler.",
+    "courage": "Ne crains pas: Dieu marche devant toi. Sa présence te donne le courage d'avancer.",
+    "gratitude": "Prends le temps de te souvenir de Ses bienfaits et de Lui rendre grâce.",
+    "esperance": "Ton espérance repose sur un Dieu fidèle. Ce qu'Il a commencé, Il l'achèvera.",
+    "foi": "La foi grandit quand on s'appuie sur Ses promesses. Confie-Lui tes doutes aujourd'hui.",
+    "amour": "Tu es aimé(e) d'un amour éternel. Laisse cet amour transformer ta journée.",
+    "force": "Quand tes forces s'épuisent, Dieu renouvelle les tiennes. Appuie-toi sur Lui.",
+    "pardon": "Sa miséricorde est plus grande que tes fautes. Reçois Son pardon et avance libre.",
+    "renouveau": "Ses compassions se renouvellent chaque matin. Aujourd'hui est un nouveau départ.",
+    "salut": "Dieu a tout donné pour te sauver. Médite aujourd'hui la grandeur de ce salut.",
+}
+DEFAULT_REFLECTION = "Prends un moment pour méditer ce passage et laisse la Parole de Dieu éclairer ta journée."
+
+# Taille de la présélection par concept (versets les mieux notés)
+SHORTLIST_SIZE = 512
+# Longueur idéale d'un verset du jour (en mots)
+IDEAL_MIN_TOKENS = 8
+IDEAL_MAX_TOKENS = 40
+
+
+def theme_concepts(themes: Iterable[str]) -> List[str]:
+    """Concepts associés à des humeurs ou thèmes (noms libres, accents ignorés)"""
+    concepts: List[str] = []
+    for theme in themes:
+        key = fold_text(theme).strip().replace(" ", "_")
+        for concept in THEME_CONCEPTS.get(key, []):
+            if concept not in concepts:
+                concepts.append(concept)
+    return concepts
+
+
+class VerseRecommender:
+    """
+    Recommandeur de versets construit depuis l'index plein texte d'une traduction.
+
+    scores[pos, c]: pertinence BM25 du verset pos pour le concept c.
+    """
+
+    def __init__(self, search_index: SearchIndex):
+        self.translation = search_index.index.translation
+        self.concepts = list(CONCEPT_LEXICON)
+        self.concept_ids = {concept: i for i, concept in enumerate(self.concepts)}
+        doc_count = search_index.doc_count
+
+        length_norms = np.frombuffer(search_index.length_norms, dtype=np.float32)
+        self.scores = np.zeros((doc_count, len(self.concepts)), dtype=np.float32)
+        vocabulary = sorted(search_index.postings)
+
+        for c, concept in enumerate(self.concepts):
+            column = self.scores[:, c]
+            for token in self._expand(CONCEPT_LEXICON[concept], vocabulary, search_index):
+                docs, frequencies = search_index.postings[token]
+                docs = np.frombuffer(docs, dtype=np.uint32)
+                tf = np.frombuffer(frequencies, dtype=np.uint16).astype(np.float32)
+                idf = search_index._idf(token)
+                column[docs] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norms[docs])
+
+        # Préférence pour des versets lisibles seuls: ni trop courts, ni trop longs
+        lengths = np.frombuffer(search_index.doc_lengths, dtype=np.uint16).astype(np.float32)
+        self.prior = np.where(
+            (lengths >= IDEAL_MIN_TOKENS) & (lengths <= IDEAL_MAX_TOKENS), 1.0, 0.6
+        ).astype(np.float32)
+        self.prior[lengths < 4] = 0.0
+
+        size = min(SHORTLIST_SIZE, doc_count)
+        self.shortlists = [
+            np.argpartition(-self.scores[:, c], size - 1)[:size] if size else np.empty(0, np.int64)
+            for c in range(len(self.concepts))
+        ]
+
+    @staticmethod
+    def _expand(words: List[str], vocabulary: List[str], search_index: SearchIndex) -> List[str]:
+        """Mots du lexique présents dans l'index, préfixes "*" développés"""
+        tokens = []
+        for word in words:
+            if word.endswith("*"):
+                prefix = word[:-1]
+                i = bisect_left(vocabulary, prefix)
+                while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+                    tokens.append(vocabulary[i])
+                    i += 1
+            elif word in search_index.postings:
+                tokens.append(word)
+        return list(dict.fromkeys(tokens))
+
+    def recommend(self, concepts: Dict[str, float], limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Versets les plus pertinents pour une combinaison pondérée de concepts
+
+        Args:
+            concepts: Concept -> poids (ex: {"consolation": 1.0, "esperance": 0.5})
+            limit: Nombre de candidats
+
+        Returns:
+            Liste (position, score) par score décroissant
+        """
+        key = tuple(sorted(
+            (self.concept_ids[concept], float(weight))
+            for concept, weight in concepts.items()
+            if concept in self.concept_ids and weight > 0
+        ))
+        if not key or limit <= 0:
+            return []
+        # Peu de combinaisons distinctes (humeurs × occasions): résultat mémorisé
+        return list(self._recommend(key, limit))
+
+    @lru_cache(maxsize=1024)
+    def _recommend(self, key: Tuple[Tuple[int, float], ...], limit: int) -> Tuple[Tuple[int, float], ...]:
+        weights = np.zeros(len(self.concepts), dtype=np.float32)
+        active = []
+        for c, weight in key:
+            weights[c] += weight
+            active.append(c)
+
+        candidates = np.unique(np.concatenate([self.shortlists[c] for c in active]))
+        scores = (self.scores[candidates] @ weights) * self.prior[candidates]
+
+        count = min(limit, len(candidates))
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return tuple((int(candidates[i]), float(scores[i])) for i in top if scores[i] > 0)
+
+    @staticmethod
+    def daily_pick(candidates: List[Tuple[int, float]], *seed_parts: Optional[str]) -> Optional[int]:
+        """Choix stable d'un candidat pour une graine donnée (ex: humeur + date)"""
+        if not candidates:
+            return None
+        seed = "|".join(str(part) for part in seed_parts)
+        digest = int(hashlib.sha1(seed.encode("utf-8")).hexdigest()[:8], 16)
+        return candidates[digest % len(candidates)][0]
@@ -1,4 +1,20 @@
+import json
+from typing import Any
+
 from src.soul_verse_api.core.config import settings
 
+# Server-Sent Events: pas de mise en cache ni de mise en tampon par un proxy (nginx)
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Commentaire SSE envoyé dès l'ouverture du flux (premier octet immédiat)
+SSE_OPENING = b": stream\n\n"
+
+
 def is_development_environment() -> bool:
     return settings.ENVIRONMENT in ("development", "dev", "local")
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Événement SSE dont la charge est sérialisée en JSON (sur une seule ligne)"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'analyse des références bibliques (plages, listes, ordinaux)
+"""
+
+import pytest
+
+from src.soul_verse_api.services.bible_reference import (
+    BookNameMatcher,
+    VerseRange,
+    book_key,
+    parse_references,
+)
+
+
+@pytest.mark.parametrize("reference, expected", [
+    ("Jean 3:16", [VerseRange("Jean", 3, 16, 3, 16)]),
+    ("Philippiens 4:6-7", [VerseRange("Philippiens", 4, 6, 4, 7)]),
+    ("Jean 3:16-4:2", [VerseRange("Jean", 3, 16, 4, 2)]),
+    ("Psaume 23", [VerseRange("Psaume", 23, None, 23, None)]),
+    ("Psaume 23-24", [VerseRange("Psaume", 23, None, 24, None)]),
+    ("Jean 3.16", [VerseRange("Jean", 3, 16, 3, 16)]),
+    ("Jean 3:16 – 18", [VerseRange("Jean", 3, 16, 3, 18)]),
+])
+def test_parse_ranges(reference, expected):
+    assert list(parse_references(reference)) == expected
+
+
+def test_parse_verse_list_in_same_chapter():
+    assert list(parse_references("Psaume 23:1,4-6")) == [
+        VerseRange("Psaume", 23, 1, 23, 1),
+        VerseRange("Psaume", 23, 4, 23, 6),
+    ]
+
+
+def test_parse_semicolon_list_keeps_order_and_books():
+    assert list(parse_references("Jean 3:16; 1 Jean 4:8")) == [
+        VerseRange("Jean", 3, 16, 3, 16),
+        VerseRange("1 Jean", 4, 8, 4, 8),
+    ]
+
+
+def test_parse_semicolon_list_reuses_previous_book():
+    assert list(parse_references("Jean 3:16; 4:8-10")) == [
+        VerseRange("Jean", 3, 16, 3, 16),
+        VerseRange("Jean", 4, 8, 4, 10),
+    ]
+
+
+@pytest.mark.parametrize("reference, book", [
+    ("2 Corinthiens 5:17", "2 Corinthiens"),
+    ("1er Samuel 3:10", "1er Samuel"),
+    ("II Rois 2:11", "II Rois"),
+])
+def test_parse_keeps_ordinal_in_book(reference, book):
+    assert parse_references(reference)[0].book == book
+
+
+@pytest.mark.parametrize("reference", [
+    "Jean",
+    "3:16",
+    "Jean 3:16-2",
+    "Jean 3:16-17-18",
+    "Jean 4:2-3:16",
+    ";",
+])
+def test_parse_invalid_references(reference):
+    with pytest.raises(ValueError):
+        parse_references(reference)
+
+
+BOOK_NAMES = [
+    "Job", "Psalms", "Joel", "Jonah", "John", "Romans",
+    "Philippians", "Philemon", "I John", "II John",
+]
+FRENCH_ALIASES = {
+    "psaumes": "Psalms", "jean": "John", "romains": "Romans",
+    "philippiens": "Philippians", "philémon": "Philemon",
+    "1 jean": "I John", "2 jean": "II John",
+}
+
+
+@pytest.fixture
+def matcher():
+    return BookNameMatcher(BOOK_NAMES, FRENCH_ALIASES)
+
+
+def resolved_name(matcher, name):
+    book_id = matcher.resolve(name)
+    return None if book_id is None else BOOK_NAMES[book_id]
+
+
+@pytest.mark.parametrize("name, book", [
+    ("John", "John"),
+    ("Jean", "John"),
+    ("1 Jean", "I John"),
+    ("Première épître de Jean", "I John"),
+    ("Évangile selon Jean", "John"),
+    ("Ps", "Psalms"),
+    ("Rm", "Romans"),
+])
+def test_resolve_exact(matcher, name, book):
+    assert resolved_name(matcher, name) == book
+
+
+@pytest.mark.parametrize("name, book", [
+    ("Philip", "Philippians"),
+    ("Rom", "Romans"),
+    ("Phile", "Philemon"),
+    ("Psau", "Psalms"),
+])
+def test_resolve_unique_prefix(matcher, name, book):
+    assert resolved_name(matcher, name) == book
+
+
+@pytest.mark.parametrize("name, book", [
+    ("Philipiens", "Philippians"),
+    ("Romians", "Romans"),
+    ("Jonas", "Jonah"),
+])
+def test_resolve_fuzzy(matcher, name, book):
+    assert resolved_name(matcher, name) == book
+
+
+@pytest.mark.parametrize("name", [
+    "Jo",      # Job, Joel, Jonah, John...
+    "Phi",     # Philippians ou Philemon
+    "Jobl",    # à distance 1 de Job et de Joel
+    "Xyz",
+    "",
+])
+def test_resolve_ambiguous_or_unknown(matcher, name):
+    assert matcher.resolve(name) is None
+
+
+@pytest.mark.parametrize("name, key", [
+    ("1 Jean", "1jean"),
+    ("I John", "1john"),
+    ("II Rois", "2rois"),
+    ("1er Samuel", "1samuel"),
+    ("Première épître de Jean", "1jean"),
+    ("Deuxième Corinthiens", "2corinthiens"),
+    ("Évangile selon Jean", "jean"),
+    ("Épître aux Romains", "romains"),
+])
+def test_book_key_normalizes_ordinals_and_fillers(name, key):
+    assert book_key(name) == key
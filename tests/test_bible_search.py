@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'index plein texte (modes and/or, expressions, pagination)
+"""
+
+import pytest
+
+from src.soul_verse_api.services.bible_index import TranslationIndex
+from src.soul_verse_api.services.bible_search import (
+    SearchIndex,
+    decode_cursor,
+    encode_cursor,
+    parse_query,
+)
+
+VERSES = [
+    "Ne crains point, car je suis avec toi",
+    "Je vous laisse la paix, je vous donne ma paix",
+    "La paix de Dieu gardera vos cœurs",
+    "Point de crainte dans l'amour",
+    "L'Éternel est mon berger",
+    "Crains l'Éternel et ne point pécher",
+]
+
+
+@pytest.fixture(scope="module")
+def search_index():
+    data = {"books": [{
+        "name": "Test",
+        "chapters": [{
+            "chapter": 1,
+            "verses": [{"verse": i + 1, "text": text} for i, text in enumerate(VERSES)],
+        }],
+    }]}
+    return SearchIndex(TranslationIndex.from_json("TEST", data))
+
+
+def positions(hits):
+    return sorted(pos for pos, _ in hits)
+
+
+def test_parse_query_splits_terms_and_phrases():
+    assert parse_query('Paix "ne CRAINS point" Éternel') == (
+        ["paix", "eternel"], [["ne", "crains", "point"]])
+
+
+def test_search_and_requires_every_term(search_index):
+    hits, total = search_index.search(["crains", "point"])
+    assert positions(hits) == [0, 5]
+    assert total == 2
+
+
+def test_search_or_accepts_any_term(search_index):
+    hits, total = search_index.search(["berger", "crainte"], mode="or")
+    assert positions(hits) == [3, 4]
+    assert total == 2
+
+
+def test_search_folds_accents(search_index):
+    hits, _ = search_index.search(parse_query("eternel")[0])
+    assert positions(hits) == [4, 5]
+
+
+def test_search_phrase_requires_consecutive_tokens(search_index):
+    # "crains ... point" apparaît dans 0 et 5, mais consécutivement seulement dans 0
+    hits, total = search_index.search([], [["ne", "crains", "point"]])
+    assert positions(hits) == [0]
+    assert total == 1
+
+
+def test_search_phrase_or_term(search_index):
+    hits, _ = search_index.search(["berger"], [["ne", "crains", "point"]], mode="or")
+    assert positions(hits) == [0, 4]
+
+
+def test_search_ranks_by_term_frequency(search_index):
+    hits, _ = search_index.search(["paix"])
+    assert [pos for pos, _ in hits] == [1, 2]
+    assert hits[0][1] > hits[1][1]
+
+
+def test_search_without_match_or_query(search_index):
+    assert search_index.search(["inconnu"]) == ([], 0)
+    assert search_index.search([]) == ([], 0)
+
+
+def test_search_pagination_with_cursor(search_index):
+    terms = ["point", "crains", "eternel"]
+    everything, total = search_index.search(terms, mode="or", limit=10)
+
+    pages, offset = [], 0
+    while offset < total:
+        hits, _ = search_index.search(terms, mode="or", limit=2, offset=offset)
+        pages.extend(hits)
+        # Le curseur transmis au client redonne le même décalage
+        offset = decode_cursor(encode_cursor(offset + len(hits)))
+
+    assert pages == everything
+    assert len(pages) == total == 4
+
+
+@pytest.mark.parametrize("offset", [0, 1, 20, 123456])
+def test_cursor_round_trip(offset):
+    cursor = encode_cursor(offset)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == offset
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", encode_cursor(-1), "eDo1"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
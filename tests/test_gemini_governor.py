@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du régulateur Gemini (seau à jetons, transitions AIMD)
+"""
+
+import asyncio
+
+import pytest
+
+from src.soul_verse_api.services import gemini_governor as governor_module
+from src.soul_verse_api.services.gemini_governor import (
+    GeminiGovernor,
+    TokenBucket,
+    classify_error,
+)
+
+
+class FakeClock:
+    """Horloge monotone pilotée par le test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(governor_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def governor(clock):
+    return GeminiGovernor(
+        initial_rate=4.0, min_rate=0.5, max_rate=10.0,
+        max_concurrency=8, target_latency=2.0)
+
+
+def test_bucket_consumes_burst_then_refills(clock):
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    for _ in range(3):
+        asyncio.run(bucket.acquire())
+    assert bucket.tokens == 0
+
+    clock.now += 0.5
+    bucket._refill()
+    assert bucket.tokens == pytest.approx(1.0)
+
+    # Le seau ne dépasse jamais la rafale autorisée
+    clock.now += 60
+    bucket._refill()
+    assert bucket.tokens == 3.0
+
+
+def test_bucket_waits_for_next_token(clock, monkeypatch):
+    bucket = TokenBucket(rate=4.0, burst=1.0)
+    asyncio.run(bucket.acquire())
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        clock.now += delay
+
+    monkeypatch.setattr(governor_module.asyncio, "sleep", fake_sleep)
+    asyncio.run(bucket.acquire())
+    assert sleeps == [pytest.approx(0.25)]
+    assert bucket.waiting == 0
+
+
+@pytest.mark.parametrize("error, expected", [
+    (asyncio.TimeoutError(), "timeout"),
+    (ApiError(429), "rate_limited"),
+    (Exception("429 RESOURCE_EXHAUSTED"), "rate_limited"),
+    (ApiError(503), "server_error"),
+    (ApiError(400), "client_error"),
+    (ValueError("JSON invalide"), "client_error"),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_success_grows_additively(governor):
+    governor._on_success(0.5)
+    assert governor.concurrency_limit == pytest.approx(4.25)
+    assert governor.rate == pytest.approx(4.25)
+
+    # Environ +1 par fenêtre complète de succès
+    for _ in range(3):
+        governor._on_success(0.5)
+    assert 4.9 < governor.concurrency_limit < 5.0
+
+
+def test_growth_is_capped(governor):
+    for _ in range(500):
+        governor._on_success(0.5)
+    assert governor.concurrency_limit == 8
+    assert governor.rate == 10.0
+
+
+@pytest.mark.parametrize("error_class", ["rate_limited", "server_error", "timeout"])
+def test_overload_halves_rate_and_concurrency(governor, error_class):
+    governor._on_error(error_class)
+    assert governor.concurrency_limit == 2.0
+    assert governor.rate == 2.0
+    assert governor.bucket.tokens <= governor.bucket.burst
+    assert governor.counters[error_class] == 1
+    assert governor.counters["decreases"] == 1
+
+
+def test_client_error_does_not_decrease(governor):
+    governor._on_error("client_error")
+    assert governor.concurrency_limit == 4.0
+    assert governor.rate == 4.0
+
+
+def test_burst_of_errors_decreases_once_per_cooldown(governor, clock):
+    for _ in range(5):
+        governor._on_error("rate_limited")
+    assert governor.rate == 2.0
+    assert governor.counters["decreases"] == 1
+
+    clock.now += governor_module.DECREASE_COOLDOWN_SECONDS
+    governor._on_error("rate_limited")
+    assert governor.rate == 1.0
+    assert governor.counters["decreases"] == 2
+
+
+def test_decrease_respects_floors(governor, clock):
+    for _ in range(10):
+        governor._on_error("server_error")
+        clock.now += governor_module.DECREASE_COOLDOWN_SECONDS
+    assert governor.rate == 0.5
+    assert governor.concurrency_limit == governor_module.MIN_CONCURRENCY
+
+
+def test_slow_success_only_decreases_concurrency(governor):
+    governor._on_success(3.0)
+    assert governor.concurrency_limit == pytest.approx(3.6)
+    assert governor.rate == 4.0
+    assert governor.counters["successes"] == 1
+
+
+def test_slot_reports_error_class(governor):
+    async def scenario():
+        with pytest.raises(ApiError):
+            async with governor.slot():
+                raise ApiError(429)
+
+    asyncio.run(scenario())
+    assert governor.counters["rate_limited"] == 1
+    assert governor.rate == 2.0
+    assert governor.active == 0
+
+
+def test_slot_uses_first_output_latency(governor, clock):
+    async def scenario():
+        async with governor.slot() as timing:
+            clock.now += 0.5
+            timing.first_output()
+            # La lecture du reste du flux ne compte pas comme latence
+            clock.now += 30
+
+    asyncio.run(scenario())
+    assert governor.latency_ewma == pytest.approx(0.5)
+    assert governor.counters["decreases"] == 0
+
+
+def test_slot_limits_concurrency():
+    governor = GeminiGovernor(
+        initial_rate=100.0, max_rate=100.0, max_concurrency=2, target_latency=10.0)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with governor.slot():
+            peak = max(peak, governor.active)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert governor.active == 0
+    assert governor.get_metrics()["queue_depth"] == 0
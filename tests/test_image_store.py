@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du stockage d'images adressé par empreinte (qualité, réconciliation, nettoyage)
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.soul_verse_api.services.image_store import (
+    MANIFEST_VERSION,
+    METHOD_QUALITY,
+    ImageStore,
+    parse_filename,
+    variant_filename,
+)
+
+HASH = "a1b2c3"
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return tmp_path / "verse_images"
+
+
+@pytest.fixture
+def store(directory):
+    return ImageStore(directory)
+
+
+def write_manifest(store_directory, images):
+    manifest_path = store_directory.parent / f"{store_directory.name}_manifest.json"
+    manifest_path.write_text(json.dumps({"version": MANIFEST_VERSION, "images": images}))
+
+
+@pytest.mark.parametrize("filename, parsed", [
+    ("a1b2c3.png", (HASH, "local")),
+    ("a1b2c3_stability.png", (HASH, "stability")),
+    ("a1b2c3_placeholder.svg", (HASH, "placeholder")),
+    ("a1b2c3_placeholder.png", None),
+    ("a1b2c3_unknown.png", None),
+    (".1234.a1b2c3_dalle.png", None),
+])
+def test_parse_filename(filename, parsed):
+    assert parse_filename(filename) == parsed
+
+
+def test_variant_filename_round_trip():
+    for variant in ("local", "stability", "dalle", "gemini", "placeholder"):
+        assert parse_filename(variant_filename(HASH, variant)) == (HASH, variant)
+
+
+def test_lookup_prefers_best_quality(store):
+    store.write(HASH, "placeholder", "<svg/>", "placeholder")
+    assert store.lookup(HASH)["variant"] == "placeholder"
+
+    store.write(HASH, "local", b"png", "local")
+    store.write(HASH, "stability", b"png", "stability")
+    assert store.lookup(HASH)["variant"] == "stability"
+    assert store.lookup(HASH)["file"] == f"{HASH}_stability.png"
+
+
+def test_lookup_respects_min_quality(store):
+    store.write(HASH, "placeholder", "<svg/>", "placeholder")
+    # Un placeholder n'évite jamais un appel payant
+    assert store.lookup(HASH, METHOD_QUALITY["local"]) is None
+
+    store.write(HASH, "local", b"png", "local")
+    assert store.lookup(HASH, METHOD_QUALITY["local"])["variant"] == "local"
+    assert store.lookup(HASH, METHOD_QUALITY["stability"]) is None
+    assert store.lookup("inconnu") is None
+    assert store.stats["misses"] == 3
+
+
+def test_lookup_same_quality_prefers_latest(store):
+    store.write(HASH, "dalle", b"png", "dalle")
+    time.sleep(0.001)
+    store.write(HASH, "stability", b"png", "stability")
+    assert store.lookup(HASH)["variant"] == "stability"
+
+
+def test_write_is_atomic_and_indexed(store, directory):
+    path = store.write(HASH, "local", b"contenu", "local", mood="paix")
+    assert path.read_bytes() == b"contenu"
+    assert [p.name for p in directory.iterdir()] == [path.name]
+    assert store.record_for(path.name)["mood"] == "paix"
+    assert store.record_for(path.name)["bytes"] == len(b"contenu")
+
+
+def test_reconcile_indexes_files_and_drops_orphans(directory):
+    directory.mkdir()
+    (directory / f"{HASH}_stability.png").write_bytes(b"png")
+    (directory / ".999.x_dalle.png").write_bytes(b"temporaire")
+    (directory / "notes.txt").write_text("ignoré")
+    write_manifest(directory, {
+        "orphan": {"local": {"file": "orphan.png", "method": "local",
+                             "generated_at": datetime.now().isoformat(), "bytes": 3}},
+    })
+
+    store = ImageStore(directory)
+
+    assert store.lookup(HASH)["variant"] == "stability"
+    assert store.lookup("orphan") is None
+    assert store.get_stats()["images"] == 1
+
+    # Le manifeste réconcilié est réécrit sur disque
+    reloaded = json.loads(store.manifest_path.read_text())
+    assert list(reloaded["images"]) == [HASH]
+
+
+def test_workers_see_each_other_writes(directory):
+    first, second = ImageStore(directory), ImageStore(directory)
+    first.write(HASH, "local", b"png", "local")
+    # Absence en mémoire: relecture immédiate du manifeste partagé
+    assert second.lookup(HASH)["variant"] == "local"
+
+    second.write(HASH, "stability", b"png", "stability")
+    first.write("autre", "local", b"png", "local")
+    # Le manifeste fait foi: aucune écriture de l'autre worker n'est perdue
+    assert ImageStore(directory).get_stats()["variants"] == {"local": 2, "stability": 1}
+
+
+def test_remove_older_than(directory):
+    directory.mkdir()
+    old = (datetime.now() - timedelta(days=10)).isoformat()
+    for name in (f"{HASH}.png", f"{HASH}_stability.png", f"{HASH}_stability_w480.webp", "recent.png"):
+        (directory / name).write_bytes(b"png")
+    write_manifest(directory, {
+        HASH: {
+            "local": {"file": f"{HASH}.png", "method": "local", "generated_at": old, "bytes": 3},
+            "stability": {
+                "file": f"{HASH}_stability.png", "method": "stability", "generated_at": old, "bytes": 3,
+                "derivatives": {"bytes": {f"{HASH}_stability_w480.webp": 3}},
+            },
+        },
+    })
+    store = ImageStore(directory)
+    store.write("recent", "local", b"png", "local")
+
+    assert store.remove_older_than(7 * 86400) == 3
+    assert sorted(p.name for p in directory.iterdir()) == ["recent.png"]
+    assert store.lookup(HASH) is None
+    assert store.lookup("recent")["variant"] == "local"
+
+    # Une suppression n'est pas réintroduite par un autre worker
+    other = ImageStore(directory)
+    other.write("nouveau", "local", b"png", "local")
+    assert store.lookup(HASH) is None
+    assert ImageStore(directory).get_stats()["images"] == 2
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du décodage tolérant des réponses JSON de Gemini
+"""
+
+import pytest
+
+from src.soul_verse_api.services.json_extractor import (
+    JSONStreamExtractor,
+    close_json,
+    extract_json,
+    strip_trailing_commas,
+)
+
+VERSE = {"reference": "Jean 3:16", "reflection": "Dieu aime", "prayer_text": "Amen"}
+VERSE_JSON = '{"reference": "Jean 3:16", "reflection": "Dieu aime", "prayer_text": "Amen"}'
+
+
+@pytest.mark.parametrize("text", [
+    VERSE_JSON,
+    f"```json\n{VERSE_JSON}\n```",
+    f"```\n{VERSE_JSON}\n```",
+    f"Voici le verset demandé :\n```JSON\n{VERSE_JSON}\n```\nBonne journée !",
+    f"  {VERSE_JSON} et un commentaire",
+])
+def test_extract_fenced_or_surrounded(text):
+    assert extract_json(text) == VERSE
+
+
+def test_extract_array():
+    assert extract_json('Réponse: [{"a": 1}, {"a": 2}]') == [{"a": 1}, {"a": 2}]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1,}', {"a": 1}),
+    ('{"a": [1, 2, ],\n}', {"a": [1, 2]}),
+    ('[{"a": 1,},]', [{"a": 1}]),
+])
+def test_extract_trailing_commas(text, expected):
+    assert extract_json(text) == expected
+
+
+def test_trailing_commas_inside_strings_are_kept():
+    text = '{"prayer_text": "Seigneur, ]garde-nous, }", "themes": ["paix",],}'
+    assert extract_json(text) == {
+        "prayer_text": "Seigneur, ]garde-nous, }", "themes": ["paix"]}
+    assert strip_trailing_commas('["a, ]", "b\\", ]",]') == '["a, ]", "b\\", ]"]'
+
+
+@pytest.mark.parametrize("text", ["", "Pas de JSON ici", '{"a": ', "```json\n```"])
+def test_extract_unreadable(text):
+    with pytest.raises(ValueError):
+        extract_json(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"reference": "Jean 3:16", "reflection": "Dieu a', {"reference": "Jean 3:16", "reflection": "Dieu a"}),
+    ('{"reference": "Jean 3:16", "themes": ["paix", "jo', {"reference": "Jean 3:16", "themes": ["paix", "jo"]}),
+    ('{"reference": "Jean 3:16",', {"reference": "Jean 3:16"}),
+    ('{"reference": "Jean 3:16", "reflection"', {"reference": "Jean 3:16"}),
+    ('{"reference": "Jean 3:16", "count": 1', {"reference": "Jean 3:16", "count": 1}),
+    ('{"text": "fin\\', {"text": "fin"}),
+])
+def test_extract_truncated_partial(text, expected):
+    assert extract_json(text, partial=True) == expected
+    with pytest.raises(ValueError):
+        extract_json(text)
+
+
+def test_close_json():
+    assert close_json('{"a": [1, {"b": "x') == '{"a": [1, {"b": "x"}]}'
+    assert close_json('{"a": [1, 2,') == '{"a": [1, 2]}'
+
+
+def test_stream_extractor_emits_text_deltas():
+    extractor = JSONStreamExtractor()
+    chunks = ['```json\n{"refer', 'ence": "Jean 3:16", "reflec', 'tion": "Dieu ', 'aime"', ', "count": 3}\n```']
+
+    deltas = [extractor.feed(chunk) for chunk in chunks]
+
+    assert deltas[0] == {}
+    assert deltas[1] == {"reference": "Jean 3:16"}
+    assert deltas[2] == {"reflection": "Dieu "}
+    assert deltas[3] == {"reflection": "aime"}
+    assert deltas[4] == {}
+    assert extractor.result() == {"reference": "Jean 3:16", "reflection": "Dieu aime", "count": 3}
+
+
+def test_stream_extractor_rebuilds_full_text():
+    extractor = JSONStreamExtractor()
+    rebuilt = {}
+    for i in range(0, len(VERSE_JSON), 7):
+        for field, delta in extractor.feed(VERSE_JSON[i:i + 7]).items():
+            rebuilt[field] = rebuilt.get(field, "") + delta
+    assert rebuilt == VERSE
+    assert extractor.result() == VERSE
+
+
+def test_stream_extractor_unreadable_result():
+    extractor = JSONStreamExtractor()
+    assert extractor.feed("Désolé, je ne peux pas") == {}
+    assert extractor.result() is None